@@ -5,16 +5,39 @@
 分析网站的翻页机制并确保获取所有54个数据中心
 """
 
-import requests
 import re
 import json
 import time
 import os
+import sys
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from dom_query import DomQuery, attribute_selector, class_selector, tag_selector
+from fetch_client import FetchClient
+from snapshot_replay import parse_replay_args, replay_snapshots
+
+# 常见的数据容器选择器
+CONTAINER_SELECTORS = {
+    '.datacenter-item': class_selector('datacenter-item'),
+    '.location-item': class_selector('location-item'),
+    '.facility-item': class_selector('facility-item'),
+    '[data-lat]': attribute_selector('data-lat'),
+    '[data-longitude]': attribute_selector('data-longitude'),
+    '.result-item': class_selector('result-item'),
+    '.listing-item': class_selector('listing-item'),
+}
+
+# 主页面分析只需要分页控件和数据容器
+MAIN_PAGE_QUERY = DomQuery(dict(CONTAINER_SELECTORS, pagination=tag_selector('a', 'button')))
+COORDINATE_QUERY = DomQuery({
+    'coordinates': attribute_selector('data-lat', 'data-latitude'),
+})
+
 class ShanghaiPaginationAnalyzer:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
         self.headers = {
@@ -29,8 +52,8 @@ class ShanghaiPaginationAnalyzer:
             'Upgrade-Insecure-Requests': '1',
         }
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
         
         self.all_datacenters = []
         self.page_data = {}
@@ -44,19 +67,19 @@ class ShanghaiPaginationAnalyzer:
         print("🔍 分析主页面结构...")
         
         try:
-            response = self.session.get(self.base_url, timeout=30)
+            response = self.client.get(self.base_url, headers=self.headers, timeout=30)
             if response.status_code == 200:
                 # 保存页面
                 with open("html_sources/shanghai/main_analysis.html", 'w', encoding='utf-8') as f:
                     f.write(response.text)
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                dom = MAIN_PAGE_QUERY.run(response.text)
                 
                 # 查找分页信息
-                pagination_info = self.extract_pagination_info(soup, response.text)
+                pagination_info = self.extract_pagination_info(dom, response.text)
                 
                 # 查找数据容器
-                data_containers = self.find_data_containers(soup)
+                data_containers = self.find_data_containers(dom)
                 
                 # 查找AJAX端点
                 ajax_endpoints = self.find_ajax_endpoints(response.text)
@@ -80,7 +103,7 @@ class ShanghaiPaginationAnalyzer:
             print(f"❌ 主页面分析错误: {e}")
             return None
     
-    def extract_pagination_info(self, soup, content):
+    def extract_pagination_info(self, dom, content):
         """提取分页信息"""
         pagination_info = {
             'total_pages': 0,
@@ -107,7 +130,10 @@ class ShanghaiPaginationAnalyzer:
                 print(f"  找到分页模式: {pattern} -> {matches}")
         
         # 查找分页按钮
-        pagination_elements = soup.find_all(['a', 'button'], text=re.compile(r'(Next|Previous|下一页|上一页|\d+)', re.IGNORECASE))
+        button_text = re.compile(r'(Next|Previous|下一页|上一页|\d+)', re.IGNORECASE)
+        # 只匹配元素自身的唯一文本（与 find_all(text=...) 相同），不含嵌套子元素拼接出的文本
+        pagination_elements = [elem for elem in dom['pagination']
+                               if elem.string is not None and button_text.search(elem.string)]
         if pagination_elements:
             print(f"  找到分页按钮: {len(pagination_elements)} 个")
         
@@ -128,23 +154,12 @@ class ShanghaiPaginationAnalyzer:
         
         return pagination_info
     
-    def find_data_containers(self, soup):
+    def find_data_containers(self, dom):
         """查找数据容器"""
         containers = []
         
-        # 常见的数据容器选择器
-        container_selectors = [
-            '.datacenter-item',
-            '.location-item',
-            '.facility-item',
-            '[data-lat]',
-            '[data-longitude]',
-            '.result-item',
-            '.listing-item',
-        ]
-        
-        for selector in container_selectors:
-            elements = soup.select(selector)
+        for selector in CONTAINER_SELECTORS:
+            elements = dom[selector]
             if elements:
                 containers.extend(elements)
                 print(f"  找到容器 {selector}: {len(elements)} 个")
@@ -231,7 +246,7 @@ class ShanghaiPaginationAnalyzer:
                 url = pattern.format(page)
                 
                 try:
-                    response = self.session.get(url, timeout=20)
+                    response = self.client.get(url, headers=self.headers, timeout=20)
                     if response.status_code == 200:
                         # 保存页面
                         page_file = f"html_sources/shanghai/page_{page}_pattern_{pattern.split('?')[-1].split('=')[0]}.html"
@@ -286,7 +301,7 @@ class ShanghaiPaginationAnalyzer:
                 ]
                 
                 for params in params_list:
-                    response = self.session.get(url, params=params, timeout=20)
+                    response = self.client.get(url, headers=self.headers, params=params, timeout=20)
                     if response.status_code == 200:
                         try:
                             data = response.json()
@@ -312,7 +327,7 @@ class ShanghaiPaginationAnalyzer:
         
         try:
             # 获取主页面找到表单
-            response = self.session.get(self.base_url, timeout=30)
+            response = self.client.get(self.base_url, headers=self.headers, timeout=30)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
@@ -341,9 +356,9 @@ class ShanghaiPaginationAnalyzer:
                         
                         # 提交表单
                         if method == 'POST':
-                            form_response = self.session.post(f"https://www.datacenters.com{action}", data=form_data, timeout=20)
+                            form_response = self.client.post(f"https://www.datacenters.com{action}", headers=self.headers, data=form_data, timeout=20)
                         else:
-                            form_response = self.session.get(f"https://www.datacenters.com{action}", params=form_data, timeout=20)
+                            form_response = self.client.get(f"https://www.datacenters.com{action}", headers=self.headers, params=form_data, timeout=20)
                         
                         if form_response.status_code == 200:
                             page_results = self.extract_datacenters(form_response.text, "form")
@@ -372,7 +387,7 @@ class ShanghaiPaginationAnalyzer:
         
         for url in direct_urls:
             try:
-                response = self.session.get(url, timeout=20)
+                response = self.client.get(url, headers=self.headers, timeout=20)
                 if response.status_code == 200:
                     page_results = self.extract_datacenters(response.text, f"direct_{url.split('/')[-1]}")
                     if page_results:
@@ -418,11 +433,8 @@ class ShanghaiPaginationAnalyzer:
                 except ValueError:
                     continue
         
-        # HTML结构化数据提取
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # 查找带坐标属性的元素
-        coord_elements = soup.find_all(attrs={'data-lat': True}) + soup.find_all(attrs={'data-latitude': True})
+        # HTML结构化数据提取：查找带坐标属性的元素
+        coord_elements = COORDINATE_QUERY.run(content)['coordinates']
         for elem in coord_elements:
             try:
                 lat = float(elem.get('data-lat') or elem.get('data-latitude'))
@@ -479,17 +491,23 @@ class ShanghaiPaginationAnalyzer:
         
         return results
     
-    def run_complete_analysis(self):
-        """运行完整分析"""
+    def run_complete_analysis(self, snapshot_dir=None):
+        """运行完整分析（指定 snapshot_dir 时离线回放保存的HTML快照）"""
         print("🚀 上海数据中心完整翻页分析启动")
         print("🎯 目标：分析翻页机制并获取所有54个数据中心")
         print("="*70)
         
-        # 1. 分析主页面
-        main_analysis = self.analyze_main_page()
-        
-        # 2. 尝试不同翻页方法
-        all_results, methods = self.try_different_pagination_methods()
+        if snapshot_dir:
+            # 离线回放：跳过网络分析，直接用快照驱动提取
+            main_analysis = None
+            all_results = replay_snapshots(snapshot_dir, self.extract_datacenters)
+            methods = ['snapshot_replay']
+        else:
+            # 1. 分析主页面
+            main_analysis = self.analyze_main_page()
+            
+            # 2. 尝试不同翻页方法
+            all_results, methods = self.try_different_pagination_methods()
         
         # 3. 去重
         unique_results = self.deduplicate_results(all_results)
@@ -570,13 +588,15 @@ class ShanghaiPaginationAnalyzer:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("上海数据中心完整翻页分析工具")
+    
     print("🔍 上海数据中心完整翻页分析工具")
     print("🎯 分析翻页机制，确保获取所有54个数据中心")
     
     analyzer = ShanghaiPaginationAnalyzer()
     
     try:
-        results = analyzer.run_complete_analysis()
+        results = analyzer.run_complete_analysis(snapshot_dir=replay_dir)
         
         if len(results) >= 54:
             print(f"\n🎉 任务完成！成功获取 {len(results)} 个数据中心")
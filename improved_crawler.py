@@ -6,10 +6,11 @@
 增加了网络连接重试和错误处理
 """
 
+import argparse
 import time
 import os
 import json
-import requests
+import sys
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,10 +19,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from fetch_client import FetchClient
+from circuit_breaker import RetryController, CircuitOpenError
+from lean_profile import apply_lean_options, block_resources
+
 class ShanghaiDatacenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None, lean=False):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient()
+        
         # 设置Chrome选项
         self.chrome_options = Options()
         # 不使用无头模式，便于调试网络问题
@@ -41,8 +51,15 @@ class ShanghaiDatacenterCrawler:
         # 增加超时时间
         self.chrome_options.add_argument('--timeout=30')
         self.chrome_options.add_argument('--page-load-strategy=eager')
+        # 默认使用可见浏览器便于调试；lean=True（命令行 --lean）时启用精简配置：无头模式、限制窗口大小，浏览器启动后拦截图片/字体/地图瓦片/统计脚本
+        self.lean = lean
+        if lean:
+            apply_lean_options(self.chrome_options)
         
         self.driver = None
+        # 页面加载的退避重试与熔断（浏览器请求不经过共享HTTP客户端）
+        self.page_retry = RetryController(base_delay=2, max_delay=15, failure_threshold=3, reset_timeout=60,
+                                          retry_exceptions=(TimeoutException, WebDriverException))
         self.all_datacenters = []
         self.page_data = {}
         
@@ -63,7 +80,7 @@ class ShanghaiDatacenterCrawler:
         
         for url in test_urls:
             try:
-                response = requests.get(url, timeout=10, verify=False)
+                response = self.client.get(url, timeout=10, verify=False)
                 print(f"  ✅ {url} - 状态码: {response.status_code}")
                 if url == self.base_url:
                     return True
@@ -76,6 +93,8 @@ class ShanghaiDatacenterCrawler:
         """初始化WebDriver"""
         try:
             self.driver = webdriver.Chrome(options=self.chrome_options)
+            if self.lean:
+                block_resources(self.driver)
             self.driver.set_page_load_timeout(30)
             self.driver.implicitly_wait(10)
             print("✅ WebDriver初始化成功")
@@ -85,38 +104,43 @@ class ShanghaiDatacenterCrawler:
             return False
     
     def load_page_with_retry(self, max_retries=3):
-        """带重试的页面加载"""
+        """带重试的页面加载（指数退避 + 抖动，连续失败后熔断）"""
         print(f"🌐 加载目标页面 (最多重试{max_retries}次)...")
         
-        for attempt in range(max_retries):
+        attempts = [0]
+        
+        def load_once():
+            attempts[0] += 1
+            print(f"  尝试 {attempts[0]}/{max_retries}: {self.base_url}")
             try:
-                print(f"  尝试 {attempt + 1}/{max_retries}: {self.base_url}")
                 self.driver.get(self.base_url)
                 
                 # 等待页面加载
                 WebDriverWait(self.driver, 15).until(
                     EC.presence_of_element_located((By.TAG_NAME, "body"))
                 )
-                
-                # 保存页面源码
-                with open("html_sources/shanghai/improved_initial_page.html", 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
-                
-                print("  ✅ 页面加载成功")
-                return True
-                
             except TimeoutException:
-                print(f"  ⏰ 第{attempt + 1}次尝试超时")
-                if attempt < max_retries - 1:
-                    time.sleep(5)  # 等待5秒后重试
-                    
+                print(f"  ⏰ 第{attempts[0]}次尝试超时")
+                raise
             except Exception as e:
-                print(f"  ❌ 第{attempt + 1}次尝试失败: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(5)
+                print(f"  ❌ 第{attempts[0]}次尝试失败: {e}")
+                raise
         
-        print("❌ 所有尝试都失败了")
-        return False
+        try:
+            self.page_retry.call(self.base_url, load_once, max_attempts=max_retries)
+        except CircuitOpenError:
+            print("❌ 目标页面连续加载失败，已熔断，暂不重试")
+            return False
+        except Exception:
+            print("❌ 所有尝试都失败了")
+            return False
+        
+        # 保存页面源码
+        with open("html_sources/shanghai/improved_initial_page.html", 'w', encoding='utf-8') as f:
+            f.write(self.driver.page_source)
+        
+        print("  ✅ 页面加载成功")
+        return True
     
     def analyze_page_structure(self):
         """分析页面结构"""
@@ -567,11 +591,16 @@ class ShanghaiDatacenterCrawler:
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="上海数据中心改进版真实按钮点击爬虫")
+    parser.add_argument('--lean', action='store_true',
+                        help='精简模式：无头浏览器并拦截图片/字体/地图瓦片/统计脚本')
+    args = parser.parse_args()
+    
     print("🎯 上海数据中心改进版真实按钮点击爬虫")
     print("🔧 基于成功的测试，应用到真实网站")
     print("📄 预期：第1页40个，第2页14个，共54个数据中心")
     
-    crawler = ShanghaiDatacenterCrawler()
+    crawler = ShanghaiDatacenterCrawler(lean=args.lean)
     
     try:
         # 运行爬虫
@@ -5,18 +5,23 @@ JavaScript动态翻页爬虫
 专门处理在同一URL内通过JavaScript动态切换页面数据的网站
 """
 
-import requests
 import json
 import time
 import os
 import re
+import sys
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from driver_pool import shared_pool
+from extraction_cascade import expected_count, reported_totals
+from hydration_extractor import iter_locations
+from network_capture import NetworkCapture, enable_performance_logging, is_pagination_api
+
 
 class JavaScriptPaginationCrawler:
     def __init__(self):
@@ -29,8 +34,13 @@ class JavaScriptPaginationCrawler:
         self.chrome_options.add_argument('--disable-gpu')
         self.chrome_options.add_argument('--window-size=1920,1080')
         self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        # 打开DevTools性能日志，用于捕获翻页时的XHR/fetch接口响应
+        enable_performance_logging(self.chrome_options)
         
         self.driver = None
+        self.network = None
+        # 共享浏览器池：同一进程内多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('js_pagination', self.create_driver)
         self.all_datacenters = []
         self.page_data = {}
         
@@ -38,11 +48,24 @@ class JavaScriptPaginationCrawler:
         os.makedirs("data/shanghai", exist_ok=True)
         os.makedirs("html_sources/shanghai", exist_ok=True)
     
+    def create_driver(self):
+        """启动一个Chrome浏览器（由浏览器池调用）"""
+        return webdriver.Chrome(options=self.chrome_options)
+    
     def setup_driver(self):
-        """初始化WebDriver"""
+        """从浏览器池租用WebDriver"""
         try:
-            self.driver = webdriver.Chrome(options=self.chrome_options)
+            self.driver = self.driver_pool.acquire()
+            if self.driver is None:
+                # 浏览器池等待超时或浏览器启动失败
+                print("❌ 无法启动浏览器，WebDriver初始化失败")
+                return False
             self.driver.implicitly_wait(10)
+            try:
+                self.network = NetworkCapture(self.driver, url_filter=is_pagination_api).start()
+            except Exception as e:
+                print(f"⚠️ 网络响应捕获不可用，将只从页面中提取: {e}")
+                self.network = None
             print("✅ WebDriver初始化成功")
             return True
         except Exception as e:
@@ -437,23 +460,30 @@ class JavaScriptPaginationCrawler:
             time.sleep(3)
             
             # 保存页面源码
+            page_source = self.driver.page_source
             with open(f"html_sources/shanghai/js_page_{page_num}.html", 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            
-            # 提取方法1: 从JavaScript变量中提取
-            script_data = self.extract_from_javascript(page_num)
-            if script_data:
-                page_datacenters.extend(script_data)
+                f.write(page_source)
             
-            # 提取方法2: 从DOM元素中提取
-            dom_data = self.extract_from_dom(page_num)
-            if dom_data:
-                page_datacenters.extend(dom_data)
+            # 本页应有的数量：页面报告的每页数量，最后一页为总数的剩余部分
+            total, per_page = reported_totals(page_source)
+            expected = expected_count(total, per_page, (page_num - 1) * (per_page or 0))
             
-            # 提取方法3: 从网络请求中提取（监听AJAX）
+            # 提取方法1: 从网络请求中提取（翻页触发的列表接口响应）
             network_data = self.extract_from_network(page_num)
-            if network_data:
-                page_datacenters.extend(network_data)
+            page_datacenters.extend(network_data)
+            if not network_data or (expected and len(network_data) < expected):
+                # 接口数据缺失或不足一页时退回到页面抓取，结果在最后统一去重
+                if network_data:
+                    print(f"    接口数据 {len(network_data)} 个，少于本页预期 {expected} 个，继续从页面提取")
+                # 提取方法2: 从JavaScript变量中提取
+                script_data = self.extract_from_javascript(page_num)
+                if script_data:
+                    page_datacenters.extend(script_data)
+                
+                # 提取方法3: 从DOM元素中提取
+                dom_data = self.extract_from_dom(page_num)
+                if dom_data:
+                    page_datacenters.extend(dom_data)
             
             print(f"    第 {page_num} 页获取到 {len(page_datacenters)} 个数据中心")
             
@@ -530,10 +560,10 @@ class JavaScriptPaginationCrawler:
                             
                             if lat and lng:
                                 lat, lng = float(lat), float(lng)
-                                  name = (elem.get_attribute('title') or 
-                                       elem.get_attribute('data-name') or
-                                       elem.text.strip() or
-                                       f"数据中心_{len(datacenters)+1}")
+                                name = (elem.get_attribute('title') or 
+                                        elem.get_attribute('data-name') or
+                                        elem.text.strip() or
+                                        f"数据中心_{len(datacenters)+1}")
                                 
                                 if 30.6 <= lat <= 31.9 and 120.8 <= lng <= 122.2:
                                     datacenters.append({
@@ -559,13 +589,30 @@ class JavaScriptPaginationCrawler:
         return datacenters
     
     def extract_from_network(self, page_num):
-        """从网络请求中提取数据（尝试获取AJAX响应）"""
+        """从网络请求中提取数据（DevTools性能日志中自上一页以来的XHR/fetch JSON响应）"""
         datacenters = []
         
+        if self.network is None:
+            return datacenters
+        
         try:
-            # 这里可以添加网络监听逻辑
-            # 由于Selenium的限制，我们主要依靠前两种方法
-            pass
+            for url, data in self.network.collect():
+                for item in iter_locations(data):
+                    lat, lng = item['latitude'], item['longitude']
+                    if 30.6 <= lat <= 31.9 and 120.8 <= lng <= 122.2:
+                        datacenters.append({
+                            'name': item['name'] or f"数据中心_{len(datacenters)+1}",
+                            'latitude': lat,
+                            'longitude': lng,
+                            'location': '上海市',
+                            'source_page': page_num,
+                            'extraction_method': 'Network',
+                            'source_url': url,
+                            'raw_data': item
+                        })
+            
+            if datacenters:
+                print(f"      网络响应中获取到 {len(datacenters)} 个数据中心")
         except Exception as e:
             print(f"      网络提取失败: {e}")
         
@@ -646,7 +693,11 @@ class JavaScriptPaginationCrawler:
         
         finally:
             if self.driver:
-                self.driver.quit()
+                # 归还浏览器池，按处理的页数累计，达到上限后回收
+                self.driver_pool.release(self.driver, pages=max(len(self.page_data), 1))
+                self.driver = None
+                self.network = None
+            self.driver_pool.print_stats()
     
     def deduplicate_datacenters(self, datacenters):
         """去重数据中心"""
@@ -11,6 +11,7 @@ import json
 import time
 import os
 import re
+import sys
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -19,6 +20,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
 
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from driver_pool import shared_pool
+
 class RealButtonCrawler:
     def __init__(self):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
@@ -41,6 +46,8 @@ class RealButtonCrawler:
         self.chrome_options.add_argument('--disable-features=VizDisplayCompositor')
         
         self.driver = None
+        # 共享浏览器池：同一进程内多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('real_button', self.create_driver)
         self.all_datacenters = []
         self.page_data = {}
         
@@ -48,10 +55,18 @@ class RealButtonCrawler:
         os.makedirs("data/shanghai", exist_ok=True)
         os.makedirs("html_sources/shanghai", exist_ok=True)
     
+    def create_driver(self):
+        """启动一个Chrome浏览器（由浏览器池调用）"""
+        return webdriver.Chrome(options=self.chrome_options)
+    
     def setup_driver(self):
-        """初始化WebDriver"""
+        """从浏览器池租用WebDriver"""
         try:
-            self.driver = webdriver.Chrome(options=self.chrome_options)
+            self.driver = self.driver_pool.acquire()
+            if self.driver is None:
+                # 浏览器池等待超时或浏览器启动失败
+                print("❌ 无法启动浏览器，WebDriver初始化失败")
+                return False
             self.driver.implicitly_wait(10)
             print("✅ WebDriver初始化成功")
             return True
@@ -394,7 +409,10 @@ class RealButtonCrawler:
         
         finally:
             if self.driver:
-                self.driver.quit()
+                # 归还浏览器池，按处理的页数累计，达到上限后回收
+                self.driver_pool.release(self.driver, pages=max(len(self.page_data), 1))
+                self.driver = None
+            self.driver_pool.print_stats()
     
     def deduplicate_datacenters(self, datacenters):
         """去重数据中心"""
@@ -5,21 +5,30 @@ Selenium真实翻页爬虫
 模拟点击页面按钮进行翻页，获取每页真实数据
 """
 
+import argparse
 import json
 import time
 import os
 import re
+import sys
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from driver_pool import shared_pool
+from lean_profile import apply_lean_options, block_resources
+from extraction_cascade import ExtractionCascade, coordinate_key, expected_count, reported_totals
+from page_readiness import PageReadiness
+
+# 地图标记元素，数量稳定后视为本页数据渲染完成
+MARKER_SELECTOR = "gmp-advanced-marker, [data-lat], [data-latitude]"
 
 class RealPaginationCrawler:
-    def __init__(self):
+    def __init__(self, lean=False):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
         # 设置Chrome选项
@@ -31,24 +40,54 @@ class RealPaginationCrawler:
         self.chrome_options.add_argument('--disable-gpu')
         self.chrome_options.add_argument('--window-size=1920,1080')
         self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        # 默认使用可见浏览器便于调试；lean=True（命令行 --lean）时启用精简配置：无头模式、限制窗口大小，浏览器启动后拦截图片/字体/地图瓦片/统计脚本
+        self.lean = lean
+        if lean:
+            apply_lean_options(self.chrome_options)
         
         self.driver = None
+        # 共享浏览器池：同一进程内多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('real_pagination_lean' if lean else 'real_pagination', self.create_driver)
         self.wait = None
+        self.readiness = None
         self.all_datacenters = []
         self.page_data = {}
         
+        # 页面报告的每页数量和总数，加载主页面后读取；单页达到预期数量后不再执行更昂贵的提取方法
+        self.page_size = None
+        self.expected_total = None
+        
+        # 提取方法按成本从低到高执行（单页去重精确到小数点后5位）
+        self.extraction = (ExtractionCascade(key=lambda dc: coordinate_key(dc, precision=5))
+            .add('JavaScript变量', self.extract_from_javascript_vars, cost=1)
+            .add('正则匹配', self.extract_from_page_source, cost=2)
+            .add('DOM元素', self.extract_from_dom_elements, cost=4))
+        
         # 创建输出目录
         os.makedirs("data/shanghai", exist_ok=True)
         os.makedirs("html_sources/shanghai", exist_ok=True)
     
+    def create_driver(self):
+        """启动一个Chrome浏览器（由浏览器池调用）"""
+        driver = webdriver.Chrome(options=self.chrome_options)
+        if self.lean:
+            block_resources(driver)
+        return driver
+    
     def setup_driver(self):
-        """初始化WebDriver"""
+        """从浏览器池租用WebDriver"""
         try:
             # 尝试初始化Chrome WebDriver
             print("🔧 初始化Chrome WebDriver...")
-            self.driver = webdriver.Chrome(options=self.chrome_options)
+            self.driver = self.driver_pool.acquire()
+            if self.driver is None:
+                # 浏览器池等待超时或浏览器启动失败
+                print("❌ 无法启动浏览器，WebDriver初始化失败")
+                return False
             self.driver.implicitly_wait(10)
             self.wait = WebDriverWait(self.driver, 15)
+            # DOM变化和网络请求静默后即视为渲染完成，不再固定等待
+            self.readiness = PageReadiness(self.driver, timeout=15).install()
             print("✅ WebDriver初始化成功")
             return True
         except Exception as e:
@@ -64,17 +103,16 @@ class RealPaginationCrawler:
             self.driver.get(self.base_url)
             print("  页面已加载，等待内容渲染...")
             
-            # 等待页面主要内容加载
-            time.sleep(5)
-            
-            # 等待地图或数据加载完成
-            try:
-                # 等待某个关键元素出现
-                self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                print("  ✅ 页面内容加载完成")
-            except TimeoutException:
+            # 等待地图标记出现、网络空闲且DOM不再变化
+            start = time.time()
+            if self.readiness.wait(selector=MARKER_SELECTOR, min_count=1):
+                print(f"  ✅ 页面内容加载完成 ({time.time() - start:.1f}s)")
+            else:
                 print("  ⚠️ 页面加载超时，但继续执行")
             
+            self.expected_total, self.page_size = reported_totals(self.driver.page_source)
+            print(f"  📋 页面报告: 共 {self.expected_total} 个, 每页 {self.page_size} 个")
+            
             return True
             
         except Exception as e:
@@ -159,7 +197,7 @@ class RealPaginationCrawler:
                                         page_numbers.append(int(data_page))
                                 except:
                                     continue
-                              if page_numbers:
+                            if page_numbers:
                                 pagination_info['total_pages'] = max(page_numbers)
                                 pagination_info['page_buttons'] = elements
                                 print(f"  ✅ 总页数: {pagination_info['total_pages']}")
@@ -167,6 +205,8 @@ class RealPaginationCrawler:
                                 break
                     except Exception:
                         continue
+            except Exception:
+                pass
         
         # 查找"下一页"按钮
         next_button_patterns = [
@@ -196,40 +236,28 @@ class RealPaginationCrawler:
         
         return pagination_info
     
-    def extract_current_page_data(self, page_num):
-        """提取当前页面的数据"""
+    def wait_for_page_change(self, mark):
+        """等待翻页操作引起的DOM更新和数据请求完成"""
+        start = time.time()
+        if self.readiness.wait(selector=MARKER_SELECTOR, since=mark):
+            print(f"    ⏱️ 页面已更新 ({time.time() - start:.1f}s)")
+        else:
+            print(f"    ⚠️ 等待页面更新超时 ({time.time() - start:.1f}s)")
+    
+    def extract_current_page_data(self, page_num, expected=None):
+        """提取当前页面的数据（expected 为本页预期数量）"""
         print(f"  📊 提取第 {page_num} 页数据...")
         
-        datacenters = []
-        
         try:
-            # 等待页面加载完成
-            time.sleep(3)
+            # 等待本页渲染稳定（已稳定时立即返回）
+            self.readiness.wait(selector=MARKER_SELECTOR)
             
             # 保存当前页面HTML
             with open(f"html_sources/shanghai/page_{page_num}.html", 'w', encoding='utf-8') as f:
                 f.write(self.driver.page_source)
             
-            # 方法1: 从JavaScript变量中提取数据
-            js_data = self.extract_from_javascript_vars(page_num)
-            if js_data:
-                datacenters.extend(js_data)
-                print(f"    JavaScript变量提取: {len(js_data)} 个")
-            
-            # 方法2: 从页面源码的正则匹配提取
-            regex_data = self.extract_from_page_source(page_num)
-            if regex_data:
-                datacenters.extend(regex_data)
-                print(f"    正则匹配提取: {len(regex_data)} 个")
-            
-            # 方法3: 从DOM元素提取
-            dom_data = self.extract_from_dom_elements(page_num)
-            if dom_data:
-                datacenters.extend(dom_data)
-                print(f"    DOM元素提取: {len(dom_data)} 个")
-            
-            # 去重当前页面数据
-            unique_datacenters = self.deduplicate_page_data(datacenters)
+            # JavaScript变量、页面源码正则、DOM元素按成本依次提取，结果已去重
+            unique_datacenters = self.extraction.run(page_num, expected=expected)
             
             print(f"    ✅ 第 {page_num} 页总计: {len(unique_datacenters)} 个数据中心")
             return unique_datacenters
@@ -396,19 +424,6 @@ class RealPaginationCrawler:
         
         return datacenters
     
-    def deduplicate_page_data(self, datacenters):
-        """去重单页数据"""
-        unique_datacenters = []
-        seen_coords = set()
-        
-        for dc in datacenters:
-            coord_key = (round(dc['latitude'], 5), round(dc['longitude'], 5))
-            if coord_key not in seen_coords:
-                seen_coords.add(coord_key)
-                unique_datacenters.append(dc)
-        
-        return unique_datacenters
-    
     def click_next_page(self, target_page, pagination_info):
         """点击到指定页面"""
         print(f"  🖱️ 点击到第 {target_page} 页...")
@@ -426,14 +441,14 @@ class RealPaginationCrawler:
                             
                             # 滚动到按钮位置
                             self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(1)
                             
                             # 点击按钮
+                            mark = self.readiness.mark()
                             self.driver.execute_script("arguments[0].click();", button)
                             print(f"    ✅ 已点击第 {target_page} 页按钮")
                             
-                            # 等待页面加载
-                            time.sleep(5)
+                            # 等待点击引起的更新完成
+                            self.wait_for_page_change(mark)
                             return True
                     except Exception as e:
                         continue
@@ -443,14 +458,14 @@ class RealPaginationCrawler:
                 try:
                     # 滚动到下一页按钮
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", pagination_info['next_button'])
-                    time.sleep(1)
                     
                     # 点击下一页
+                    mark = self.readiness.mark()
                     self.driver.execute_script("arguments[0].click();", pagination_info['next_button'])
                     print(f"    ✅ 已点击下一页按钮")
                     
-                    # 等待页面加载
-                    time.sleep(5)
+                    # 等待点击引起的更新完成
+                    self.wait_for_page_change(mark)
                     return True
                 except Exception as e:
                     print(f"    ❌ 点击下一页失败: {e}")
@@ -466,8 +481,9 @@ class RealPaginationCrawler:
             
             for func in js_functions:
                 try:
+                    mark = self.readiness.mark()
                     self.driver.execute_script(func)
-                    time.sleep(3)
+                    self.wait_for_page_change(mark)
                     print(f"    ✅ 执行JavaScript: {func}")
                     return True
                 except:
@@ -518,7 +534,8 @@ class RealPaginationCrawler:
                         continue
                 
                 # 提取当前页数据
-                page_data = self.extract_current_page_data(page_num)
+                expected = expected_count(self.expected_total, self.page_size, len(all_datacenters)) or None
+                page_data = self.extract_current_page_data(page_num, expected=expected)
                 
                 if page_data:
                     all_datacenters.extend(page_data)
@@ -527,12 +544,10 @@ class RealPaginationCrawler:
                 else:
                     print(f"    ⚠️ 第 {page_num} 页未获取到数据")
                     self.page_data[f'page_{page_num}'] = []
-                
-                # 页面间延迟
-                time.sleep(2)
             
             # 4. 最终去重
             unique_datacenters = self.final_deduplicate(all_datacenters)
+            self.extraction.print_stats()
             
             # 5. 输出统计信息
             print(f"\n{'='*70}")
@@ -556,8 +571,11 @@ class RealPaginationCrawler:
         
         finally:
             if self.driver:
-                self.driver.quit()
-                print("🔚 WebDriver已关闭")
+                # 归还浏览器池，按处理的页数累计，达到上限后回收
+                self.driver_pool.release(self.driver, pages=max(len(self.page_data), 1))
+                self.driver = None
+                print("🔚 WebDriver已归还浏览器池")
+            self.driver_pool.print_stats()
     
     def final_deduplicate(self, datacenters):
         """最终去重处理"""
@@ -645,11 +663,16 @@ class RealPaginationCrawler:
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="上海数据中心真实翻页爬虫")
+    parser.add_argument('--lean', action='store_true',
+                        help='精简模式：无头浏览器并拦截图片/字体/地图瓦片/统计脚本')
+    args = parser.parse_args()
+    
     print("🎯 上海数据中心真实翻页爬虫")
     print("🖱️ 通过Selenium模拟点击页面按钮实现翻页")
     print("📄 目标：第1页40个，第2页14个，共54个数据中心")
     
-    crawler = RealPaginationCrawler()
+    crawler = RealPaginationCrawler(lean=args.lean)
     
     try:
         # 运行真实翻页爬虫
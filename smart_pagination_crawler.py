@@ -5,17 +5,31 @@ JavaScript翻页检测和爬取工具
 不依赖WebDriver，使用requests-html或其他方法处理JavaScript翻页
 """
 
-import requests
 import json
 import time
 import os
+import sys
 import re
 from datetime import datetime
 from bs4 import BeautifulSoup
 import threading
 
+# 共享模块位于 src/ 目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from dom_query import DomQuery, attribute_selector, tag_selector
+from fetch_client import FetchClient
+from snapshot_replay import parse_replay_args, replay_snapshots
+
+# 页面结构分析只需要分页控件；坐标提取只需要带坐标属性的元素
+PAGE_STRUCTURE_QUERY = DomQuery({
+    'pagination': tag_selector('a', 'button'),
+})
+COORDINATE_QUERY = DomQuery({
+    'coordinates': attribute_selector('data-lat', 'data-latitude', 'lat'),
+})
+
 class SmartPaginationCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
         self.headers = {
@@ -29,8 +43,8 @@ class SmartPaginationCrawler:
             'DNT': '1',
         }
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
         
         self.all_datacenters = []
         self.page_data = {}
@@ -44,7 +58,7 @@ class SmartPaginationCrawler:
         print("🔍 分析页面的JavaScript翻页机制...")
         
         try:
-            response = self.session.get(self.base_url, timeout=30)
+            response = self.client.get(self.base_url, headers=self.headers, timeout=30)
             if response.status_code != 200:
                 print(f"❌ 页面请求失败: {response.status_code}")
                 return None
@@ -53,10 +67,10 @@ class SmartPaginationCrawler:
             with open("html_sources/shanghai/original_page.html", 'w', encoding='utf-8') as f:
                 f.write(response.text)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            dom = PAGE_STRUCTURE_QUERY.run(response.text)
             
             analysis = {
-                'pagination_info': self.extract_pagination_info(response.text, soup),
+                'pagination_info': self.extract_pagination_info(response.text, dom),
                 'ajax_endpoints': self.find_ajax_endpoints(response.text),
                 'javascript_functions': self.find_javascript_pagination(response.text),
                 'data_structure': self.analyze_data_structure(response.text)
@@ -68,7 +82,7 @@ class SmartPaginationCrawler:
             print(f"❌ 页面分析失败: {e}")
             return None
     
-    def extract_pagination_info(self, content, soup):
+    def extract_pagination_info(self, content, dom):
         """提取分页信息"""
         pagination_info = {
             'total_pages': 0,
@@ -106,9 +120,11 @@ class SmartPaginationCrawler:
                     continue
         
         # 查找分页按钮
-        pagination_elements = soup.find_all(['a', 'button'], string=re.compile(r'\d+'))
         page_numbers = []
-        for elem in pagination_elements:
+        # 只看元素自身的唯一文本（与 find_all(string=...) 相同）
+        for elem in dom['pagination']:
+            if elem.string is None or not re.search(r'\d+', elem.string):
+                continue
             text = elem.get_text(strip=True)
             if text.isdigit():
                 page_numbers.append(int(text))
@@ -288,7 +304,7 @@ class SmartPaginationCrawler:
             
             for params in param_combinations:
                 try:
-                    response = self.session.get(url, params=params, timeout=20)
+                    response = self.client.get(url, headers=self.headers, params=params, timeout=20)
                     if response.status_code == 200:
                         # 尝试解析为JSON
                         try:
@@ -318,7 +334,7 @@ class SmartPaginationCrawler:
         
         try:
             # 首先获取页面中的表单信息
-            response = self.session.get(self.base_url, timeout=30)
+            response = self.client.get(self.base_url, headers=self.headers, timeout=30)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
@@ -356,7 +372,7 @@ class SmartPaginationCrawler:
                                 else:
                                     post_url = f"https://www.datacenters.com{action}"
                                 
-                                post_response = self.session.post(post_url, data=post_data, timeout=20)
+                                post_response = self.client.post(post_url, headers=self.headers, data=post_data, timeout=20)
                                 
                                 if post_response.status_code == 200:
                                     page_results = self.extract_from_html(post_response.text, f"post_page_{page_param}")
@@ -410,7 +426,7 @@ class SmartPaginationCrawler:
         
         for params in param_sets:
             try:
-                response = self.session.get(self.base_url, params=params, timeout=20)
+                response = self.client.get(self.base_url, headers=self.headers, params=params, timeout=20)
                 
                 if response.status_code == 200:                    # 检查是否获得了不同的数据
                     param_str = str(params).replace(' ', '').replace(':', '').replace(',', '_').replace('{', '').replace('}', '').replace("'", '')
@@ -433,7 +449,7 @@ class SmartPaginationCrawler:
         
         try:
             # 获取原始页面
-            response = self.session.get(self.base_url, timeout=30)
+            response = self.client.get(self.base_url, headers=self.headers, timeout=30)
             if response.status_code != 200:
                 return results
             
@@ -457,7 +473,7 @@ class SmartPaginationCrawler:
                         'Accept': 'application/json, text/javascript, */*; q=0.01',
                     }
                     
-                    js_response = self.session.get(full_url, headers=ajax_headers, timeout=20)
+                    js_response = self.client.get(full_url, headers=ajax_headers, timeout=20)
                     
                     if js_response.status_code == 200:
                         try:
@@ -523,12 +539,8 @@ class SmartPaginationCrawler:
         
         # HTML结构化数据提取
         try:
-            soup = BeautifulSoup(content, 'html.parser')
-            
             # 查找带坐标属性的元素
-            coord_elements = (soup.find_all(attrs={'data-lat': True}) + 
-                            soup.find_all(attrs={'data-latitude': True}) +
-                            soup.find_all(attrs={'lat': True}))
+            coord_elements = COORDINATE_QUERY.run(content)['coordinates']
             
             for elem in coord_elements:
                 try:
@@ -640,20 +652,25 @@ class SmartPaginationCrawler:
         
         return 1  # 默认第1页
     
-    def run_smart_crawl(self):
-        """运行智能翻页爬虫"""
+    def run_smart_crawl(self, snapshot_dir=None):
+        """运行智能翻页爬虫（指定 snapshot_dir 时离线回放保存的HTML快照）"""
         print("🚀 上海数据中心智能翻页爬虫启动")
         print("🎯 目标：通过多种方法获取所有54个数据中心")
         print("="*70)
         
-        # 1. 分析页面结构
-        analysis = self.analyze_page_structure()
-        if not analysis:
-            print("❌ 页面分析失败")
-            return []
-        
-        # 2. 尝试不同的翻页方法
-        all_results, methods = self.try_different_pagination_approaches()
+        if snapshot_dir:
+            # 离线回放：跳过网络分析，直接用快照驱动提取
+            all_results = replay_snapshots(snapshot_dir, self.extract_from_html)
+            methods = ['snapshot_replay']
+        else:
+            # 1. 分析页面结构
+            analysis = self.analyze_page_structure()
+            if not analysis:
+                print("❌ 页面分析失败")
+                return []
+            
+            # 2. 尝试不同的翻页方法
+            all_results, methods = self.try_different_pagination_approaches()
         
         # 3. 去重处理
         unique_results = self.deduplicate_results(all_results)
@@ -779,6 +796,8 @@ class SmartPaginationCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("上海数据中心智能翻页爬虫")
+    
     print("🎯 上海数据中心智能翻页爬虫")
     print("🔄 不依赖WebDriver的JavaScript翻页处理")
     print("📄 目标：第1页40个，第2页14个，共54个数据中心")
@@ -787,7 +806,7 @@ def main():
     
     try:
         # 运行智能爬虫
-        results = crawler.run_smart_crawl()
+        results = crawler.run_smart_crawl(snapshot_dir=replay_dir)
         
         if results:
             print(f"\n🎉 智能爬取完成！")
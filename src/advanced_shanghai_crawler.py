@@ -9,19 +9,22 @@ import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 import urllib.parse
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from fetch_client import FetchClient
+from circuit_breaker import CircuitOpenError
+from snapshot_replay import parse_replay_args, replay_snapshots
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AdvancedShanghaiDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         # 多种URL策略
         self.base_urls = [
             "https://www.datacenters.com/locations/china/shanghai/shanghai",
@@ -100,10 +103,9 @@ class AdvancedShanghaiDataCenterCrawler:
         
         self.all_results = []
         self.unique_coordinates = set()
-        self.session = requests.Session()
         
         # 设置高级请求头
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
@@ -115,7 +117,10 @@ class AdvancedShanghaiDataCenterCrawler:
             'Sec-Fetch-Mode': 'navigate',
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0',
-        })
+        }
+        
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
         
         # 创建输出目录
         self.create_output_directories()
@@ -153,25 +158,21 @@ class AdvancedShanghaiDataCenterCrawler:
         
         return closest_district
     
-    def fetch_url_with_retry(self, url, max_retries=3):
-        """带重试的URL获取"""
-        for attempt in range(max_retries):
-            try:
-                # 添加随机延迟避免被封IP
-                time.sleep(1 + attempt * 0.5)
-                
-                response = self.session.get(url, timeout=30)
-                if response.status_code == 200:
-                    return response.text
-                elif response.status_code == 404:
-                    return None  # 页面不存在
-                else:
-                    logger.warning(f"⚠️ URL {url} 返回状态码: {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"⚠️ 请求失败 (尝试 {attempt+1}/{max_retries}): {e}")
-                if attempt == max_retries - 1:
-                    return None
+    def fetch_url_with_retry(self, url):
+        """带重试的URL获取（请求限速、指数退避重试和端点熔断由共享客户端处理）"""
+        try:
+            response = self.client.get(url, headers=self.headers, timeout=30)
+        except CircuitOpenError:
+            logger.warning(f"⏭️ 端点已熔断，跳过: {url}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"⚠️ 请求失败: {url} - {e}")
+            return None
+        
+        if response.status_code == 200:
+            return response.text
+        elif response.status_code != 404:  # 404 表示页面不存在
+            logger.warning(f"⚠️ URL {url} 返回状态码: {response.status_code}")
         
         return None
     
@@ -451,9 +452,15 @@ class AdvancedShanghaiDataCenterCrawler:
         logger.info(f"\n🎉 爬取完成！")
         logger.info(f"📊 原始数据: {len(all_data)} 个")
         logger.info(f"✅ 去重后: {len(unique_data)} 个上海市数据中心")
+        self.client.retry.print_stats()
         
         return unique_data
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        self.all_results = replay_snapshots(snapshot_dir, self.extract_data_from_content)
+        return self.all_results
+    
     def save_results(self):
         """保存结果"""
         if not self.all_results:
@@ -608,6 +615,8 @@ class AdvancedShanghaiDataCenterCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("高级上海市数据中心爬虫")
+    
     print("🚀 高级上海市数据中心爬虫启动")
     print("🎯 目标：通过多种策略获取80+个数据中心")
     print("🔧 技术：多URL + 分页 + API + 并发爬取")
@@ -616,7 +625,10 @@ def main():
     
     try:
         # 开始爬取
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
         
         if results:
             # 显示结果摘要
@@ -4,22 +4,24 @@
 直接测试目标网站的HTML结构
 """
 
-import requests
 from bs4 import BeautifulSoup
 import re
 import json
 
-def test_direct_request():
+from fetch_client import FetchClient
+
+def test_direct_request(client=None):
     """直接请求页面内容"""
     url = "https://www.datacenters.com/locations/china/sichuan-sheng"
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
+    client = client or FetchClient(headers=headers)
     
     try:
         print(f"请求URL: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = client.get(url, headers=headers, timeout=30)
         print(f"状态码: {response.status_code}")
         
         if response.status_code == 200:
@@ -5,21 +5,28 @@
 使用webdriver-manager自动下载和管理ChromeDriver
 """
 
+import argparse
 import time
 import json
 import csv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 
+from driver_pool import shared_pool
+from page_readiness import PageReadiness
+from lean_profile import apply_lean_options, block_resources
+from marker_harvest import harvest_markers, click_marker, collect_texts
+
+# 地图标记元素，数量稳定后视为地图渲染完成
+MARKER_SELECTOR = "gmp-advanced-marker[position], [position*=',']"
+
 class AutoDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, lean=False):
         self.provinces_urls = {
             "四川省": "https://www.datacenters.com/locations/china/sichuan-sheng",
             "云南省": "https://www.datacenters.com/locations/china/yunnan-sheng", 
@@ -27,6 +34,12 @@ class AutoDataCenterCrawler:
         }
         self.results = []
         
+        # 默认使用可见浏览器便于调试；lean=True（命令行 --lean）时启用精简配置：无头模式、限制窗口大小，浏览器启动后拦截图片/字体/地图瓦片/统计脚本
+        self.lean = lean
+        
+        # 共享浏览器池：多个省份和多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('auto_datacenter_lean' if lean else 'auto_datacenter', self.setup_driver)
+        
     def setup_driver(self):
         """自动设置Chrome浏览器和驱动"""
         try:
@@ -41,10 +54,14 @@ class AutoDataCenterCrawler:
             chrome_options.add_argument('--allow-running-insecure-content')
             chrome_options.add_argument('--window-size=1920,1080')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            if self.lean:
+                apply_lean_options(chrome_options)
             
             # 使用webdriver-manager自动管理ChromeDriver
             service = Service(ChromeDriverManager().install())
             driver = webdriver.Chrome(service=service, options=chrome_options)
+            if self.lean:
+                block_resources(driver)
             
             print("ChromeDriver配置成功！")
             return driver
@@ -64,16 +81,12 @@ class AutoDataCenterCrawler:
                 lambda d: d.execute_script("return document.readyState") == "complete"
             )
             
-            # 额外等待时间让地图渲染
-            time.sleep(15)
-            
-            # 尝试等待地图相关元素
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "[position]"))
-                )
-                print("检测到地图标记元素")
-            except TimeoutException:
+            # 等待地图标记出现且数量稳定、网络空闲，渲染完成即返回
+            start = time.time()
+            state = PageReadiness(driver, timeout=25).wait(selector=MARKER_SELECTOR, min_count=1)
+            if state:
+                print(f"检测到地图标记元素: {state['count']} 个 ({time.time() - start:.1f}s)")
+            else:
                 print("未检测到地图标记，但继续执行...")
             
             return True
@@ -83,72 +96,36 @@ class AutoDataCenterCrawler:
             return False
     
     def find_all_markers(self, driver):
-        """查找所有地图标记"""
+        """查找所有地图标记（一次脚本调用采集坐标、title、aria-label和聚合数量）"""
         print("正在查找地图标记...")
         
-        # 多种选择器策略
-        selectors = [
-            "gmp-advanced-marker[position]",
-            "[position*=',']",
-            "gmp-advanced-marker",
-            "[tabindex='-1'][position]",
-            ".yNHHyP-marker-view",
-            "[role='button'][position]"
-        ]
-        
-        all_elements = []
-        
-        for selector in selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    print(f"选择器 '{selector}' 找到 {len(elements)} 个元素")
-                    all_elements.extend(elements)
-            except Exception as e:
-                print(f"选择器 '{selector}' 执行失败: {e}")
-        
-        # 过滤出有position属性的元素
-        valid_markers = []
-        seen_positions = set()
-        
-        for element in all_elements:
-            try:
-                position = element.get_attribute("position")
-                if position and "," in position and position not in seen_positions:
-                    valid_markers.append(element)
-                    seen_positions.add(position)
-            except:
-                continue
+        try:
+            markers = harvest_markers(driver)
+        except Exception as e:
+            print(f"标记采集失败: {e}")
+            return []
         
-        print(f"找到 {len(valid_markers)} 个有效的地图标记")
-        return valid_markers
+        print(f"找到 {len(markers)} 个有效的地图标记")
+        return markers
     
     def extract_marker_data(self, driver, marker, index):
-        """提取单个标记的数据"""
+        """提取单个标记的数据（marker 为 harvest_markers 返回的记录）"""
         try:
-            position = marker.get_attribute("position")
-            if not position or "," not in position:
-                return None
-            
-            # 解析坐标
-            coords = position.split(",")
-            lat = float(coords[0].strip())
-            lng = float(coords[1].strip())
+            lat = marker['latitude']
+            lng = marker['longitude']
             
             print(f"处理标记 {index}: 坐标 ({lat}, {lng})")
             
-            # 尝试获取更多信息
-            name = "未知位置"
+            # 标记自带的标题作为名称，点击后的信息窗口补充地址
+            name = marker['title'] or marker['aria_label'] or "未知位置"
             address = ""
             
             try:
-                # 滚动到元素可见区域
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", marker)
-                time.sleep(1)
-                
-                # 尝试点击获取信息
-                driver.execute_script("arguments[0].click();", marker)
-                time.sleep(3)
+                # 滚动到标记并点击获取信息，等待信息窗口渲染完成
+                readiness = PageReadiness(driver, timeout=3)
+                mark = readiness.mark()
+                if click_marker(driver, marker['id']):
+                    readiness.wait(since=mark)
                 
                 # 查找信息窗口或弹出内容
                 info_selectors = [
@@ -163,22 +140,13 @@ class AutoDataCenterCrawler:
                     "[class*='address']"
                 ]
                 
-                for selector in info_selectors:
-                    try:
-                        info_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for elem in info_elements:
-                            text = elem.text.strip()
-                            if text and len(text) > 5:
-                                # 判断是否包含中国地址信息
-                                if any(keyword in text for keyword in ["China", "Sichuan", "Yunnan", "Guizhou", "四川", "云南", "贵州"]):
-                                    name = text
-                                    address = text
-                                    print(f"  找到位置信息: {text}")
-                                    break
-                    except:
-                        continue
-                    
-                    if name != "未知位置":
+                for text in collect_texts(driver, info_selectors):
+                    # 判断是否包含中国地址信息
+                    if any(keyword in text for keyword in ["China", "Sichuan", "Yunnan", "Guizhou", "四川", "云南", "贵州"]):
+                        if name == "未知位置":
+                            name = text
+                        address = text
+                        print(f"  找到位置信息: {text}")
                         break
                 
             except Exception as e:
@@ -191,7 +159,8 @@ class AutoDataCenterCrawler:
                 'longitude': lng,
                 'name': name,
                 'address': address,
-                'position_raw': position
+                'position_raw': marker['position'],
+                'cluster_count': None
             }
             
             return marker_data
@@ -200,6 +169,20 @@ class AutoDataCenterCrawler:
             print(f"处理标记 {index} 时出错: {e}")
             return None
     
+    def build_cluster_record(self, marker, index):
+        """聚合点记录：只有位置和数量，不点击（点击会缩放地图，其余标记的编号随之失效）"""
+        count = marker['cluster_count']
+        print(f"处理标记 {index}: 聚合点 ({marker['latitude']}, {marker['longitude']}) 包含 {count} 个数据中心")
+        return {
+            'index': index,
+            'latitude': marker['latitude'],
+            'longitude': marker['longitude'],
+            'name': f"聚合点（{count}个数据中心）",
+            'address': "",
+            'position_raw': marker['position'],
+            'cluster_count': count
+        }
+    
     def crawl_province(self, province_name, url):
         """爬取单个省份的数据"""
         print(f"\n{'='*60}")
@@ -207,10 +190,12 @@ class AutoDataCenterCrawler:
         print(f"URL: {url}")
         print(f"{'='*60}")
         
-        driver = self.setup_driver()
+        driver = self.driver_pool.acquire()
         if not driver:
             print(f"无法启动浏览器，跳过 {province_name}")
             return []
+        # 页面开始执行前注入DOM变化和网络请求记录
+        PageReadiness(driver).install()
         
         province_data = []
         
@@ -231,28 +216,31 @@ class AutoDataCenterCrawler:
                 print(f"在 {province_name} 未找到任何地图标记")
                 return []
             
+            # 聚合点没有名称，不点击，保留为带 cluster_count 的记录，放在单个标记之后
+            clusters = [marker for marker in markers if marker['cluster_count'] is not None]
+            if clusters:
+                markers = [marker for marker in markers if marker['cluster_count'] is None]
+                print(f"其中 {len(clusters)} 个聚合点（共 {sum(c['cluster_count'] for c in clusters)} 个数据中心未展开）")
+            
             # 提取每个标记的数据
             print(f"开始提取 {len(markers)} 个标记的数据...")
             
-            for i, marker in enumerate(markers, 1):
-                marker_data = self.extract_marker_data(driver, marker, i)
+            for i, marker in enumerate(markers + clusters, 1):
+                if marker['cluster_count'] is not None:
+                    marker_data = self.build_cluster_record(marker, i)
+                else:
+                    marker_data = self.extract_marker_data(driver, marker, i)
                 if marker_data:
                     marker_data['province'] = province_name
                     marker_data['source_url'] = url
                     province_data.append(marker_data)
-                
-                # 标记间稍作休息
-                time.sleep(1)
             
             print(f"{province_name} 爬取完成，共获取 {len(province_data)} 个数据中心")
             
         except Exception as e:
             print(f"爬取 {province_name} 时发生错误: {e}")
         finally:
-            try:
-                driver.quit()
-            except:
-                pass
+            self.driver_pool.release(driver)
         
         return province_data
     
@@ -263,6 +251,9 @@ class AutoDataCenterCrawler:
         print("目标省份: 四川省、云南省、贵州省")
         print("=" * 80)
         
+        # 省份逐个爬取，同时只租用一个浏览器；提前在后台启动，第一个省份不必等待
+        self.driver_pool.warm_up(1)
+        
         for province, url in self.provinces_urls.items():
             try:
                 province_data = self.crawl_province(province, url)
@@ -277,6 +268,7 @@ class AutoDataCenterCrawler:
                 print(f"处理 {province} 时出错: {e}")
                 continue
         
+        self.driver_pool.print_stats()
         return self.results
     
     def save_data(self):
@@ -324,6 +316,10 @@ class AutoDataCenterCrawler:
         for province, count in province_stats.items():
             print(f"  {province}: {count} 个数据中心")
         
+        clusters = [result for result in self.results if result.get('cluster_count') is not None]
+        if clusters:
+            print(f"\n其中聚合点 {len(clusters)} 个，共包含 {sum(c['cluster_count'] for c in clusters)} 个数据中心（未逐个展开）")
+        
         print(f"\n详细列表:")
         print("-" * 80)
         for i, result in enumerate(self.results, 1):
@@ -334,7 +330,12 @@ class AutoDataCenterCrawler:
 
 def main():
     """主函数"""
-    crawler = AutoDataCenterCrawler()
+    parser = argparse.ArgumentParser(description="数据中心自动爬虫")
+    parser.add_argument('--lean', action='store_true',
+                        help='精简模式：无头浏览器并拦截图片/字体/地图瓦片/统计脚本')
+    args = parser.parse_args()
+    
+    crawler = AutoDataCenterCrawler(lean=args.lean)
     
     try:
         # 执行爬取
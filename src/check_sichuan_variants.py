@@ -4,22 +4,24 @@
 检查新发现的四川省URL变体
 """
 
-import requests
 import re
 import json
 
-def check_si_chuan_sheng():
+from fetch_client import FetchClient
+
+def check_si_chuan_sheng(client=None):
     """检查 si-chuan-sheng URL"""
     
     url = 'https://www.datacenters.com/locations/china/si-chuan-sheng'
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
+    client = client or FetchClient(headers=headers)
     
     print(f'检查新发现的四川省URL: {url}')
     
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = client.get(url, headers=headers, timeout=15)
         print(f'状态码: {response.status_code}')
         
         if response.status_code == 200:
@@ -76,7 +78,7 @@ def check_si_chuan_sheng():
     
     return [], [], []
 
-def check_all_sichuan_variants():
+def check_all_sichuan_variants(client=None):
     """检查所有可能的四川省URL变体"""
     
     sichuan_urls = [
@@ -89,6 +91,7 @@ def check_all_sichuan_variants():
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
+    client = client or FetchClient(headers=headers)
     
     all_found_data = []
     
@@ -98,7 +101,7 @@ def check_all_sichuan_variants():
     for url in sichuan_urls:
         print(f'\n检查: {url}')
         try:
-            response = requests.get(url, headers=headers, timeout=15)
+            response = client.get(url, headers=headers, timeout=15)
             print(f'状态: {response.status_code}')
             
             if response.status_code == 200:
@@ -146,13 +149,16 @@ def main():
     print('检查四川省新URL变体')
     print('=' * 40)
     
+    # 两次检查共用一个连接池
+    client = FetchClient()
+    
     # 首先检查 si-chuan-sheng
-    lat_matches, lng_matches, names = check_si_chuan_sheng()
+    lat_matches, lng_matches, names = check_si_chuan_sheng(client=client)
     
     print('\n' + '=' * 60)
     
     # 然后检查所有变体
-    all_data = check_all_sichuan_variants()
+    all_data = check_all_sichuan_variants(client=client)
     
     # 保存结果
     if all_data:
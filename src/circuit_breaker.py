@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端点级熔断与重试
+按端点统计时间窗口内的失败次数，连续失败的端点熔断一段时间后只放行一次试探请求；
+重试采用带随机抖动的指数退避，并受整次运行的重试总预算约束
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+
+# 值得重试的临时性异常（连接失败、超时、传输中断）；URL错误、编程错误等不重试
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """端点处于熔断状态，请求未发出"""
+
+
+def endpoint_key(url):
+    """端点标识：协议 + 主机 + 路径（忽略查询参数）"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+
+class CircuitBreaker:
+    """单个端点的熔断器: closed -> open -> half_open -> closed/open"""
+
+    def __init__(self, failure_threshold=5, window_seconds=60, reset_timeout=30):
+        # window_seconds 内失败 failure_threshold 次即熔断
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        # 熔断多久后进入半开状态放行一次试探请求
+        self.reset_timeout = reset_timeout
+
+        self.state = 'closed'
+        self.failures = []
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self, now):
+        """判断当前是否允许发出请求"""
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and now - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+            self._probing = False
+        if self.state == 'half_open' and not self._probing:
+            # 半开状态只放行一个试探请求
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = []
+        self._probing = False
+
+    def record_failure(self, now):
+        if self.state == 'half_open':
+            # 试探失败，重新熔断
+            self.state = 'open'
+            self.opened_at = now
+            self._probing = False
+            return
+
+        self.failures = [t for t in self.failures if now - t < self.window_seconds]
+        self.failures.append(now)
+        if len(self.failures) >= self.failure_threshold:
+            self.state = 'open'
+            self.opened_at = now
+
+
+class RetryController:
+    """带熔断的重试执行器，一个实例对应一次运行的全部端点"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=30, retry_budget=100,
+                 failure_threshold=5, window_seconds=60, reset_timeout=30,
+                 retry_statuses=(429, 500, 502, 503, 504), dead_statuses=(), retry_exceptions=TRANSIENT_ERRORS):
+        # 单次调用的最多尝试次数（含第一次）
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # 整次运行允许的重试总次数，用完后每个请求只尝试一次
+        self.retry_budget = retry_budget
+        # 计为失败并重试的HTTP状态码
+        self.retry_statuses = set(retry_statuses)
+        # 计为失败但不重试的HTTP状态码（如探测接口时的404）
+        self.dead_statuses = set(dead_statuses)
+        # 计为失败并重试的异常类型，其他异常直接抛出，不计入熔断
+        self.retry_exceptions = tuple(retry_exceptions)
+
+        self.breaker_settings = {
+            'failure_threshold': failure_threshold,
+            'window_seconds': window_seconds,
+            'reset_timeout': reset_timeout,
+        }
+        self.breakers = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0, 'budget_exhausted': 0}
+
+    def _breaker(self, key):
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(**self.breaker_settings)
+            self.breakers[key] = breaker
+        return breaker
+
+    def is_open(self, key):
+        """端点当前是否处于熔断状态（不消耗半开试探名额）"""
+        with self._lock:
+            breaker = self.breakers.get(key)
+            if breaker is None or breaker.state == 'closed':
+                return False
+            if breaker.state == 'open':
+                return time.monotonic() - breaker.opened_at < breaker.reset_timeout
+            return breaker._probing
+
+    def backoff_delay(self, attempt):
+        """第 attempt 次重试前的等待时间：指数退避 + 全随机抖动"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _classify(self, result):
+        """返回 (是否失败, 是否值得重试)"""
+        status = getattr(result, 'status_code', None)
+        if status in self.retry_statuses:
+            return True, True
+        if status in self.dead_statuses:
+            return True, False
+        return False, False
+
+    def _take_retry(self):
+        with self._lock:
+            if self.retry_budget <= 0:
+                self.stats['budget_exhausted'] += 1
+                return False
+            self.retry_budget -= 1
+            self.stats['retries'] += 1
+            return True
+
+    def call(self, key, func, *args, max_attempts=None, **kwargs):
+        """通过端点 key 的熔断器执行 func
+
+        retry_exceptions 异常和 retry_statuses 状态码会按指数退避重试，其他异常直接抛出；
+        调用开始时端点已熔断则抛出 CircuitOpenError；重试过程中熔断或重试用尽时
+        返回最后一个响应，或抛出最后一个异常（熔断时为以其为起因的 CircuitOpenError）。
+        max_attempts 可覆盖实例默认的最多尝试次数。
+        """
+        max_attempts = max_attempts or self.max_attempts
+        with self._lock:
+            self.stats['calls'] += 1
+
+        error = None
+        result = None
+        for attempt in range(max_attempts):
+            with self._lock:
+                allowed = self._breaker(key).allow(time.monotonic())
+                if not allowed:
+                    self.stats['short_circuited'] += 1
+            if not allowed:
+                if error is not None:
+                    raise CircuitOpenError(f"端点已熔断: {key}") from error
+                if attempt > 0:
+                    return result
+                raise CircuitOpenError(f"端点已熔断: {key}")
+
+            error = None
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                failed, retryable = self._classify(result)
+            except self.retry_exceptions as e:
+                error = e
+                failed, retryable = True, True
+            except Exception:
+                # 非临时性错误与端点状态无关，不计入熔断，并归还半开状态的试探名额
+                with self._lock:
+                    self._breaker(key)._probing = False
+                raise
+
+            with self._lock:
+                breaker = self._breaker(key)
+                if failed:
+                    self.stats['failures'] += 1
+                    breaker.record_failure(time.monotonic())
+                else:
+                    breaker.record_success()
+
+            last_attempt = attempt == max_attempts - 1
+            if not failed or not retryable or last_attempt or not self._take_retry():
+                if error is not None:
+                    raise error
+                return result
+
+            time.sleep(self.backoff_delay(attempt))
+
+    def open_endpoints(self):
+        """当前处于熔断或半开状态的端点"""
+        with self._lock:
+            return [key for key, breaker in self.breakers.items() if breaker.state != 'closed']
+
+    def print_stats(self):
+        """打印重试与熔断统计"""
+        print(f"🔌 重试/熔断: 调用 {self.stats['calls']} 次, 失败 {self.stats['failures']} 次, "
+              f"重试 {self.stats['retries']} 次 (剩余预算 {self.retry_budget}), "
+              f"熔断拦截 {self.stats['short_circuited']} 次, 熔断端点 {len(self.open_endpoints())} 个")
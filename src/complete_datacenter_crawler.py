@@ -4,14 +4,86 @@
 完整版数据中心爬虫 - 获取所有遗漏的数据
 """
 
-import requests
 import re
 import json
 import pandas as pd
 import time
 
+from fetch_client import FetchClient
+from extraction_cache import ExtractionCache
+from hydration_extractor import EXTRACTOR_VERSION as HYDRATION_VERSION, build_records_from_locations, extract_locations
+from parallel_extract import ExtractionPool
+from pattern_scanner import MultiPatternScanner, NUMBER
+from record_assembler import BraceTracker, assemble_records
+from snapshot_replay import parse_replay_args, replay_snapshots
+
+# 川滇黔三省的坐标范围 (最小纬度, 最大纬度, 最小经度, 最大经度)
+SOUTHWEST_BOUNDS = (20, 35, 95, 115)
+# 页面解析逻辑版本，修改 parse_page 时递增，使提取结果缓存失效
+PAGE_EXTRACTOR_VERSION = f"2.{HYDRATION_VERSION}"
+# 数据中心名称关键词
+DATACENTER_NAME = re.compile(r'Data Center|IDC|数据中心', re.IGNORECASE)
+# 页面中的坐标和名称模式，合并为一个单遍扫描器
+PAGE_SCANNER = MultiPatternScanner([
+    ('latitude', '"latitude"', NUMBER, 0),
+    ('longitude', '"longitude"', NUMBER, 0),
+    ('name', '"name"', r'"([^"]*)"', re.IGNORECASE),
+    ('title', '"title"', r'"([^"]*)"', re.IGNORECASE),
+])
+
+
+def parse_number(value):
+    """把坐标文本转换为浮点数，格式不对时返回None"""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def clean_name_positions(names, titles, province):
+    """筛选带位置的名称：name 须包含数据中心关键词或省内地名，title 须包含数据中心关键词"""
+    region = re.compile(province.replace('省', '') + '|Sichuan|Yunnan|Guizhou', re.IGNORECASE)
+    candidates = [(offset, name.strip()) for offset, name in names
+                  if DATACENTER_NAME.search(name) or region.search(name)]
+    candidates.extend((offset, title.strip()) for offset, title in titles if DATACENTER_NAME.search(title))
+    return sorted((offset, name) for offset, name in candidates if len(name) > 3)
+
+
+def parse_page(content, province):
+    """解析页面（提取进程入口，不依赖爬虫状态）
+
+    返回 {'locations': 内嵌JSON位置对象, 'records': 按位置组装的 [纬度, 经度, 名称, 偏移量]}
+    """
+    # 优先解析页面内嵌的应用状态JSON，名称和坐标来自同一个位置对象
+    locations = extract_locations(content)
+    if locations:
+        return {'locations': locations, 'records': []}
+    
+    records = []
+    
+    try:
+        # 单遍扫描提取坐标和名称，保留每个匹配的位置
+        matches = PAGE_SCANNER.scan(content)
+        latitudes = [(offset, parse_number(lat)) for offset, lat in PAGE_SCANNER.positions(matches, 'latitude')]
+        longitudes = [(offset, parse_number(lng)) for offset, lng in PAGE_SCANNER.positions(matches, 'longitude')]
+        latitudes = [(offset, lat) for offset, lat in latitudes if lat is not None]
+        longitudes = [(offset, lng) for offset, lng in longitudes if lng is not None]
+        names = clean_name_positions(PAGE_SCANNER.positions(matches, 'name'),
+                                     PAGE_SCANNER.positions(matches, 'title'), province)
+        
+        print(f"  坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
+        print(f"  名称: 找到 {len(names)} 个")
+        
+        # 按页面位置组装：同一对象内的纬度和经度配对，名称取同一对象范围内最近的一个
+        records = [list(record) for record in assemble_records(latitudes, longitudes, names, BraceTracker(content))]
+    
+    except Exception as e:
+        print(f"  数据提取错误: {e}")
+    
+    return {'locations': [], 'records': records}
+
 class CompleteDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         # 包含所有可能的URL
         self.urls = {
             "四川省-全称": "https://www.datacenters.com/locations/china/sichuan-sheng",
@@ -35,137 +107,141 @@ class CompleteDataCenterCrawler:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
+        
+        # 页面提取进程数，None 表示按CPU核数
+        self.extract_workers = None
+        # 提取结果缓存：逐字节相同的页面只解析一次
+        self.extraction_cache = ExtractionCache()
+        
         self.all_results = []
         self.unique_coordinates = set()
     
     def extract_data_from_page(self, content, source_key):
         """从页面内容中提取数据"""
+        province = self.province_mapping[source_key]
+        # 相同正文和省份的解析结果直接取自提取缓存
+        parsed = self.extraction_cache.get_or_extract(
+            content, f"complete_page.{province}", PAGE_EXTRACTOR_VERSION, lambda text: parse_page(text, province)
+        )
+        return self.build_records(parsed, source_key)
+    
+    def build_records(self, parsed, source_key):
+        """把 parse_page 的结果转换为数据中心记录（跨数据源的坐标去重在这里完成）"""
+        province = self.province_mapping[source_key]
+        if parsed['locations']:
+            return build_records_from_locations(
+                parsed['locations'], SOUTHWEST_BOUNDS, {'province': province}, source_key, self.unique_coordinates,
+                default_name=f"{province}数据中心"
+            )
+        
         found_data = []
         
-        try:
-            # 提取坐标
-            latitudes = re.findall(r'"latitude":\s*([\d\.\-]+)', content)
-            longitudes = re.findall(r'"longitude":\s*([\d\.\-]+)', content)
-            
-            print(f"  坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
-            
-            if len(latitudes) != len(longitudes):
-                print(f"  警告: 纬度和经度数量不匹配")
-                return []
-            
-            # 提取数据中心名称
-            name_patterns = [
-                r'"name":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
-                r'"title":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
-                r'"name":\s*"([^"]*(?:' + self.province_mapping[source_key].replace('省', '') + '|Sichuan|Yunnan|Guizhou)[^"]*)"',
-            ]
+        # 组合数据：坐标和名称已按页面位置组装
+        for i, (lat_f, lng_f, name, _) in enumerate(parsed['records']):
+            # 验证坐标范围
+            if not (20 <= lat_f <= 35 and 95 <= lng_f <= 115):
+                continue
             
-            all_names = []
-            for pattern in name_patterns:
-                names = re.findall(pattern, content, re.IGNORECASE)
-                all_names.extend(names)
+            # 检查是否重复
+            coord_key = (round(lat_f, 6), round(lng_f, 6))
+            if coord_key in self.unique_coordinates:
+                print(f"  跳过重复坐标: ({lat_f}, {lng_f})")
+                continue
             
-            # 去重名称
-            unique_names = []
-            seen_names = set()
-            for name in all_names:
-                clean_name = name.strip()
-                if clean_name not in seen_names and len(clean_name) > 3:
-                    unique_names.append(clean_name)
-                    seen_names.add(clean_name)
+            self.unique_coordinates.add(coord_key)
             
-            print(f"  名称: 找到 {len(unique_names)} 个唯一名称")
+            # 没有就近名称时使用默认名称
+            if not name:
+                name = f"{province}数据中心{i+1}"
             
-            # 组合数据
-            province = self.province_mapping[source_key]
-            
-            for i, (lat, lng) in enumerate(zip(latitudes, longitudes)):
-                try:
-                    lat_f = float(lat)
-                    lng_f = float(lng)
-                    
-                    # 验证坐标范围
-                    if not (20 <= lat_f <= 35 and 95 <= lng_f <= 115):
-                        continue
-                    
-                    # 检查是否重复
-                    coord_key = (round(lat_f, 6), round(lng_f, 6))
-                    if coord_key in self.unique_coordinates:
-                        print(f"  跳过重复坐标: ({lat_f}, {lng_f})")
-                        continue
-                    
-                    self.unique_coordinates.add(coord_key)
-                    
-                    # 选择名称
-                    if i < len(unique_names):
-                        name = unique_names[i]
-                    else:
-                        name = f"{province}数据中心{i+1}"
-                    
-                    data_center = {
-                        'province': province,
-                        'latitude': lat_f,
-                        'longitude': lng_f,
-                        'name': name,
-                        'source': source_key,
-                        'coordinates': f"{lat_f},{lng_f}"
-                    }
-                    
-                    found_data.append(data_center)
-                    print(f"  {len(found_data)}. {name} - ({lat_f:.6f}, {lng_f:.6f})")
-                    
-                except ValueError:
-                    continue
+            data_center = {
+                'province': province,
+                'latitude': lat_f,
+                'longitude': lng_f,
+                'name': name,
+                'source': source_key,
+                'coordinates': f"{lat_f},{lng_f}"
+            }
             
-        except Exception as e:
-            print(f"  数据提取错误: {e}")
+            found_data.append(data_center)
+            print(f"  {len(found_data)}. {name} - ({lat_f:.6f}, {lng_f:.6f})")
         
         return found_data
     
+    def merge_extracted_pages(self, results, pool):
+        """按数据源顺序把提取进程的解析结果转换为记录并合并"""
+        for source_key, parsed, log, error in results:
+            print(f"\n{source_key} (提取进程数: {pool.max_workers})")
+            print(log, end='')
+            if error is not None:
+                print(f"  ❌ 数据提取错误: {error}")
+                continue
+            
+            page_data = self.build_records(parsed, source_key)
+            self.all_results.extend(page_data)
+            if page_data:
+                print(f"  成功提取: {len(page_data)} 个数据中心")
+            else:
+                print(f"  未找到数据")
+    
     def crawl_all_sources(self):
         """爬取所有数据源"""
         print("开始爬取所有数据源...")
         print("="*60)
         
-        for source_key, url in self.urls.items():
-            print(f"\n正在爬取: {source_key}")
-            print(f"URL: {url}")
-            print("-" * 40)
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=30)
-                
-                if response.status_code != 200:
-                    print(f"  请求失败: {response.status_code}")
-                    continue
-                
-                print(f"  页面大小: {len(response.text)} 字符")
+        # 页面解析在进程池中进行，与后续下载并行；前面的数据源都解析完后即合并，不等全部下载结束
+        with ExtractionPool(parse_page, list(self.urls), max_workers=self.extract_workers,
+                            cache=self.extraction_cache, extractor='complete_page',
+                            version=PAGE_EXTRACTOR_VERSION) as pool:
+            for source_key, url in self.urls.items():
+                print(f"\n正在爬取: {source_key}")
+                print(f"URL: {url}")
+                print("-" * 40)
                 
-                # 提取数据
-                page_data = self.extract_data_from_page(response.text, source_key)
-                
-                if page_data:
-                    self.all_results.extend(page_data)
-                    print(f"  成功提取: {len(page_data)} 个数据中心")
-                else:
-                    print(f"  未找到数据")
-                
-                # 保存页面源码用于调试
-                filename = f"{source_key.replace('-', '_')}_source.html"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
+                try:
+                    response = self.client.get(url, headers=self.headers, timeout=30)
+                    
+                    if response.status_code != 200:
+                        print(f"  请求失败: {response.status_code}")
+                        pool.skip(source_key)
+                        continue
+                    
+                    print(f"  页面大小: {len(response.text)} 字符")
+                    
+                    # 交给提取进程池解析，继续下载下一个数据源
+                    pool.submit(source_key, response.text, self.province_mapping[source_key])
+                    
+                    # 保存页面源码用于调试
+                    filename = f"{source_key.replace('-', '_')}_source.html"
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(response.text)
                 
-                # 请求间隔
-                time.sleep(2)
+                except Exception as e:
+                    print(f"  爬取失败: {e}")
+                    pool.skip(source_key)
                 
-            except Exception as e:
-                print(f"  爬取失败: {e}")
+                self.merge_extracted_pages(pool.ready(), pool)
+            
+            self.merge_extracted_pages(pool.collect(), pool)
         
         print(f"\n{'='*60}")
         print(f"爬取完成！总计找到 {len(self.all_results)} 个数据中心")
         
         return self.all_results
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        def extract(content, source_key):
+            page_data = self.extract_data_from_page(content, source_key)
+            self.all_results.extend(page_data)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract, source_keys=list(self.urls), default=list(self.urls)[0])
+        self.extraction_cache.print_stats()
+        return self.all_results
+    
     def save_complete_results(self):
         """保存完整结果"""
         if not self.all_results:
@@ -280,6 +356,8 @@ class CompleteDataCenterCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("完整版数据中心爬虫")
+    
     print("完整版数据中心爬虫启动")
     print("目标: 获取四川省、云南省、贵州省的所有数据中心")
     print("方法: 多URL源 + HTML解析")
@@ -288,7 +366,10 @@ def main():
     
     try:
         # 爬取所有数据
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
         
         if results:
             # 显示结果
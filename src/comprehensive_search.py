@@ -4,11 +4,12 @@
 查找所有可能的数据中心信息源
 """
 
-import requests
 import re
 import json
 
-def search_all_sources():
+from fetch_client import FetchClient
+
+def search_all_sources(client=None):
     """搜索所有可能的数据源"""
     
     # 尝试不同的URL格式
@@ -23,11 +24,12 @@ def search_all_sources():
     ]
     
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    client = client or FetchClient(headers=headers)
     
     for url in test_urls:
         print(f"\n检测: {url}")
         try:
-            response = requests.get(url, headers=headers, timeout=15)
+            response = client.get(url, headers=headers, timeout=15)
             print(f"状态: {response.status_code}")
             
             if response.status_code == 200:
@@ -56,17 +58,18 @@ def search_all_sources():
         except Exception as e:
             print(f"错误: {e}")
 
-def extract_comprehensive_data():
+def extract_comprehensive_data(client=None):
     """综合提取所有数据"""
     
     # 从四川省页面提取更全面的数据
     sichuan_url = 'https://www.datacenters.com/locations/china/sichuan-sheng'
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    client = client or FetchClient(headers=headers)
     
     print("=== 综合数据提取 ===")
     
     try:
-        response = requests.get(sichuan_url, headers=headers)
+        response = client.get(sichuan_url, headers=headers)
         content = response.text
         
         # 使用多种方式提取坐标
@@ -146,12 +149,15 @@ def extract_comprehensive_data():
         return [], []
 
 def main():
+    # 两个阶段共用一个连接池
+    client = FetchClient()
+    
     print("开始搜索所有可能的数据源...")
-    search_all_sources()
+    search_all_sources(client=client)
     
     print("\n" + "="*60)
     print("开始综合数据提取...")
-    coordinates, names = extract_comprehensive_data()
+    coordinates, names = extract_comprehensive_data(client=client)
     
     print(f"\n最终结果:")
     print(f"总坐标数: {len(coordinates)}")
@@ -18,6 +18,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import csv
 import pandas as pd
 
+from driver_pool import shared_pool
+
 class DataCenterCrawler:
     def __init__(self):
         self.base_url = "https://www.datacenters.com"
@@ -28,6 +30,9 @@ class DataCenterCrawler:
         }
         self.data_centers = []
         
+        # 共享浏览器池：多个省份和多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('datacenter', self.setup_driver)
+        
     def setup_driver(self):
         """设置Chrome浏览器驱动"""
         chrome_options = Options()
@@ -103,7 +108,7 @@ class DataCenterCrawler:
         """爬取指定省份的数据中心信息"""
         print(f"开始爬取 {province_name} 的数据中心信息...")
         
-        driver = self.setup_driver()
+        driver = self.driver_pool.acquire()
         if not driver:
             return []
         
@@ -223,7 +228,7 @@ class DataCenterCrawler:
         except Exception as e:
             print(f"爬取 {province_name} 时出错: {e}")
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
         
         print(f"{province_name} 爬取完成，共找到 {len(province_data)} 个数据中心")
         return province_data
@@ -232,6 +237,9 @@ class DataCenterCrawler:
         """爬取所有省份的数据中心信息"""
         print("开始爬取所有省份的数据中心信息...")
         
+        # 省份逐个爬取，同时只租用一个浏览器；提前在后台启动，第一个省份不必等待
+        self.driver_pool.warm_up(1)
+        
         for province, url in self.provinces.items():
             try:
                 province_data = self.crawl_province(province, url)
@@ -245,6 +253,7 @@ class DataCenterCrawler:
                 continue
         
         print(f"所有省份爬取完成，共找到 {len(self.data_centers)} 个数据中心")
+        self.driver_pool.print_stats()
         return self.data_centers
     
     def save_to_csv(self, filename="data_centers.csv"):
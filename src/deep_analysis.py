@@ -4,11 +4,12 @@
 深度分析网站数据，查找遗漏的数据中心信息
 """
 
-import requests
 import re
 import json
 
-def deep_analysis():
+from fetch_client import FetchClient
+
+def deep_analysis(client=None):
     """深度分析所有省份的数据"""
     
     provinces = {
@@ -20,6 +21,7 @@ def deep_analysis():
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
+    client = client or FetchClient(headers=headers)
     
     all_found_data = []
     
@@ -30,7 +32,7 @@ def deep_analysis():
         print(f"{'='*60}")
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = client.get(url, headers=headers, timeout=30)
             print(f"状态码: {response.status_code}")
             print(f"页面大小: {len(response.text)} 字符")
             
@@ -4,16 +4,18 @@
 详细检查特定URL的所有数据
 """
 
-import requests
 import re
 import json
 
-def detailed_check_url(url, url_name):
+from fetch_client import FetchClient
+
+def detailed_check_url(url, url_name, client=None):
     """详细检查单个URL的所有数据"""
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
+    client = client or FetchClient(headers=headers)
     
     print(f'\n{"="*70}')
     print(f'详细检查: {url_name}')
@@ -21,7 +23,7 @@ def detailed_check_url(url, url_name):
     print(f'{"="*70}')
     
     try:
-        response = requests.get(url, headers=headers, timeout=20)
+        response = client.get(url, headers=headers, timeout=20)
         print(f'状态码: {response.status_code}')
         
         if response.status_code == 200:
@@ -137,8 +139,11 @@ def main():
     
     all_results = {}
     
+    # 所有URL共用一个连接池
+    client = FetchClient()
+    
     for url, name in urls_to_check:
-        coordinates, names = detailed_check_url(url, name)
+        coordinates, names = detailed_check_url(url, name, client=client)
         all_results[name] = {
             'coordinates': coordinates,
             'names': names,
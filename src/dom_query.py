@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轻量DOM查询
+用 lxml 的增量解析器扫描页面，只保留命中查询的元素（分页控件、数据容器等）的摘要，
+其余节点在结束标签处立即释放，不在内存中构建整页DOM树；查询条件预编译为XPath。
+"""
+
+from lxml import etree
+
+# 每次送入解析器的字符数，解析与释放交替进行
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def class_selector(name):
+    """CSS `.name` 对应的XPath条件"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def tag_selector(*tags):
+    """CSS `a, button` 对应的XPath条件"""
+    return " or ".join(f"self::{tag}" for tag in tags)
+
+
+def attribute_selector(*names):
+    """CSS `[data-lat]` 对应的XPath条件，多个属性为“或”关系"""
+    return " or ".join(f"@{name}" for name in names)
+
+
+def _single_string(element):
+    """与 BeautifulSoup 的 Tag.string 相同：元素只有一个子节点时取其文本（子节点是元素时递归），否则为None"""
+    while True:
+        children = list(element)
+        if not children:
+            return element.text or None
+        if len(children) > 1 or element.text or children[0].tail or not isinstance(children[0].tag, str):
+            return None
+        element = children[0]
+
+
+class ElementSummary:
+    """命中查询的元素摘要，提供与 BeautifulSoup Tag 相同的 get / get_text 用法"""
+
+    __slots__ = ('tag', 'attrib', 'text', 'string')
+
+    def __init__(self, element):
+        self.tag = element.tag
+        self.attrib = dict(element.attrib)
+        # 文本片段列表，与 get_text() 的拼接方式保持一致
+        self.text = list(element.itertext())
+        # 元素自身的唯一文本（与 Tag.string 相同），按文本查找元素时只匹配它
+        self.string = _single_string(element)
+
+    def get(self, key, default=None):
+        return self.attrib.get(key, default)
+
+    def get_text(self, separator='', strip=False):
+        if strip:
+            return separator.join(piece.strip() for piece in self.text if piece.strip())
+        return separator.join(self.text)
+
+    def __repr__(self):
+        return f"<{self.tag} {self.attrib}>"
+
+
+class DomQuery:
+    """一组预编译的元素查询，一次增量解析得到所有查询的结果"""
+
+    def __init__(self, queries):
+        """queries: {查询名: XPath条件}，条件只能依赖元素自身的标签和属性"""
+        self.names = list(queries)
+        self._tests = [
+            (name, etree.XPath(f"boolean(self::*[{predicate}])"))
+            for name, predicate in queries.items()
+        ]
+        # 先用合并后的条件判断元素是否可能命中，绝大多数元素只需一次XPath求值
+        self._any = etree.XPath(
+            "boolean(self::*[" + " or ".join(f"({predicate})" for predicate in queries.values()) + "])"
+        )
+
+    def run(self, content, chunk_size=DEFAULT_CHUNK_SIZE):
+        """解析页面，返回 {查询名: [ElementSummary]}，元素按文档顺序排列"""
+        results = {name: [] for name in self.names}
+        parser = etree.HTMLPullParser(events=('start', 'end'))
+        # 命中元素在结束前需要保留完整子树（用于 get_text），记录当前打开的命中元素数
+        open_matches = []
+        keep_depth = 0
+
+        for offset in range(0, len(content), chunk_size):
+            parser.feed(content[offset:offset + chunk_size])
+            keep_depth = self._consume(parser, results, open_matches, keep_depth)
+        parser.close()
+        self._consume(parser, results, open_matches, keep_depth)
+
+        return results
+
+    def _consume(self, parser, results, open_matches, keep_depth):
+        for event, element in parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+
+            if event == 'start':
+                # 标签和属性在开始标签处已完整，可以判断是否命中
+                matched = self._any(element)
+                open_matches.append(matched)
+                if matched:
+                    keep_depth += 1
+                continue
+
+            if open_matches.pop():
+                keep_depth -= 1
+                summary = ElementSummary(element)
+                for name, test in self._tests:
+                    if test(element):
+                        results[name].append(summary)
+
+            if keep_depth == 0:
+                # 不在任何命中元素内部：释放该元素及已处理完的前序兄弟节点
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+        return keep_depth
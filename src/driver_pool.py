@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver 浏览器池
+Chrome 启动需要数秒并占用数百MB内存。池中保持若干个已启动的浏览器，按省份/页面任务租用，
+归还时清理窗口、页面启动脚本、Cookie、本地存储和缓存，下一个任务拿到的是干净的浏览器；
+每个浏览器处理的页面数达到上限后退出并在需要时重新启动，避免内存随运行时间增长。
+同一进程内相同配置的爬虫通过 shared_pool() 共用一个池，多个省份和多次运行不必重复启动浏览器。
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# 每个池最多同时存在的浏览器数
+DEFAULT_POOL_SIZE = 2
+# 单个浏览器处理多少个页面后回收
+DEFAULT_MAX_PAGES = 50
+# 浏览器对象上记录已注册启动脚本的属性 {脚本: DevTools 标识}
+STARTUP_SCRIPTS_ATTR = '_pool_startup_scripts'
+
+
+def add_startup_script(driver, source):
+    """注册在之后每个页面开始执行前运行的脚本（DevTools），同一浏览器上同一脚本只注册一次
+
+    注册的脚本在 reset_driver 时移除，下一次租用不会残留上一个任务的脚本。非Chrome驱动不支持时抛出异常。
+    """
+    scripts = getattr(driver, STARTUP_SCRIPTS_ATTR, None)
+    if scripts is None:
+        scripts = {}
+        setattr(driver, STARTUP_SCRIPTS_ATTR, scripts)
+    if source not in scripts:
+        result = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        scripts[source] = (result or {}).get('identifier')
+    return scripts[source]
+
+
+def remove_startup_scripts(driver):
+    """移除 add_startup_script 注册的全部脚本"""
+    scripts = getattr(driver, STARTUP_SCRIPTS_ATTR, None) or {}
+    for identifier in scripts.values():
+        if identifier is not None:
+            driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': identifier})
+    scripts.clear()
+
+
+def reset_driver(driver):
+    """清理上一次租用留下的状态，成功返回True"""
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # 上一次租用注册的页面启动脚本
+        remove_startup_scripts(driver)
+
+        # 当前页面所在源的本地存储
+        parsed = urlparse(driver.current_url)
+        if parsed.scheme in ('http', 'https'):
+            origin = f"{parsed.scheme}://{parsed.netloc}"
+            try:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            except Exception:
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+
+        # 所有域名的Cookie和HTTP缓存（非Chrome驱动退回到只清理当前域名的Cookie）
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        except Exception:
+            driver.delete_all_cookies()
+
+        driver.get('about:blank')
+        driver.implicitly_wait(0)
+        return True
+    except Exception as e:
+        print(f"⚠️ 浏览器状态重置失败，将关闭该浏览器: {e}")
+        return False
+
+
+class DriverPool:
+    """浏览器池，factory() 启动一个浏览器（失败时返回None或抛出异常）"""
+
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+
+        self._cond = threading.Condition()
+        self._idle = []
+        # {id(driver): 已处理页面数}
+        self._pages = {}
+        # 已启动（含正在启动）的浏览器数
+        self._live = 0
+        self._closed = False
+
+        self.stats = {
+            'started': 0,     # 启动的浏览器
+            'leases': 0,      # 租用次数
+            'reused': 0,      # 租到已启动浏览器的次数
+            'recycled': 0,    # 达到页面上限或重置失败而关闭的浏览器
+        }
+
+    def _start(self):
+        driver = self.factory()
+        if driver is not None:
+            with self._cond:
+                self._pages[id(driver)] = 0
+                self.stats['started'] += 1
+        return driver
+
+    def warm_up(self, count=None):
+        """在后台预先启动浏览器，第一次租用时不必等待启动"""
+        with self._cond:
+            count = min(count or self.size, self.size) - self._live - len(self._idle)
+            count = max(count, 0)
+            self._live += count
+
+        for _ in range(count):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _warm_one(self):
+        try:
+            driver = self._start()
+        except Exception as e:
+            print(f"⚠️ 预热浏览器启动失败: {e}")
+            driver = None
+        with self._cond:
+            if driver is None:
+                self._live -= 1
+            else:
+                self._idle.append(driver)
+            self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """租用一个浏览器；池已满时等待归还，超时或启动失败返回None"""
+        with self._cond:
+            while not self._idle and self._live >= self.size:
+                if not self._cond.wait(timeout):
+                    return None
+            self.stats['leases'] += 1
+            if self._idle:
+                self.stats['reused'] += 1
+                return self._idle.pop()
+            self._live += 1
+
+        driver = None
+        try:
+            driver = self._start()
+        finally:
+            if driver is None:
+                with self._cond:
+                    self._live -= 1
+                    self._cond.notify()
+        return driver
+
+    def release(self, driver, pages=1):
+        """归还浏览器，pages 为本次租用处理的页面数"""
+        if driver is None:
+            return
+
+        with self._cond:
+            total = self._pages.get(id(driver), 0) + pages
+            self._pages[id(driver)] = total
+            retire = self._closed or total >= self.max_pages
+
+        if retire or not reset_driver(driver):
+            self._discard(driver)
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._live -= 1
+            if not self._closed:
+                self.stats['recycled'] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, pages=1, timeout=None):
+        """with pool.lease() as driver: ...；浏览器启动失败时 driver 为None"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver, pages)
+
+    def close(self):
+        """关闭空闲的浏览器，租出的浏览器在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def print_stats(self):
+        """打印浏览器池统计"""
+        print(f"🧭 浏览器池: 启动 {self.stats['started']} 个, 租用 {self.stats['leases']} 次 "
+              f"(复用 {self.stats['reused']} 次), 回收 {self.stats['recycled']} 个")
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def shared_pool(name, factory, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    """返回进程内按名称共享的浏览器池，第一次调用时用 factory 创建
+
+    名称应对应一套浏览器配置，同名的爬虫实例（多个省份、多次运行）共用已启动的浏览器。
+    """
+    with _shared_lock:
+        pool = _shared_pools.get(name)
+        if pool is None:
+            pool = _shared_pools[name] = DriverPool(factory, size=size, max_pages=max_pages)
+        return pool
+
+
+@atexit.register
+def close_shared_pools():
+    """进程退出时关闭所有共享池中的浏览器"""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
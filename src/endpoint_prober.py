@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应API端点探测器
+并发探测候选端点，所有参数组合都返回404/非JSON的端点被剪枝，按内容哈希识别相同响应；
+在多个抽样变体上响应都不变的维度（如缩放级别）停止继续枚举
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EndpointProber:
+    """候选API端点的并发自适应探测"""
+
+    def __init__(self, client, base_url, headers=None, max_workers=6, timeout=10):
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        # 端点状态: {endpoint: 'alive' | 'empty' | 'non_json' | 'dead'}
+        self.endpoint_status = {}
+        # 非JSON响应的内容哈希 -> 返回过该内容的端点集合（用于识别站点兜底页面）
+        self.fallback_hashes = {}
+        self.stats = {'requests': 0, 'skipped_variants': 0, 'elapsed': 0.0}
+        self._lock = threading.Lock()
+
+    def _probe(self, endpoint, builder_index, params, variant):
+        """发送单个探测请求，返回探测结果字典"""
+        result = {
+            'api': endpoint, 'builder': builder_index, 'variant': variant, 'params': params,
+            'status': None, 'hash': None, 'data': None, 'text': None, 'kind': 'error'
+        }
+        with self._lock:
+            self.stats['requests'] += 1
+
+        try:
+            response = self.client.get(f"{self.base_url}{endpoint}", headers=self.headers,
+                                       params=params, timeout=self.timeout)
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+
+        result['status'] = response.status_code
+        result['hash'] = hashlib.sha256(response.content).hexdigest()
+
+        if response.status_code != 200:
+            result['kind'] = 'http_error'
+            return result
+
+        try:
+            data = response.json()
+        except ValueError:
+            result['kind'] = 'non_json'
+            result['text'] = response.text
+            return result
+
+        if data and (isinstance(data, list) or (isinstance(data, dict) and len(data) > 0)):
+            result['kind'] = 'json'
+            result['data'] = data
+        else:
+            result['kind'] = 'empty'
+        return result
+
+    def _run_batch(self, executor, probes):
+        """并发执行一批 (endpoint, builder_index, params, variant) 探测，结果保持提交顺序"""
+        futures = [executor.submit(self._probe, *probe) for probe in probes]
+        return [future.result() for future in futures]
+
+    def _record(self, results):
+        """记录端点状态，取该端点所有探测结果中最好的一个"""
+        rank = {'alive': 3, 'empty': 2, 'non_json': 1, 'dead': 0}
+        for result in results:
+            if result['kind'] == 'json':
+                status = 'alive'
+            elif result['kind'] == 'empty':
+                status = 'empty'
+            elif result['kind'] == 'non_json':
+                status = 'non_json'
+                self.fallback_hashes.setdefault(result['hash'], set()).add(result['api'])
+            else:
+                status = 'dead'
+
+            current = self.endpoint_status.get(result['api'])
+            if current is None or rank[status] > rank[current]:
+                self.endpoint_status[result['api']] = status
+
+    @staticmethod
+    def _sample_indices(count, samples):
+        """在 count 个变体中均匀选取最多 samples 个（含首尾）的下标"""
+        samples = min(samples, count)
+        if samples <= 0:
+            return []
+        if samples == 1:
+            return [count - 1]
+        return sorted({round(i * (count - 1) / (samples - 1)) for i in range(samples)})
+
+    def probe(self, endpoints, param_builders, variants, invariance_samples=3):
+        """探测所有端点
+
+        endpoints: 候选路径列表，例如 "/api/map/clusters"
+        param_builders: 函数列表，每个函数接收一个变体值（如缩放级别）返回请求参数
+        variants: 需要枚举的变体值列表（如缩放级别）
+        invariance_samples: 判断变体是否影响响应时，在其余变体中均匀抽样的个数
+
+        返回 (json_results, non_json_samples)：
+          json_results 为内容互不相同的有效JSON响应
+          non_json_samples 为每种不同内容各保留一份的非JSON响应
+        """
+        if not endpoints or not param_builders or not variants:
+            return [], []
+
+        start = time.time()
+        first_variant = variants[0]
+        json_results = []
+        seen_hashes = set()
+        non_json_samples = {}
+
+        def collect(results):
+            for result in results:
+                if result['kind'] == 'json' and result['hash'] not in seen_hashes:
+                    seen_hashes.add(result['hash'])
+                    json_results.append(result)
+                elif result['kind'] == 'non_json' and result['hash'] not in non_json_samples:
+                    non_json_samples[result['hash']] = result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # 第1轮：每个端点的每组参数各探测一次；所有参数组合都失败（404/非JSON/请求失败）的端点才被剪枝
+            round1 = self._run_batch(executor, [
+                (endpoint, index, builder(first_variant), first_variant)
+                for endpoint in endpoints
+                for index, builder in enumerate(param_builders)
+            ])
+            self._record(round1)
+            collect(round1)
+
+            # 返回JSON（含空结果）的 (端点, 参数组合) 继续枚举变体
+            bases = [r for r in round1 if r['kind'] in ('json', 'empty')]
+            rest = variants[1:]
+
+            if bases and rest:
+                # 第2轮：在其余变体中均匀抽样（含最后一个）；所有样本的结果都与第一个变体相同时才认为该维度无影响
+                sampled = self._sample_indices(len(rest), invariance_samples)
+                round2 = self._run_batch(executor, [
+                    (base['api'], base['builder'], param_builders[base['builder']](rest[i]), rest[i])
+                    for base in bases
+                    for i in sampled
+                ])
+                self._record(round2)
+                collect(round2)
+
+                varying = []
+                for position, base in enumerate(bases):
+                    results = round2[position * len(sampled):(position + 1) * len(sampled)]
+                    if all(r['kind'] == base['kind'] and r['hash'] == base['hash'] for r in results):
+                        self.stats['skipped_variants'] += len(rest) - len(sampled)
+                    else:
+                        varying.append(base)
+
+                # 第3轮：只对确实随变体变化的组合枚举未抽样的变体
+                sampled_set = set(sampled)
+                remaining = [variant for i, variant in enumerate(rest) if i not in sampled_set]
+                round3 = self._run_batch(executor, [
+                    (base['api'], base['builder'], param_builders[base['builder']](variant), variant)
+                    for base in varying
+                    for variant in remaining
+                ])
+                self._record(round3)
+                collect(round3)
+
+        self.stats['elapsed'] = time.time() - start
+        return json_results, list(non_json_samples.values())
+
+    def shared_fallback_hashes(self):
+        """被多个端点返回的相同非JSON内容（通常是站点的兜底HTML页面）"""
+        return {h: endpoints for h, endpoints in self.fallback_hashes.items() if len(endpoints) > 1}
+
+    def print_summary(self, total_combinations):
+        """打印探测统计"""
+        alive = [e for e, s in self.endpoint_status.items() if s == 'alive']
+        pruned = [e for e, s in self.endpoint_status.items() if s in ('dead', 'non_json')]
+        print(f"\n📊 端点探测统计:")
+        print(f"  🔢 穷举需要: {total_combinations} 次请求, 实际发送: {self.stats['requests']} 次")
+        print(f"  ✅ 返回JSON的端点: {len(alive)} 个 {alive}")
+        print(f"  ✂️ 剪枝端点(404/非JSON/失败): {len(pruned)} 个")
+        print(f"  ⏭️ 因响应不随参数变化而跳过的变体: {self.stats['skipped_variants']} 个")
+        for digest, endpoints in self.shared_fallback_hashes().items():
+            print(f"  📄 {len(endpoints)} 个端点返回相同的非JSON页面 ({digest[:12]})")
+        print(f"  ⏱️ 用时: {self.stats['elapsed']:.1f} 秒")
@@ -5,7 +5,6 @@
 支持地图缩放、翻页和JavaScript渲染，获取完整的数据中心信息
 """
 
-import requests
 import re
 import json
 import pandas as pd
@@ -21,15 +20,21 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
 
+from fetch_client import FetchClient
+from snapshot_replay import parse_replay_args, replay_snapshots
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class EnhancedShanghaiDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         # 上海市的主要URL
         self.main_url = "https://www.datacenters.com/locations/china/shanghai/shanghai"
         
+        # 共享HTTP客户端（连接池复用），用于requests备用方案
+        self.client = client or FetchClient()
+        
         # 上海市行政区域坐标范围（更精确的边界）
         self.shanghai_bounds = {
             'lat_min': 30.6,    # 最南端（奉贤区南部）
@@ -370,7 +375,7 @@ class EnhancedShanghaiDataCenterCrawler:
         }
         
         try:
-            response = requests.get(self.main_url, headers=headers, timeout=30)
+            response = self.client.get(self.main_url, headers=headers, timeout=30)
             if response.status_code == 200:
                 return self.extract_data_from_content(response.text)
         except Exception as e:
@@ -418,6 +423,25 @@ class EnhancedShanghaiDataCenterCrawler:
         logger.info(f"🎉 最终获取: {len(self.all_results)} 个上海市数据中心")
         return self.all_results
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，不启动浏览器、无网络请求"""
+        all_data = []
+        seen_coords = set()
+        
+        def extract(content, source_key):
+            page_data = self.extract_data_from_content(content)
+            for dc in page_data:
+                coord_key = (round(dc['latitude'], 6), round(dc['longitude'], 6))
+                if coord_key not in seen_coords:
+                    all_data.append(dc)
+                    seen_coords.add(coord_key)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract)
+        self.all_results = all_data
+        logger.info(f"🎉 回放获取: {len(self.all_results)} 个上海市数据中心")
+        return self.all_results
+    
     def save_results(self):
         """保存结果"""
         if not self.all_results:
@@ -544,6 +568,8 @@ class EnhancedShanghaiDataCenterCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("增强版上海市数据中心爬虫")
+    
     print("🚀 增强版上海市数据中心爬虫启动")
     print("🎯 目标：获取完整的上海市数据中心信息（80+个）")
     print("🔧 技术：Selenium + 地图缩放 + 翻页 + requests备用")
@@ -552,7 +578,10 @@ def main():
     
     try:
         # 开始爬取
-        results = crawler.crawl_all_data()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_data()
         
         if results:
             # 显示结果
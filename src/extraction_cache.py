@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提取结果缓存 - 按页面正文哈希和提取器版本保存解析结果
+很多输入逐字节相同（多个URL变体返回同一页面、不同缩放级别返回同一个聚合响应），
+相同正文只解析一次，之后只需计算一次哈希即可直接取回结果；结果保存在磁盘上，跨运行复用。
+提取逻辑修改后递增提取器版本号，旧结果自然失效。
+流式下载的页面用 StreamDigest 边下载边计算同一个哈希，与完整下载的页面共用缓存结果。
+"""
+
+import hashlib
+import json
+import os
+
+
+# 未命中标记（缓存的结果本身可以是 None）
+_MISSING = object()
+
+
+def _encode(content):
+    return content.encode('utf-8', errors='surrogatepass') if isinstance(content, str) else content
+
+
+class StreamDigest:
+    """分块计算正文哈希（可作为流式下载的 consumer），结果与对完整正文计算的相同"""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+
+    def feed(self, text):
+        self._hash.update(_encode(text))
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+class ExtractionCache:
+    """内容寻址的提取结果缓存，结果须可JSON序列化"""
+
+    def __init__(self, cache_dir="data/cache/extraction"):
+        self.cache_dir = cache_dir
+        # 本进程内已读取或计算过的结果，重复页面不再读盘
+        self.memory = {}
+
+        self.stats = {
+            'hits': 0,       # 命中（内存或磁盘）
+            'misses': 0,     # 实际执行提取
+        }
+
+    def _entry_path(self, digest, extractor, version):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{extractor}.v{version}.json")
+
+    @staticmethod
+    def digest_of(content):
+        """正文的哈希（与 StreamDigest 分块计算的结果相同）"""
+        return hashlib.sha256(_encode(content)).hexdigest()
+
+    def get(self, digest, extractor, version, default=None):
+        """取回缓存的结果，未命中时返回 default（只有命中计入统计）"""
+        key = (digest, extractor, version)
+        if key in self.memory:
+            self.stats['hits'] += 1
+            return self.memory[key]
+
+        try:
+            with open(self._entry_path(digest, extractor, version), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return default
+        self.stats['hits'] += 1
+        self.memory[key] = result
+        return result
+
+    def put(self, digest, extractor, version, result):
+        """保存一次实际执行的提取结果"""
+        self.stats['misses'] += 1
+        self.memory[(digest, extractor, version)] = result
+        self._store(self._entry_path(digest, extractor, version), result)
+
+    def get_or_extract(self, content, extractor, version, func, digest=None):
+        """返回 func(content) 的结果，相同正文和提取器版本的结果直接取自缓存
+
+        extractor: 提取器名称；version: 提取器版本，提取逻辑变化时递增
+        digest: 已算好的正文哈希（如 StreamDigest），此时 content 可以为None
+        """
+        if digest is None:
+            digest = self.digest_of(content)
+
+        result = self.get(digest, extractor, version, default=_MISSING)
+        if result is _MISSING:
+            result = func(content)
+            self.put(digest, extractor, version, result)
+        return result
+
+    def _store(self, path, result):
+        """写入结果（先写临时文件再替换，多个提取进程同时写入同一结果也不会损坏）"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ 提取结果缓存写入失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def print_stats(self):
+        """打印缓存统计"""
+        print(f"🗃️ 提取缓存: 命中 {self.stats['hits']} 次, 解析 {self.stats['misses']} 次")
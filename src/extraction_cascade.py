@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按成本排序的提取策略级联
+每个策略声明自己的成本，按从低到高依次执行；去重后的记录数达到预期数量即提前结束。
+级联记录每个策略的耗时和产出（新增记录数），连续多次没有新增记录的策略会被跳过，
+每隔若干页再试探一次，避免一直为没有收益的策略付出时间。
+"""
+
+import re
+import time
+
+# 页面中报告的数据中心总数与每页数量（页面内嵌状态JSON、"Showing 1 - 40 of 54" 文本）
+TOTAL_PATTERNS = [
+    re.compile(r'"totalPreloadedSearchLocations"\s*:\s*(\d+)'),
+    re.compile(r'"totalResults"\s*:\s*(\d+)'),
+    re.compile(r'Showing\s+\d+\s*-\s*\d+\s+of\s+(\d+)', re.IGNORECASE),
+]
+PER_PAGE_PATTERNS = [
+    re.compile(r'"perPage"\s*:\s*(\d+)'),
+    re.compile(r'Showing\s+1\s*-\s*(\d+)\s+of\s+\d+', re.IGNORECASE),
+]
+
+
+def _first_number(patterns, content):
+    for pattern in patterns:
+        match = pattern.search(content)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def reported_totals(content):
+    """页面报告的 (总数, 每页数量)，找不到的一项为 None"""
+    return _first_number(TOTAL_PATTERNS, content or ''), _first_number(PER_PAGE_PATTERNS, content or '')
+
+
+def expected_count(total=None, per_page=None, collected=0):
+    """本页的预期记录数：不超过每页数量，也不超过总数中尚未获取的部分；都未知时返回 None"""
+    limits = [limit for limit in (per_page, None if total is None else max(total - collected, 0))
+              if limit is not None]
+    return min(limits) if limits else None
+
+
+def coordinate_key(record, precision=6):
+    """默认去重键：按坐标去重"""
+    return (round(record['latitude'], precision), round(record['longitude'], precision))
+
+
+class ExtractionStrategy:
+    """级联中的一个提取策略及其历史统计"""
+
+    def __init__(self, name, func, cost):
+        self.name = name
+        # func(*args) -> 记录列表
+        self.func = func
+        # 声明的相对成本，数值越小越先执行
+        self.cost = cost
+
+        self.runs = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.records = 0
+        self.new_records = 0
+        # 连续没有新增记录的次数
+        self.barren_streak = 0
+
+
+class ExtractionCascade:
+    """提取策略级联"""
+
+    def __init__(self, key=coordinate_key, skip_after=3, probe_every=5):
+        self.key = key
+        # 连续 skip_after 次没有新增记录后开始跳过该策略
+        self.skip_after = skip_after
+        # 被跳过的策略每 probe_every 次调用试探执行一次
+        self.probe_every = probe_every
+        self.strategies = []
+        self.calls = 0
+        self.early_exits = 0
+
+    def add(self, name, func, cost):
+        """注册策略"""
+        self.strategies.append(ExtractionStrategy(name, func, cost))
+        self.strategies.sort(key=lambda strategy: strategy.cost)
+        return self
+
+    def _should_skip(self, strategy):
+        if strategy.barren_streak < self.skip_after:
+            return False
+        # 长期无产出的策略定期试探，页面结构变化后仍能恢复
+        return (strategy.runs + strategy.skipped) % self.probe_every != 0
+
+    def run(self, *args, expected=None):
+        """按成本从低到高执行策略，返回去重后的记录
+
+        expected: 预期记录数，达到后不再执行更昂贵的策略；None 表示执行全部策略
+        """
+        self.calls += 1
+        results = []
+        seen = set()
+
+        for position, strategy in enumerate(self.strategies):
+            if expected and len(results) >= expected:
+                self.early_exits += 1
+                for remaining in self.strategies[position:]:
+                    remaining.skipped += 1
+                print(f"    ⏩ 已达到预期 {expected} 个，跳过: {[s.name for s in self.strategies[position:]]}")
+                break
+
+            if self._should_skip(strategy):
+                strategy.skipped += 1
+                continue
+
+            start = time.perf_counter()
+            try:
+                records = strategy.func(*args) or []
+            except Exception as e:
+                print(f"    ❌ {strategy.name} 提取失败: {e}")
+                records = []
+            elapsed = time.perf_counter() - start
+
+            added = 0
+            for record in records:
+                key = self.key(record)
+                if key not in seen:
+                    seen.add(key)
+                    results.append(record)
+                    added += 1
+
+            strategy.runs += 1
+            strategy.seconds += elapsed
+            strategy.records += len(records)
+            strategy.new_records += added
+            strategy.barren_streak = 0 if added else strategy.barren_streak + 1
+
+            if records:
+                print(f"    {strategy.name}: {len(records)} 个 (新增 {added}, {elapsed * 1000:.0f} ms)")
+
+        return results
+
+    def stats(self):
+        """每个策略的统计信息，按成本排列"""
+        return [
+            {
+                'name': strategy.name,
+                'cost': strategy.cost,
+                'runs': strategy.runs,
+                'skipped': strategy.skipped,
+                'seconds': round(strategy.seconds, 4),
+                'records': strategy.records,
+                'new_records': strategy.new_records,
+            }
+            for strategy in self.strategies
+        ]
+
+    def print_stats(self):
+        """打印每个策略的耗时与产出"""
+        print(f"🧮 提取策略统计 (调用 {self.calls} 次, 提前结束 {self.early_exits} 次):")
+        for strategy in self.strategies:
+            average = strategy.seconds / strategy.runs * 1000 if strategy.runs else 0.0
+            print(f"  {strategy.name:<12} 成本 {strategy.cost:<3} 执行 {strategy.runs} 次 / 跳过 {strategy.skipped} 次, "
+                  f"平均 {average:.0f} ms, 产出 {strategy.records} 个 (新增 {strategy.new_records})")
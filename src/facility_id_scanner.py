@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+密度自适应设施ID扫描器
+先在ID区间内稀疏采样，再以半个间隔错位做第二遍粗采样（宽度不小于半个间隔的密集ID段一定会被命中），
+只在命中有效ID的附近逐级加密探测；探测并发执行。
+有效/无效ID的状态持久化保存（只保存ID，不保存响应），之后的运行跳过无效ID，已知有效ID作为采样点重新获取数据
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FacilityIdScanner:
+    """ID空间的并发分层采样扫描"""
+
+    def __init__(self, client, url_template, headers=None, state_file="data/shanghai/facility_id_state.json",
+                 max_workers=6, timeout=5, initial_stride=16, max_probes=2000):
+        self.client = client
+        # 例如 "https://www.datacenters.com/api/facilities/{id}"
+        self.url_template = url_template
+        self.headers = headers
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # 第一轮采样间隔，每轮减半直到1
+        self.initial_stride = initial_stride
+        # 单次扫描最多发送的请求数
+        self.max_probes = max_probes
+
+        self._lock = threading.Lock()
+        # alive: 返回过有效JSON的ID; dead: 返回404或非JSON的ID
+        self.alive, self.dead = self._load_state()
+        # 本次运行取得的响应 {id: 响应JSON}
+        self.data = {}
+        self.stats = {'requests': 0, 'skipped_known': 0, 'alive_found': 0, 'elapsed': 0.0}
+
+    def _load_state(self):
+        """读取已知的有效/无效ID"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            # 早期的状态文件中 alive 为 {id: 响应JSON}，只取其中的ID
+            return {int(k) for k in state.get('alive', [])}, {int(k) for k in state.get('dead', [])}
+        except (OSError, ValueError):
+            return set(), set()
+
+    def save_state(self):
+        """写入ID状态（先写临时文件再替换）"""
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            state = {'alive': sorted(self.alive), 'dead': sorted(self.dead)}
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _probe(self, facility_id):
+        """探测单个ID；超时和5xx等临时错误不记录，下次运行会重试"""
+        with self._lock:
+            self.stats['requests'] += 1
+        try:
+            response = self.client.get(self.url_template.format(id=facility_id),
+                                       headers=self.headers, timeout=self.timeout)
+        except Exception:
+            return
+
+        if response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            with self._lock:
+                if data:
+                    if facility_id not in self.alive:
+                        self.alive.add(facility_id)
+                        self.stats['alive_found'] += 1
+                    self.data[facility_id] = data
+                else:
+                    self.alive.discard(facility_id)
+                    self.dead.add(facility_id)
+        elif response.status_code in (404, 410):
+            with self._lock:
+                self.alive.discard(facility_id)
+                self.dead.add(facility_id)
+
+    def _probe_all(self, executor, ids):
+        """并发探测一批ID，已知无效和本次已取得数据的ID直接跳过"""
+        pending = []
+        for facility_id in ids:
+            if facility_id in self.dead:
+                self.stats['skipped_known'] += 1
+            elif facility_id in self.data:
+                continue
+            elif self.stats['requests'] + len(pending) < self.max_probes:
+                pending.append(facility_id)
+        list(executor.map(self._probe, pending))
+
+    def scan(self, id_ranges):
+        """扫描若干ID区间，返回区间内全部有效ID的 {id: 数据}
+
+        每个区间先按 initial_stride 采样（已知有效ID也作为采样点），再在采样点之间错开半个间隔做第二遍粗采样；
+        相邻两个采样点中有一个有效，就把它们之间的子区间列为"热点"，下一轮以一半的间隔加密采样，
+        直到间隔为1。两遍粗采样都没有命中的稀疏区域不再继续请求。
+        """
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for id_range in id_ranges:
+                lo, hi = id_range.start, id_range.stop
+                if hi <= lo:
+                    continue
+
+                stride = min(self.initial_stride, hi - lo)
+                known = {facility_id for facility_id in self.alive if lo <= facility_id < hi}
+                samples = sorted(set(range(lo, hi, stride)) | {hi - 1} | known)
+                self._probe_all(executor, samples)
+
+                # 第二遍粗采样：第一遍采样点之间错开半个间隔，找出第一遍漏掉的密集ID段
+                if stride > 1:
+                    stride = max(1, stride // 2)
+                    offsets = sorted(set(range(lo + stride, hi, 2 * stride)) - set(samples))
+                    self._probe_all(executor, offsets)
+                    samples = sorted(set(samples) | set(offsets))
+
+                # 热点区间 [a, b]：端点之一有效，内部尚未探测
+                segments = list(zip(samples, samples[1:]))
+
+                while stride > 1:
+                    stride = max(1, stride // 2)
+                    hot = [(a, b) for a, b in segments if b - a > 1 and (a in self.alive or b in self.alive)]
+                    if not hot:
+                        break
+
+                    next_segments = []
+                    refine_ids = []
+                    for a, b in hot:
+                        points = sorted(set(range(a, b, stride)) | {b})
+                        refine_ids.extend(points[1:-1])
+                        next_segments.extend(zip(points, points[1:]))
+                    self._probe_all(executor, refine_ids)
+                    segments = next_segments
+
+        self.stats['elapsed'] = time.time() - start
+        self.save_state()
+
+        return {
+            facility_id: data for facility_id, data in sorted(self.data.items())
+            if any(facility_id in id_range for id_range in id_ranges)
+        }
+
+    def print_summary(self):
+        """打印扫描统计"""
+        print(f"  🔢 ID扫描: 请求 {self.stats['requests']} 次, 跳过已知ID {self.stats['skipped_known']} 个, "
+              f"新发现有效ID {self.stats['alive_found']} 个, 已知有效/无效: {len(self.alive)}/{len(self.dead)}, "
+              f"用时 {self.stats['elapsed']:.1f} 秒")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享HTTP抓取客户端 - 所有爬虫共用的长连接池
+统一请求头、重试/超时策略（端点级熔断 + 指数退避）、按主机的并发连接上限
+以及跨进程的请求速率控制，可选挂载条件GET磁盘缓存
+"""
+
+import copy
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import RetryController, endpoint_key
+from rate_governor import RateGovernor
+
+# 所有爬虫共用的默认请求头
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+}
+
+
+class FetchClient:
+    """带连接池的HTTP客户端，同一主机的TCP/TLS握手在一次运行中只需一次"""
+
+    def __init__(self, headers=None, timeout=30, max_retries=3, backoff_factor=0.5,
+                 pool_connections=10, pool_maxsize=10, per_host_limit=4, cache=None, retry=None, governor=None):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        # 可选的 ResponseCache，GET请求自动带上 If-None-Match/If-Modified-Since
+        self.cache = cache
+        # 端点级重试/熔断，同一运行中共享客户端的爬虫共用一份重试预算
+        self.retry = retry or RetryController(max_attempts=max_retries + 1, base_delay=backoff_factor)
+        # 跨进程令牌桶，同时运行的所有爬虫进程共享对目标网站的总请求速率（默认使用页面抓取预算）
+        self.governor = governor or RateGovernor()
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        # pool_connections: 缓存的主机连接池数量; pool_maxsize: 每个主机池保留的长连接数
+        # 重试由 self.retry 统一处理，连接池本身不再重试
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=True,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _host_slot(self, url):
+        """限制同一主机的并发连接数"""
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+        with slot:
+            yield
+
+    def request(self, method, url, **kwargs):
+        """发送请求，未指定超时时使用客户端默认超时"""
+        kwargs.setdefault('timeout', self.timeout)
+        if self.cache is not None and method == 'GET' and not kwargs.get('stream'):
+            return self._cached_get(url, **kwargs)
+        return self._send(method, url, **kwargs)
+
+    def _send(self, method, url, **kwargs):
+        """经熔断器发送请求；端点熔断时抛出 CircuitOpenError"""
+        def attempt():
+            self.governor.acquire(url)
+            with self._host_slot(url):
+                return self.session.request(method, url, **kwargs)
+        return self.retry.call(endpoint_key(url), attempt)
+
+    def _cached_get(self, url, **kwargs):
+        """条件GET：内容未变时服务器返回304，正文从磁盘缓存读取"""
+        cache_key = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        headers = dict(kwargs.pop('headers', None) or {})
+        conditional = self.cache.conditional_headers(cache_key)
+
+        response = self._send('GET', url, headers={**headers, **conditional}, **kwargs)
+
+        if response.status_code == 304 and conditional:
+            cached = self.cache.build_response(cache_key, response)
+            if cached is not None:
+                return cached
+            # 缓存正文已丢失，重新发起无条件请求
+            response = self._send('GET', url, headers=headers, **kwargs)
+
+        self.cache.store(cache_key, response)
+        return response
+
+    def with_budget(self, budget):
+        """返回使用另一份速率预算（如 rate_governor.PROBE_BUDGET）的客户端，连接池、重试/熔断和缓存与本客户端共用"""
+        if self.governor.budget == budget:
+            return self
+        client = copy.copy(self)
+        client.governor = RateGovernor(budget=budget, state_dir=os.path.dirname(self.governor.state_file))
+        return client
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        """关闭连接池，写回响应缓存中尚未保存的访问时间"""
+        if self.cache is not None:
+            self.cache.flush()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
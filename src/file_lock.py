@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程文件锁
+同一台机器上并行运行的多个爬虫进程读写共享状态文件（限速令牌桶、响应缓存索引）时，
+先持有对应锁文件上的排他锁，读-改-写不会互相覆盖
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+    fcntl = None
+else:
+    import fcntl
+    msvcrt = None
+
+
+@contextmanager
+def file_lock(lock_file):
+    """持有 lock_file 上的跨进程排他锁（同进程内的线程须另外加线程锁）"""
+    with open(lock_file, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
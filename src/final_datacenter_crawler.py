@@ -5,14 +5,16 @@
 通过分析发现网站将坐标数据直接嵌入在HTML中，使用正则表达式提取更加可靠
 """
 
-import requests
 import re
 import json
 import pandas as pd
 import time
 
+from fetch_client import FetchClient
+from snapshot_replay import parse_replay_args, replay_snapshots
+
 class HTMLDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         self.provinces = {
             "四川省": "https://www.datacenters.com/locations/china/sichuan-sheng",
             "云南省": "https://www.datacenters.com/locations/china/yunnan-sheng", 
@@ -27,6 +29,9 @@ class HTMLDataCenterCrawler:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
+        
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
     
     def extract_coordinates_and_names(self, html_content, province_name):
         """从HTML内容中提取坐标和名称"""
@@ -111,7 +116,7 @@ class HTMLDataCenterCrawler:
         try:
             # 发送HTTP请求
             print("发送HTTP请求...")
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.client.get(url, headers=self.headers, timeout=30)
             
             if response.status_code != 200:
                 print(f"请求失败，状态码: {response.status_code}")
@@ -149,11 +154,6 @@ class HTMLDataCenterCrawler:
                 province_data = self.crawl_province(province, url)
                 self.results.extend(province_data)
                 
-                # 省份间休息
-                if province != list(self.provinces.keys())[-1]:
-                    print("等待3秒后继续...")
-                    time.sleep(3)
-                
             except Exception as e:
                 print(f"处理 {province} 时出错: {e}")
                 continue
@@ -161,6 +161,16 @@ class HTMLDataCenterCrawler:
         print(f"\n所有省份爬取完成，总计找到 {len(self.results)} 个数据中心")
         return self.results
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        def extract(content, source_key):
+            page_data = self.extract_coordinates_and_names(content, source_key)
+            self.results.extend(page_data)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract, source_keys=list(self.provinces), default=list(self.provinces)[0])
+        return self.results
+    
     def save_results(self):
         """保存结果到文件"""
         if not self.results:
@@ -267,6 +277,8 @@ class HTMLDataCenterCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("基于HTML解析的数据中心爬虫")
+    
     print("=" * 80)
     print("数据中心坐标爬虫 - HTML解析版")
     print("目标: 四川省、云南省、贵州省")
@@ -276,7 +288,10 @@ def main():
     
     try:
         # 执行爬取
-        results = crawler.crawl_all_provinces()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_provinces()
         
         # 显示结果
         crawler.display_summary()
@@ -4,16 +4,171 @@
 广东省数据中心爬虫 - 专门爬取广东省数据中心分布信息
 """
 
+import argparse
 import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 
+from async_fetcher import AsyncFetchEngine
+from fetch_client import FetchClient
+from response_cache import ResponseCache
+from snapshot_replay import add_replay_argument, replay_snapshots
+from extraction_cache import ExtractionCache, StreamDigest
+from hydration_extractor import (EXTRACTOR_VERSION as HYDRATION_VERSION, ScriptBlockCollector,
+                                 build_records_from_locations, extract_locations)
+from keyword_automaton import build_province_automaton
+from parallel_extract import ExtractionPool
+from pattern_scanner import MultiPatternScanner, NUMBER
+from record_assembler import BraceTracker, assemble_records
+from stream_download import IncrementalPatternScanner, stream_download
+
+# 名称关键词自动机（关键词见 keyword_automaton.PROVINCE_KEYWORDS），名称候选一遍扫描完成分类
+NAME_AUTOMATON = build_province_automaton('广东省')
+# "name"/"title" 字段的名称候选须包含数据中心关键词或省内地名
+NAME_CATEGORIES = {'datacenter', 'region'}
+# <h1>-<h6> 标题须包含数据中心关键词（只含地名的标题多为页面栏目标题）
+HEADING_CATEGORIES = {'datacenter'}
+
+# 页面中的坐标和名称模式，合并为一个单遍扫描器
+PAGE_SCANNER = MultiPatternScanner([
+    ('latitude', '"latitude"', NUMBER, 0),
+    ('latitude', '"lat"', NUMBER, 0),
+    ('latitude', 'latitude', NUMBER, 0),
+    ('latitude', 'lat', NUMBER, 0),
+    ('longitude', '"longitude"', NUMBER, 0),
+    ('longitude', '"lng"', NUMBER, 0),
+    ('longitude', '"lon"', NUMBER, 0),
+    ('longitude', 'longitude', NUMBER, 0),
+    ('longitude', 'lng', NUMBER, 0),
+    ('longitude', 'lon', NUMBER, 0),
+    ('name', '"name"', r'"([^"]*)"', re.IGNORECASE),
+    ('name', '"title"', r'"([^"]*)"', re.IGNORECASE),
+    ('facility_name', '"facility_name"', r'"([^"]*)"', re.IGNORECASE),
+    ('heading', None, r'<h[1-6][^>]*>([^<]*)</h[1-6]>', re.IGNORECASE),
+])
+# 页面解析逻辑版本，修改 PAGE_SCANNER 或 parse_page 时递增，使提取结果缓存失效
+PAGE_EXTRACTOR_VERSION = 4
+# 广东省大致的地理边界 (最小纬度, 最大纬度, 最小经度, 最大经度)
+GUANGDONG_BOUNDS = (20.0, 25.5, 109.0, 117.5)
+
+
+def is_valid_latitude(lat_str):
+    """验证纬度是否有效"""
+    try:
+        lat = float(lat_str)
+        return GUANGDONG_BOUNDS[0] <= lat <= GUANGDONG_BOUNDS[1]  # 广东省纬度范围
+    except:
+        return False
+
+
+def is_valid_longitude(lng_str):
+    """验证经度是否有效"""
+    try:
+        lng = float(lng_str)
+        return GUANGDONG_BOUNDS[2] <= lng <= GUANGDONG_BOUNDS[3]  # 广东省经度范围
+    except:
+        return False
+
+
+def clean_name_positions(names, facility_names=(), headings=()):
+    """清理带位置的名称：名称候选须包含数据中心关键词或地名，标题须包含数据中心关键词（facility_name 字段不限），
+    过滤掉太短或太长的名称"""
+    candidates = [(offset, name) for offset, name in names if NAME_AUTOMATON.contains(name, NAME_CATEGORIES)]
+    candidates.extend((offset, name) for offset, name in headings if NAME_AUTOMATON.contains(name, HEADING_CATEGORIES))
+    candidates.extend(facility_names)
+    return sorted((offset, name.strip()) for offset, name in candidates if 3 <= len(name.strip()) <= 100)
+
+
+def create_page_scanner(on_match=None):
+    """创建页面的增量扫描器（坐标和名称模式见 PAGE_SCANNER）"""
+    return IncrementalPatternScanner(PAGE_SCANNER, on_match=on_match)
+
+
+def assemble_page(scanner, braces):
+    """按页面位置组装扫描器收集到的坐标和名称，返回 AssembledRecord 列表"""
+    try:
+        print(f"  正在解析页面内容...")
+        
+        # 保留每个匹配的位置，转换为浮点数
+        latitudes = [(offset, float(lat)) for offset, lat in scanner.positions('latitude') if is_valid_latitude(lat)]
+        longitudes = [(offset, float(lng)) for offset, lng in scanner.positions('longitude') if is_valid_longitude(lng)]
+        names = clean_name_positions(scanner.positions('name'), scanner.positions('facility_name'),
+                                     scanner.positions('heading'))
+        
+        print(f"  找到坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
+        print(f"  找到名称: {len(names)} 个")
+        
+        # 纬度配其后最近的经度，名称取同一对象范围内最近的一个
+        return assemble_records(latitudes, longitudes, names, braces)
+    
+    except Exception as e:
+        print(f"  数据提取错误: {e}")
+        return []
+
+
+def parse_page(content):
+    """解析页面（提取进程入口，不依赖爬虫状态），返回 {'locations': 内嵌JSON位置对象, 'records': 按位置组装的 [纬度, 经度, 名称, 偏移量]}"""
+    # 优先解析页面内嵌的应用状态JSON，名称和坐标来自同一个位置对象
+    locations = extract_locations(content)
+    if locations:
+        return {'locations': locations, 'records': []}
+    
+    scanner = create_page_scanner()
+    scanner.feed(content)
+    scanner.close()
+    records = assemble_page(scanner, BraceTracker(content))
+    return {'locations': [], 'records': [list(record) for record in records]}
+
+
+def create_page_stream(on_match=None):
+    """创建流式解析所需的增量状态：内嵌JSON、扫描器、花括号位置和正文哈希
+
+    各部分须按 stream_consumers() 的顺序送入同一块文本：扫描器确认匹配时登记其位置，
+    花括号跟踪器随后只需记下这些位置所在的对象，不保留整页的花括号位置。
+    """
+    def track(kind, value, offset):
+        braces.track(offset)
+        if on_match:
+            on_match(kind, value, offset)
+    
+    scanner = create_page_scanner(on_match=track)
+    # 扫描器在末尾保留 2 * overlap 个字符，其中的匹配要到下一块才确认
+    braces = BraceTracker(lag=2 * scanner.overlap)
+    return {
+        'scripts': ScriptBlockCollector(),
+        'scanner': scanner,
+        'braces': braces,
+        'digest': StreamDigest(),
+    }
+
+
+def stream_consumers(stream):
+    """按送入顺序排列的 consumer（扫描器须在花括号跟踪器之前）"""
+    return (stream['digest'].feed, stream['scripts'].feed, stream['scanner'].feed, stream['braces'].feed)
+
+
+def close_stream(stream):
+    """输入结束，确认扫描器末尾的匹配后再结束花括号跟踪"""
+    stream['scripts'].close()
+    stream['scanner'].close()
+    stream['braces'].close()
+
+
+def parse_streamed_page(stream):
+    """与 parse_page 的结果相同，但使用下载过程中增量收集的内嵌JSON、扫描结果和花括号位置"""
+    locations = stream['scripts'].locations()
+    if locations:
+        return {'locations': locations, 'records': []}
+    
+    records = assemble_page(stream['scanner'], stream['braces'])
+    return {'locations': [], 'records': [list(record) for record in records]}
+
+
 class GuangdongDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         # 广东省的所有可能URL变体
         self.urls = {
             # 广东省的各种英文拼写变体
@@ -60,6 +215,22 @@ class GuangdongDataCenterCrawler:
             'Upgrade-Insecure-Requests': '1',
         }
         
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
+        
+        # 并发抓取参数：最大并发数与同一主机的请求间隔（秒）
+        self.max_concurrency = 4
+        # 总请求速率由共享客户端的跨进程限速器统一控制，这里不再额外间隔
+        self.per_host_interval = 0.0
+        # 流式下载：边下载边写快照边提取，单页内存占用与页面大小无关（不经过响应缓存，经过提取结果缓存）
+        self.stream_downloads = False
+        # 页面提取进程数，None 表示按CPU核数（流式下载时在下载线程中增量提取，不使用进程池）
+        self.extract_workers = None
+        self.extract_pool = None
+        self.extracted_sources = 0
+        # 提取结果缓存：逐字节相同的页面（多个URL变体常返回同一页面）只解析一次
+        self.extraction_cache = ExtractionCache()
+        
         self.all_results = []
         self.unique_coordinates = set()
         
@@ -79,178 +250,211 @@ class GuangdongDataCenterCrawler:
     
     def extract_data_from_page(self, content, source_key):
         """从页面内容中提取数据中心信息"""
+        # 解析结果与数据源无关，相同正文直接取自提取缓存
+        parsed = self.extraction_cache.get_or_extract(
+            content, 'guangdong_page', f"{PAGE_EXTRACTOR_VERSION}.{HYDRATION_VERSION}", parse_page
+        )
+        return self.build_records_from_parsed(parsed, source_key)
+    
+    def build_records_from_parsed(self, parsed, source_key):
+        """把 parse_page / parse_streamed_page 的结果转换为数据中心记录"""
+        if parsed['locations']:
+            location = self.location_mapping[source_key]
+            return build_records_from_locations(
+                parsed['locations'], GUANGDONG_BOUNDS, {'province': '广东省', 'city': location}, source_key,
+                self.unique_coordinates, default_name=f"{location}数据中心", start_index=len(self.all_results),
+                extra={'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            )
+        return self.build_records_from_assembled(parsed['records'], source_key)
+    
+    def build_records_from_assembled(self, records, source_key):
+        """把组装好的 (纬度, 经度, 名称, 偏移量) 转换为数据中心记录"""
         found_data = []
+        location = self.location_mapping[source_key]
         
-        try:
-            print(f"  正在解析页面内容...")
-            
-            # 提取坐标信息
-            latitude_patterns = [
-                r'"latitude":\s*([\d\.\-]+)',
-                r'"lat":\s*([\d\.\-]+)',
-                r'latitude:\s*([\d\.\-]+)',
-                r'lat:\s*([\d\.\-]+)'
-            ]
-            
-            longitude_patterns = [
-                r'"longitude":\s*([\d\.\-]+)',
-                r'"lng":\s*([\d\.\-]+)',
-                r'"lon":\s*([\d\.\-]+)',
-                r'longitude:\s*([\d\.\-]+)',
-                r'lng:\s*([\d\.\-]+)',
-                r'lon:\s*([\d\.\-]+)'
-            ]
-            
-            # 收集所有坐标
-            latitudes = []
-            longitudes = []
-            
-            for pattern in latitude_patterns:
-                latitudes.extend(re.findall(pattern, content))
-            
-            for pattern in longitude_patterns:
-                longitudes.extend(re.findall(pattern, content))
-            
-            # 去重并转换为浮点数
-            latitudes = list(set([float(lat) for lat in latitudes if self.is_valid_latitude(lat)]))
-            longitudes = list(set([float(lng) for lng in longitudes if self.is_valid_longitude(lng)]))
-            
-            print(f"  找到坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
+        # 创建数据中心记录
+        for i, (lat, lng, name, _) in enumerate(records):
+            # 验证坐标是否在广东省范围内
+            if not self.is_in_guangdong_region(lat, lng):
+                print(f"  跳过非广东省坐标: ({lat}, {lng})")
+                continue
             
-            # 提取数据中心名称
-            name_patterns = [
-                r'"name":\s*"([^"]*(?:Data Center|IDC|数据中心|机房|云计算)[^"]*)"',
-                r'"title":\s*"([^"]*(?:Data Center|IDC|数据中心|机房|云计算)[^"]*)"',
-                r'"facility_name":\s*"([^"]*)"',
-                r'<h[1-6][^>]*>([^<]*(?:Data Center|IDC|数据中心|机房|云计算)[^<]*)</h[1-6]>',
-                # 广东相关的特定模式
-                r'"name":\s*"([^"]*(?:广东|深圳|广州|东莞|佛山|珠海|中山|惠州|Guangdong|Shenzhen|Guangzhou)[^"]*)"',
-                r'"title":\s*"([^"]*(?:广东|深圳|广州|东莞|佛山|珠海|中山|惠州|Guangdong|Shenzhen|Guangzhou)[^"]*)"',
-            ]
+            # 检查是否重复
+            coord_key = (round(lat, 6), round(lng, 6))
+            if coord_key in self.unique_coordinates:
+                print(f"  跳过重复坐标: ({lat}, {lng})")
+                continue
             
-            all_names = []
-            for pattern in name_patterns:
-                names = re.findall(pattern, content, re.IGNORECASE)
-                all_names.extend(names)
+            self.unique_coordinates.add(coord_key)
             
-            # 清理和去重名称
-            unique_names = self.clean_and_dedupe_names(all_names)
-            print(f"  找到名称: {len(unique_names)} 个唯一名称")
+            # 没有就近名称时使用默认名称
+            if not name:
+                name = f"{location}数据中心{i+1}"
             
-            # 组合坐标数据
-            location = self.location_mapping[source_key]
-            
-            # 创建坐标对
-            coordinates_pairs = []
-            
-            # 如果纬度和经度数量相等，直接配对
-            if len(latitudes) == len(longitudes):
-                coordinates_pairs = list(zip(latitudes, longitudes))
-            else:
-                # 如果数量不等，尝试智能匹配
-                coordinates_pairs = self.smart_coordinate_matching(latitudes, longitudes)
+            data_center = {
+                'province': '广东省',
+                'city': location,
+                'latitude': lat,
+                'longitude': lng,
+                'name': name,
+                'source': source_key,
+                'coordinates': f"{lat},{lng}",
+                'index': len(self.all_results) + len(found_data) + 1,
+                'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
             
-            # 创建数据中心记录
-            for i, (lat, lng) in enumerate(coordinates_pairs):
-                # 验证坐标是否在广东省范围内
-                if not self.is_in_guangdong_region(lat, lng):
-                    print(f"  跳过非广东省坐标: ({lat}, {lng})")
-                    continue
-                
-                # 检查是否重复
-                coord_key = (round(lat, 6), round(lng, 6))
-                if coord_key in self.unique_coordinates:
-                    print(f"  跳过重复坐标: ({lat}, {lng})")
-                    continue
-                
-                self.unique_coordinates.add(coord_key)
-                
-                # 选择名称
-                if i < len(unique_names):
-                    name = unique_names[i]
-                else:
-                    name = f"{location}数据中心{i+1}"
-                
-                data_center = {
-                    'province': '广东省',
-                    'city': location,
-                    'latitude': lat,
-                    'longitude': lng,
-                    'name': name,
-                    'source': source_key,
-                    'coordinates': f"{lat},{lng}",
-                    'index': len(self.all_results) + len(found_data) + 1,
-                    'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                found_data.append(data_center)
-                print(f"  {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
-        
-        except Exception as e:
-            print(f"  数据提取错误: {e}")
+            found_data.append(data_center)
+            print(f"  {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
         
         return found_data
     
-    def is_valid_latitude(self, lat_str):
-        """验证纬度是否有效"""
-        try:
-            lat = float(lat_str)
-            return 20.0 <= lat <= 25.5  # 广东省纬度范围
-        except:
-            return False
-    
-    def is_valid_longitude(self, lng_str):
-        """验证经度是否有效"""
-        try:
-            lng = float(lng_str)
-            return 109.0 <= lng <= 117.5  # 广东省经度范围
-        except:
-            return False
-    
     def is_in_guangdong_region(self, lat, lng):
         """检查坐标是否在广东省范围内"""
         # 广东省大致的地理边界
-        return (20.0 <= lat <= 25.5) and (109.0 <= lng <= 117.5)
+        lat_min, lat_max, lng_min, lng_max = GUANGDONG_BOUNDS
+        return (lat_min <= lat <= lat_max) and (lng_min <= lng <= lng_max)
     
-    def clean_and_dedupe_names(self, names):
-        """清理和去重名称"""
-        unique_names = []
-        seen_names = set()
-        
-        for name in names:
-            clean_name = name.strip()
-            # 过滤掉太短或太长的名称
-            if 3 <= len(clean_name) <= 100:
-                # 转换为小写进行比较，但保持原始大小写
-                name_lower = clean_name.lower()
-                if name_lower not in seen_names:
-                    unique_names.append(clean_name)
-                    seen_names.add(name_lower)
-        
-        return unique_names
+    def process_response(self, source_key, response):
+        """处理单个数据源的响应：交给提取进程池解析，返回是否已提交"""
+        print(f"  ✅ 请求成功，页面大小: {len(response.text)} 字符")
+        
+        # 解析在进程池中进行，结果由 finish_source 按数据源顺序合并
+        self.extract_pool.submit(source_key, response.text)
+        
+        # 保存页面源码用于调试
+        filename = self.snapshot_path(source_key)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"  💾 页面源码已保存: {filename}")
+        
+        return True
     
-    def smart_coordinate_matching(self, latitudes, longitudes):
-        """智能坐标匹配"""
-        coordinates_pairs = []
+    def finish_source(self, source_key):
+        """数据源处理完毕（已提交或下载失败）后，合并前面数据源都已完成的提取结果"""
+        if self.extract_pool is None:
+            return
+        # 未提交页面的数据源标记为跳过（已提交的不受影响）
+        self.extract_pool.skip(source_key)
+        self.extracted_sources += self.merge_extracted_pages(self.extract_pool.ready())
+    
+    def merge_extracted_pages(self, results):
+        """按数据源顺序把提取进程的解析结果转换为记录并合并，返回提取到数据的数据源数量"""
+        success_count = 0
         
-        # 如果其中一个列表为空，返回空列表
-        if not latitudes or not longitudes:
-            return coordinates_pairs
+        for source_key, parsed, log, error in results:
+            print(f"\n🧩 提取结果: {source_key} (提取进程数: {self.extract_pool.max_workers})")
+            print(log, end='')
+            if error is not None:
+                print(f"  ❌ 数据提取错误: {error}")
+                continue
+            
+            page_data = self.build_records_from_parsed(parsed, source_key)
+            self.all_results.extend(page_data)
+            if page_data:
+                print(f"  🎉 成功提取: {len(page_data)} 个数据中心")
+                success_count += 1
+            else:
+                print(f"  ⚠️ 未找到数据")
         
-        # 使用较短的列表长度
-        min_length = min(len(latitudes), len(longitudes))
+        return success_count
+    
+    def snapshot_path(self, source_key):
+        """数据源页面快照的保存路径"""
+        return f"html_sources/guangdong/{source_key.replace('-', '_')}_source.html"
+    
+    def stream_source(self, source_key, url):
+        """流式抓取单个数据源：正文分块写入快照并送入增量提取器，返回 (response, stream)
+
+        stream 为 parse_streamed_page 所需的增量状态：内嵌JSON、扫描器、花括号位置和正文哈希
+        """
+        events = []
+        pending = {}
         
-        for i in range(min_length):
-            coordinates_pairs.append((latitudes[i], longitudes[i]))
+        def report_coordinates(_text):
+            # 每块扫描后按位置配对：纬度后200字符内的经度视为同一坐标，下载未完成即输出
+            for kind, value, offset in sorted(events, key=lambda event: event[2]):
+                if kind == 'latitude' and is_valid_latitude(value):
+                    pending['lat'] = (value, offset)
+                elif kind == 'longitude' and 'lat' in pending and is_valid_longitude(value):
+                    lat, lat_offset = pending.pop('lat')
+                    if offset - lat_offset <= 200:
+                        print(f"  📍 [{source_key}] 流式发现坐标: ({lat}, {value})")
+            events.clear()
         
-        return coordinates_pairs
+        stream = create_page_stream(
+            on_match=lambda kind, value, offset: events.append((kind, value, offset))
+        )
+        response = stream_download(
+            self.client, url,
+            snapshot_path=self.snapshot_path(source_key),
+            consumers=stream_consumers(stream) + (report_coordinates,),
+            headers=self.headers,
+            timeout=30
+        )
+        close_stream(stream)
+        report_coordinates('')
+        return response, stream
     
-    def crawl_all_sources(self):
+    def process_stream_result(self, source_key, response, stream):
+        """处理流式抓取的结果，返回是否成功提取到数据"""
+        print(f"  ✅ 请求成功，流式读取: {response.streamed_chars} 字符")
+        
+        # 与非流式路径使用同一提取缓存条目（正文哈希相同则结果相同）
+        parsed = self.extraction_cache.get_or_extract(
+            None, 'guangdong_page', f"{PAGE_EXTRACTOR_VERSION}.{HYDRATION_VERSION}",
+            lambda _: parse_streamed_page(stream), digest=stream['digest'].hexdigest()
+        )
+        page_data = self.build_records_from_parsed(parsed, source_key)
+        
+        if page_data:
+            self.all_results.extend(page_data)
+            print(f"  🎉 成功提取: {len(page_data)} 个数据中心")
+        else:
+            print(f"  ⚠️ 未找到数据")
+        
+        print(f"  💾 页面源码已保存: {self.snapshot_path(source_key)}")
+        
+        return bool(page_data)
+    
+    def crawl_all_sources(self, concurrent=True):
         """爬取所有数据源"""
         print("🌟 广东省数据中心爬虫启动")
         print("🎯 目标：爬取广东省及主要城市的数据中心分布信息")
         print("="*70)
         
+        if not self.stream_downloads:
+            # 工作进程只运行 parse_page；某个数据源之前的数据源都解析完后即合并，不等全部下载结束
+            self.extract_pool = ExtractionPool(
+                parse_page, list(self.urls), max_workers=self.extract_workers, cache=self.extraction_cache,
+                extractor='guangdong_page', version=f"{PAGE_EXTRACTOR_VERSION}.{HYDRATION_VERSION}"
+            )
+            self.extracted_sources = 0
+        
+        try:
+            if concurrent:
+                success_count, failed_count = self.crawl_sources_concurrently()
+            else:
+                success_count, failed_count = self.crawl_sources_sequentially()
+            
+            if self.extract_pool is not None:
+                # 非流式模式下成功数以实际提取到数据的数据源为准
+                self.extracted_sources += self.merge_extracted_pages(self.extract_pool.collect())
+                success_count = self.extracted_sources
+        finally:
+            if self.extract_pool is not None:
+                self.extract_pool.close()
+                self.extract_pool = None
+        
+        print(f"\n{'='*70}")
+        print(f"📊 爬取统计:")
+        print(f"  ✅ 成功: {success_count} 个数据源")
+        print(f"  ❌ 失败: {failed_count} 个数据源")
+        print(f"  🎯 总计找到: {len(self.all_results)} 个数据中心")
+        
+        return self.all_results
+    
+    def crawl_sources_sequentially(self):
+        """逐个爬取数据源（请求速率由共享客户端的限速器控制）"""
         success_count = 0
         failed_count = 0
         
@@ -260,33 +464,22 @@ class GuangdongDataCenterCrawler:
             print("-" * 50)
             
             try:
-                response = requests.get(url, headers=self.headers, timeout=30)
+                if self.stream_downloads:
+                    response, stream = self.stream_source(source_key, url)
+                else:
+                    response = self.client.get(url, headers=self.headers, timeout=30)
                 
                 if response.status_code != 200:
                     print(f"  ❌ 请求失败: HTTP {response.status_code}")
                     failed_count += 1
                     continue
                 
-                print(f"  ✅ 请求成功，页面大小: {len(response.text)} 字符")
-                
-                # 提取数据
-                page_data = self.extract_data_from_page(response.text, source_key)
-                
-                if page_data:
-                    self.all_results.extend(page_data)
-                    print(f"  🎉 成功提取: {len(page_data)} 个数据中心")
-                    success_count += 1
+                if self.stream_downloads:
+                    succeeded = self.process_stream_result(source_key, response, stream)
                 else:
-                    print(f"  ⚠️ 未找到数据")
-                
-                # 保存页面源码用于调试
-                filename = f"html_sources/guangdong/{source_key.replace('-', '_')}_source.html"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
-                print(f"  💾 页面源码已保存: {filename}")
-                
-                # 请求间隔，避免被封IP
-                time.sleep(3)
+                    succeeded = self.process_response(source_key, response)
+                if succeeded:
+                    success_count += 1
                 
             except requests.exceptions.Timeout:
                 print(f"  ⏱️ 请求超时")
@@ -297,13 +490,81 @@ class GuangdongDataCenterCrawler:
             except Exception as e:
                 print(f"  ❌ 未知错误: {e}")
                 failed_count += 1
+            finally:
+                self.finish_source(source_key)
         
-        print(f"\n{'='*70}")
-        print(f"📊 爬取统计:")
-        print(f"  ✅ 成功: {success_count} 个数据源")
-        print(f"  ❌ 失败: {failed_count} 个数据源")
-        print(f"  🎯 总计找到: {len(self.all_results)} 个数据中心")
+        return success_count, failed_count
+    
+    def crawl_sources_concurrently(self):
+        """并发爬取数据源，响应到达后立即解析"""
+        counts = {'success': 0, 'failed': 0}
+        
+        print(f"⚡ 并发模式: 最多 {self.max_concurrency} 个并发请求, "
+              f"同一主机请求间隔 {self.per_host_interval} 秒")
+        
+        def handle_result(source_key, url, result, error):
+            print(f"\n🔍 已返回: {source_key}")
+            print(f"📍 URL: {url}")
+            print("-" * 50)
+            
+            if error is not None:
+                if isinstance(error, requests.exceptions.Timeout):
+                    print(f"  ⏱️ 请求超时")
+                elif isinstance(error, requests.exceptions.RequestException):
+                    print(f"  ❌ 网络错误: {error}")
+                else:
+                    print(f"  ❌ 未知错误: {error}")
+                counts['failed'] += 1
+                return
+            
+            response, stream = result if self.stream_downloads else (result, None)
+            if response.status_code != 200:
+                print(f"  ❌ 请求失败: HTTP {response.status_code}")
+                counts['failed'] += 1
+                return
+            
+            try:
+                if self.stream_downloads:
+                    succeeded = self.process_stream_result(source_key, response, stream)
+                else:
+                    succeeded = self.process_response(source_key, response)
+                if succeeded:
+                    counts['success'] += 1
+            except Exception as e:
+                print(f"  ❌ 未知错误: {e}")
+                counts['failed'] += 1
         
+        # 每个结果处理完后合并已就绪的提取结果
+        def on_result(source_key, url, result, error):
+            try:
+                handle_result(source_key, url, result, error)
+            finally:
+                self.finish_source(source_key)
+        
+        engine = AsyncFetchEngine(
+            client=self.client,
+            headers=self.headers,
+            max_concurrency=self.max_concurrency,
+            per_host_interval=self.per_host_interval,
+            timeout=30,
+            fetch=self.stream_source if self.stream_downloads else None
+        )
+        try:
+            engine.run(self.urls, on_result)
+        finally:
+            engine.close()
+        
+        return counts['success'], counts['failed']
+    
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        def extract(content, source_key):
+            page_data = self.extract_data_from_page(content, source_key)
+            self.all_results.extend(page_data)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract, source_keys=list(self.urls), default=list(self.urls)[0])
+        self.extraction_cache.print_stats()
         return self.all_results
     
     def save_results(self):
@@ -449,15 +710,30 @@ class GuangdongDataCenterCrawler:
 
 def main():
     """主函数"""
+    parser = add_replay_argument(argparse.ArgumentParser(description="广东省数据中心爬虫"))
+    parser.add_argument('--stream', action='store_true',
+                        help='流式下载：边下载边写快照边提取（不使用响应缓存）')
+    args = parser.parse_args()
+    replay_dir = args.replay
+    
     print("🚀 广东省数据中心爬虫启动")
     print("🎯 专业爬取广东省数据中心分布信息")
     print("📍 包含：深圳、广州、东莞、佛山、珠海、中山、惠州等主要城市")
     
-    crawler = GuangdongDataCenterCrawler()
+    # 条件GET缓存：未变化的页面由服务器返回304，正文从磁盘读取
+    cache = None if args.stream else ResponseCache()
+    crawler = GuangdongDataCenterCrawler(client=FetchClient(cache=cache))
+    crawler.stream_downloads = args.stream
     
     try:
         # 开始爬取
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
+            if cache:
+                cache.flush()
+                cache.print_stats()
         
         if results:
             # 显示结果
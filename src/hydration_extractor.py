@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内嵌应用状态JSON提取器
+datacenters.com 的页面由 React on Rails 渲染，组件初始数据以
+<script type="application/json" class="js-react-on-rails-component"> 形式内嵌在HTML中。
+直接解码这些JSON并遍历出完整的位置对象，名称与坐标来自同一对象，无需再配对。
+流式下载时由 ScriptBlockCollector 边下载边收集脚本正文，与完整页面的提取结果相同。
+"""
+
+import json
+import re
+
+# 内嵌JSON的 <script> 起始标签
+SCRIPT_OPEN = re.compile(r'<script\b([^>]*)>', re.IGNORECASE)
+# 起始标签中的 type 属性
+SCRIPT_TYPE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+# 脚本结束标签（HTML标签名不区分大小写，允许 </script > 这样的空白）
+SCRIPT_CLOSE = re.compile(r'</script\s*>', re.IGNORECASE)
+# 内联脚本中的全局状态赋值，例如 window.__INITIAL_STATE__ = {...}
+STATE_ASSIGNMENT = re.compile(r'window\.__[A-Za-z0-9_]+__\s*=\s*')
+
+LATITUDE_KEYS = ('latitude', 'lat')
+LONGITUDE_KEYS = ('longitude', 'lng', 'lon')
+NAME_KEYS = ('name', 'title', 'facility_name')
+ADDRESS_KEYS = ('fullAddress', 'address', 'full_address', 'formattedAddress')
+ID_KEYS = ('id', 'locationId', 'facilityId')
+
+# 提取逻辑版本，修改本模块的提取结果时递增，使提取结果缓存失效
+EXTRACTOR_VERSION = 2
+
+
+def iter_script_blocks(html):
+    """单遍扫描页面，按出现顺序产出 (起始标签属性, 正文起点, 正文终点)
+
+    起始标签和结束标签各做一次短正则匹配，正文不参与匹配，不会跨越整个文档回溯。
+    """
+    position = 0
+    while True:
+        match = SCRIPT_OPEN.search(html, position)
+        if not match:
+            break
+        body_start = match.end()
+        close = SCRIPT_CLOSE.search(html, body_start)
+        if not close:
+            break
+        position = close.end()
+        yield match.group(1), body_start, close.start()
+
+
+def iter_script_json(html, script_type):
+    """产出 type 属性等于 script_type 的脚本中的JSON数据（如 application/ld+json）"""
+    script_type = script_type.lower()
+    for attributes, body_start, body_end in iter_script_blocks(html):
+        type_match = SCRIPT_TYPE.search(attributes)
+        if not type_match or type_match.group(1).lower() != script_type:
+            continue
+        try:
+            yield json.loads(html[body_start:body_end])
+        except ValueError:
+            continue
+
+
+def decode_script_block(attributes, body):
+    """产出一个脚本正文中内嵌的JSON数据（已解码）"""
+    if 'json' in attributes.lower():
+        # type="application/json" / "application/ld+json" 以及 __NEXT_DATA__ 等
+        try:
+            yield json.loads(body)
+        except ValueError:
+            pass
+        return
+
+    # 普通内联脚本：只解析 window.__XXX__ = {...} 形式的状态赋值
+    decoder = json.JSONDecoder()
+    for assignment in STATE_ASSIGNMENT.finditer(body):
+        try:
+            data, _ = decoder.raw_decode(body, assignment.end())
+        except ValueError:
+            continue
+        yield data
+
+
+def iter_json_blocks(html):
+    """按出现顺序产出页面中内嵌的JSON数据（已解码）"""
+    for attributes, body_start, body_end in iter_script_blocks(html):
+        yield from decode_script_block(attributes, html[body_start:body_end])
+
+
+class ScriptBlockCollector:
+    """分块送入页面文本，解码其中的内嵌JSON（可作为流式下载的 consumer）
+
+    脚本之外的文本读过即丢弃，只保留尚未闭合的 <script> 正文，内存占用以最大的脚本为限。
+    """
+
+    def __init__(self):
+        # 按出现顺序解码出的JSON数据
+        self.data = []
+        self._buffer = ""
+        # 当前所在脚本的起始标签属性，None 表示不在脚本内
+        self._attributes = None
+        # 缓冲区中已确认不含结束标签的前缀长度
+        self._searched = 0
+
+    def feed(self, text):
+        self._buffer += text
+        while True:
+            if self._attributes is None:
+                match = SCRIPT_OPEN.search(self._buffer)
+                if not match:
+                    # 只保留可能是被截断的起始标签的尾部
+                    tail = self._buffer.rfind('<')
+                    self._buffer = self._buffer[tail:] if tail != -1 else ""
+                    return
+                self._attributes = match.group(1)
+                self._buffer = self._buffer[match.end():]
+                self._searched = 0
+
+            close = SCRIPT_CLOSE.search(self._buffer, self._searched)
+            if not close:
+                # 被截断的结束标签只可能从最后一个 '<' 开始
+                self._searched = max(self._searched, self._buffer.rfind('<'))
+                return
+            self.data.extend(decode_script_block(self._attributes, self._buffer[:close.start()]))
+            self._buffer = self._buffer[close.end():]
+            self._attributes = None
+
+    def close(self):
+        """输入结束（未闭合的脚本与 iter_script_blocks 一样被忽略）"""
+        self._buffer = ""
+        self._attributes = None
+
+    def locations(self):
+        """与 extract_locations 对完整页面的结果相同"""
+        return collect_locations(self.data)
+
+
+def _first_value(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _to_location(item):
+    """把带坐标和名称的对象转换为位置记录，不符合时返回None"""
+    latitude = _first_value(item, LATITUDE_KEYS)
+    longitude = _first_value(item, LONGITUDE_KEYS)
+    name = _first_value(item, NAME_KEYS)
+    if latitude is None or longitude is None or not isinstance(name, str):
+        return None
+
+    try:
+        latitude = float(latitude)
+        longitude = float(longitude)
+    except (TypeError, ValueError):
+        return None
+
+    return {
+        'id': _first_value(item, ID_KEYS),
+        'name': name.strip(),
+        'latitude': latitude,
+        'longitude': longitude,
+        'address': _first_value(item, ADDRESS_KEYS) or '',
+        'provider': item.get('providerName') or '',
+        'url': item.get('url') or '',
+    }
+
+
+def iter_locations(data):
+    """遍历解码后的JSON，按文档顺序产出位置记录
+
+    只取列表中的对象：页面本身所在地区（division/city）虽然也有名称和中心点坐标，
+    但它是单个对象而不是列表元素，不会被当作数据中心。
+    """
+    # 显式栈代替递归，避免深层嵌套时超出递归深度
+    stack = [(data, False)]
+    while stack:
+        node, in_list = stack.pop()
+        if isinstance(node, dict):
+            if in_list:
+                location = _to_location(node)
+                if location is not None:
+                    yield location
+                    continue
+            stack.extend((value, False) for value in reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend((value, True) for value in reversed(node))
+
+
+def collect_locations(data_blocks):
+    """从解码后的JSON数据中收集位置记录，按 id（无 id 时按坐标）去重"""
+    locations = []
+    seen = set()
+
+    for data in data_blocks:
+        for location in iter_locations(data):
+            if location['id'] is not None:
+                key = ('id', location['id'])
+            else:
+                key = ('coord', round(location['latitude'], 6), round(location['longitude'], 6))
+            if key in seen:
+                continue
+            seen.add(key)
+            locations.append(location)
+
+    return locations
+
+
+def extract_locations(html):
+    """从页面内嵌JSON中提取所有位置记录，按 id（无 id 时按坐标）去重"""
+    return collect_locations(iter_json_blocks(html))
+
+
+def _within(bounds, lat, lng):
+    if callable(bounds):
+        return bounds(lat, lng)
+    lat_min, lat_max, lng_min, lng_max = bounds
+    return lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
+
+
+def build_records_from_locations(locations, bounds, region, source_key, unique_coordinates,
+                                 default_name, start_index=None, extra=None):
+    """把内嵌JSON中的位置对象转换为数据中心记录
+
+    bounds: 省份范围 (最小纬度, 最大纬度, 最小经度, 最大经度)，或 bounds(lat, lng) -> bool
+    region: 记录开头的地区字段，如 {'province': '广东省', 'city': '深圳市'}
+    unique_coordinates: 跨数据源的坐标去重集合，原地更新
+    default_name: 位置对象没有名称时的名称前缀，后接序号
+    start_index: 不为None时记录带 index 字段，从 start_index + 1 起编号
+    extra: 追加在记录末尾的字段，如 crawl_time
+    """
+    found_data = []
+    out_of_bounds = 0
+    print(f"  从内嵌JSON找到: {len(locations)} 个位置对象")
+
+    for item in locations:
+        lat, lng = item['latitude'], item['longitude']
+
+        # 验证坐标是否在省份范围内
+        if not _within(bounds, lat, lng):
+            out_of_bounds += 1
+            continue
+
+        # 检查是否重复
+        coord_key = (round(lat, 6), round(lng, 6))
+        if coord_key in unique_coordinates:
+            print(f"  跳过重复坐标: ({lat}, {lng})")
+            continue
+        unique_coordinates.add(coord_key)
+
+        data_center = dict(region)
+        data_center.update({
+            'latitude': lat,
+            'longitude': lng,
+            'name': item['name'] or f"{default_name}{len(found_data) + 1}",
+            'address': item['address'],
+            'provider': item['provider'],
+            'facility_id': item['id'],
+            'source': source_key,
+            'coordinates': f"{lat},{lng}",
+        })
+        if start_index is not None:
+            data_center['index'] = start_index + len(found_data) + 1
+        data_center.update(extra or {})
+
+        found_data.append(data_center)
+        print(f"  {len(found_data)}. {data_center['name']} - ({lat:.6f}, {lng:.6f})")
+
+    if out_of_bounds:
+        print(f"  跳过范围外坐标: {out_of_bounds} 个")
+    return found_data
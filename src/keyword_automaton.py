@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词自动机（Aho-Corasick）
+把一组关键词预编译成确定性自动机，对候选字符串只扫描一遍就能得到它包含哪些类别的关键词，
+耗时只与字符串长度有关，与关键词和地名的数量无关。匹配不区分大小写，按子串匹配。
+"""
+
+from collections import deque
+
+# 数据中心名称关键词
+DATACENTER_KEYWORDS = ['Data Center', 'IDC', '数据中心', '机房', '云计算']
+
+# 各省份的名称关键词配置 {省份: {类别: [关键词]}}
+#   datacenter: 数据中心名称关键词; region: 省内地名（用于识别名称候选）;
+#   related: 判断名称是否属于该省份时使用的宽松关键词
+PROVINCE_KEYWORDS = {
+    '广东省': {
+        'datacenter': DATACENTER_KEYWORDS,
+        'region': [
+            '广东', '深圳', '广州', '东莞', '佛山', '珠海', '中山', '惠州',
+            'Guangdong', 'Shenzhen', 'Guangzhou',
+        ],
+    },
+    '上海市': {
+        'datacenter': DATACENTER_KEYWORDS + ['DC'],
+        'region': [
+            '上海', 'Shanghai', '浦东', '黄浦', '徐汇', '长宁', '静安', '普陀', '虹口',
+            '杨浦', '闵行', '宝山', '嘉定', '金山', '松江', '青浦', '奉贤', '崇明',
+        ],
+        'related': [
+            '上海', 'Shanghai', 'SH', '浦东', '黄浦', '徐汇', '长宁', '静安',
+            '普陀', '虹口', '杨浦', '闵行', '宝山', '嘉定', '金山', '松江',
+            '青浦', '奉贤', '崇明', 'Pudong', 'Huangpu', 'Xuhui',
+        ],
+    },
+}
+
+
+class KeywordAutomaton:
+    """预编译的多关键词自动机"""
+
+    def __init__(self, keywords):
+        """keywords: {类别: [关键词]}"""
+        goto = [{}]
+        outputs = [set()]
+        for category, words in keywords.items():
+            for word in words:
+                state = 0
+                for char in word.lower():
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto.append({})
+                        outputs.append(set())
+                        goto[state][char] = next_state
+                    state = next_state
+                outputs[state].add(category)
+
+        # 按层计算失败链接，并把失败链接上的转移展开到每个状态，扫描时每个字符只查一次表
+        self._delta = [dict(goto[0])]
+        self._delta.extend({} for _ in range(len(goto) - 1))
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta = dict(self._delta[fail[state]])
+            delta.update(goto[state])
+            self._delta[state] = delta
+            for char, next_state in goto[state].items():
+                fail[next_state] = self._delta[fail[state]].get(char, 0)
+                queue.append(next_state)
+
+        self._outputs = [frozenset(output) for output in outputs]
+        self.states = len(goto)
+
+    def categories(self, text):
+        """返回文本中出现的关键词类别集合"""
+        delta = self._delta
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+    def contains(self, text, categories=None):
+        """文本是否包含（指定类别的）关键词，命中即返回"""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char, 0)
+            output = outputs[state]
+            if output and (categories is None or not output.isdisjoint(categories)):
+                return True
+        return False
+
+
+def build_province_automaton(province):
+    """用省份的关键词配置构建自动机"""
+    return KeywordAutomaton(PROVINCE_KEYWORDS[province])
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+精简浏览器配置
+坐标提取只需要页面HTML、脚本和接口数据。地图瓦片、图片、字体、音视频和统计脚本占了页面加载的大部分流量和内存，
+这里在 ChromeOptions 中打开无头模式、关闭用不到的浏览器功能并限制窗口大小，
+浏览器启动后再通过 DevTools（Network.setBlockedURLs）在网络层拦截这些请求。
+"""
+
+# 限制后的窗口大小（地图按视口缩放，过小会使更多标记被聚合）
+LEAN_WINDOW_SIZE = (1366, 768)
+
+# 拦截的URL模式（'*' 为通配符，匹配整个URL）
+BLOCKED_URL_PATTERNS = [
+    # 图片
+    '*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*', '*.avif*',
+    # 字体
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*', '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    # 音视频
+    '*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.m3u8*',
+    # 地图瓦片（地图脚本 maps/api/js 不拦截，标记仍会渲染）
+    '*maps.googleapis.com/maps/vt*', '*maps.googleapis.com/maps/api/staticmap*',
+    '*khms*.google.com*', '*mt*.google.com/vt*', '*tile.openstreetmap.org*', '*basemaps.cartocdn.com*',
+    # 统计与广告
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*googleadservices.com*', '*connect.facebook.net*', '*hotjar.com*', '*clarity.ms*',
+    '*hs-analytics.net*', '*hs-scripts.com*', '*segment.io*', '*cdn.segment.com*', '*snap.licdn.com*',
+]
+
+# 关闭的浏览器功能（--disable-features 只认最后一个，需与已有的值合并）
+DISABLED_FEATURES = [
+    'Translate', 'MediaRouter', 'OptimizationHints', 'BackForwardCache',
+    'InterestFeedContentSuggestions', 'CalculateNativeWinOcclusion', 'AutofillServerCommunication',
+]
+
+LEAN_ARGUMENTS = [
+    '--headless=new',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-domain-reliability',
+    '--disable-client-side-phishing-detection',
+    '--disable-notifications',
+    '--mute-audio',
+    '--no-first-run',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# 内容设置：2 = 阻止
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'profile.default_content_setting_values.media_stream': 2,
+}
+
+
+def apply_lean_options(options, window_size=LEAN_WINDOW_SIZE, headless=True):
+    """把 ChromeOptions 改为精简配置（替换已有的窗口大小和无头参数，合并 --disable-features）"""
+    arguments = options.arguments
+    disabled = []
+    kept = []
+    for argument in arguments:
+        if argument.startswith('--disable-features='):
+            disabled.extend(argument.split('=', 1)[1].split(','))
+        elif not argument.startswith(('--window-size', '--headless', '--start-maximized')):
+            kept.append(argument)
+    arguments[:] = kept
+
+    for argument in LEAN_ARGUMENTS:
+        if argument.startswith('--headless') and not headless:
+            continue
+        if argument not in arguments:
+            options.add_argument(argument)
+    for feature in DISABLED_FEATURES:
+        if feature not in disabled:
+            disabled.append(feature)
+    options.add_argument('--disable-features=' + ','.join(disabled))
+    options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+
+    prefs = dict(options.experimental_options.get('prefs', {}))
+    prefs.update(LEAN_PREFS)
+    options.add_experimental_option('prefs', prefs)
+    return options
+
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """在浏览器网络层拦截匹配的请求，成功返回True（非Chrome驱动不支持时返回False）"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+        return True
+    except Exception as e:
+        print(f"⚠️ 资源拦截不可用，将加载完整页面: {e}")
+        return False
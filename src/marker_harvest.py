@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器内批量采集地图标记
+逐个元素调用 get_attribute 时，每个属性都是一次 WebDriver 往返。这里用一次 execute_script 在页面内
+遍历所有标记，把坐标、title、aria-label 和聚合数量序列化成一个JSON数组返回，采集耗时与标记数量无关。
+每个标记会被打上 data-harvest-id，之后可以按编号点击，不必持有 WebElement。
+"""
+
+import json
+
+from marker_scanner import parse_position
+
+# 标记元素的选择器（合并为一个选择器查询，按文档顺序返回且不重复）
+MARKER_SELECTORS = [
+    "gmp-advanced-marker[position]",
+    "[position*=',']",
+    "gmp-advanced-marker",
+    "[tabindex='-1'][position]",
+    ".yNHHyP-marker-view",
+    "[role='button'][position]",
+]
+
+# 采集脚本：同一坐标只保留第一个元素；aria-label/title（都没有时取文本）为数字的是聚合点
+HARVEST_SCRIPT = """
+var markers = [];
+var seen = {};
+document.querySelectorAll(arguments[0]).forEach(function (element) {
+  var position = element.getAttribute('position');
+  if (!position || position.indexOf(',') < 0 || seen[position]) return;
+  seen[position] = true;
+
+  var title = element.getAttribute('title');
+  var label = element.getAttribute('aria-label');
+  var candidates = title || label ? [label, title] : [element.textContent];
+  var count = null;
+  for (var i = 0; i < candidates.length; i++) {
+    var value = (candidates[i] || '').trim();
+    if (/^[0-9]+$/.test(value)) { count = parseInt(value, 10); break; }
+  }
+
+  element.setAttribute('data-harvest-id', markers.length);
+  markers.push({id: markers.length, position: position, title: title, ariaLabel: label, clusterCount: count});
+});
+return JSON.stringify(markers);
+"""
+
+# 按编号滚动到标记并点击
+CLICK_SCRIPT = """
+var element = document.querySelector('[data-harvest-id="' + arguments[0] + '"]');
+if (!element) return false;
+element.scrollIntoView({block: 'center'});
+element.click();
+return true;
+"""
+
+# 按选择器顺序返回可见文本（去除首尾空白后长度超过 arguments[1] 的）
+TEXTS_SCRIPT = """
+var selectors = arguments[0];
+var minLength = arguments[1];
+var texts = [];
+selectors.forEach(function (selector) {
+  try {
+    document.querySelectorAll(selector).forEach(function (element) {
+      var text = (element.innerText || '').trim();
+      if (text.length > minLength) texts.push(text);
+    });
+  } catch (e) {}
+});
+return texts;
+"""
+
+
+def harvest_markers(driver, selectors=MARKER_SELECTORS):
+    """一次调用采集页面上的所有标记，返回记录列表（cluster_count 不为None的是聚合点）"""
+    raw = driver.execute_script(HARVEST_SCRIPT, ', '.join(selectors))
+
+    markers = []
+    for item in json.loads(raw or '[]'):
+        coordinates = parse_position(item['position'])
+        if coordinates is None:
+            continue
+        markers.append({
+            'id': item['id'],
+            'latitude': coordinates[0],
+            'longitude': coordinates[1],
+            'title': item['title'],
+            'aria_label': item['ariaLabel'],
+            'cluster_count': item['clusterCount'],
+            'position': item['position'],
+        })
+    return markers
+
+
+def click_marker(driver, marker_id):
+    """点击 harvest_markers 采集到的标记，标记已不在页面上时返回False"""
+    return bool(driver.execute_script(CLICK_SCRIPT, marker_id))
+
+
+def collect_texts(driver, selectors, min_length=5):
+    """一次调用取回各选择器匹配元素的文本，按选择器顺序排列"""
+    return driver.execute_script(TEXTS_SCRIPT, list(selectors), min_length) or []
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+地图标记扫描器
+单遍扫描渲染后的地图页面，只解析 <gmp-advanced-marker> 的起始标签：
+用字符串查找定位标签起止（跳过引号括起的属性值中的 '>'），属性只在标签文本内解析，不跨越标签内容回溯，
+耗时与页面大小成线性关系。
+aria-label/title 为数字的标记是聚合点（该位置附近的数据中心数量），其余为单个数据中心标记。
+支持分块送入，可直接作为流式下载的 consumer。
+"""
+
+import re
+from collections import namedtuple
+
+MARKER_TAG = '<gmp-advanced-marker'
+# 起始标签的最大长度，分块之间为未闭合的标签最多保留这么多字符，超过时视为残缺标签丢弃
+MAX_TAG_LENGTH = 8192
+
+# 标签文本中的属性：name="value" / name='value' / name=value / name
+ATTRIBUTE = re.compile(r'''([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+# 标签中需要处理的字符：结束标签的 '>' 和可能引出带引号属性值的 '='
+TAG_SPECIAL = re.compile(r'[>=]')
+# '=' 之后（允许空白）的开引号
+QUOTED_VALUE_START = re.compile(r'''\s*(["'])''')
+
+# offset: 标签在页面中的位置
+Marker = namedtuple('Marker', ['latitude', 'longitude', 'title', 'offset'])
+Cluster = namedtuple('Cluster', ['count', 'latitude', 'longitude', 'offset'])
+
+
+def parse_attributes(tag_text):
+    """解析起始标签文本中的属性，属性名转为小写"""
+    attributes = {}
+    for match in ATTRIBUTE.finditer(tag_text):
+        name, double, single, bare = match.groups()
+        value = double if double is not None else single if single is not None else bare
+        attributes.setdefault(name.lower(), value if value is not None else '')
+    return attributes
+
+
+def find_tag_end(text, position):
+    """从 position 起查找起始标签结束的 '>'，引号括起的属性值中的 '>' 不算；标签尚未结束时返回 -1"""
+    while True:
+        match = TAG_SPECIAL.search(text, position)
+        if not match:
+            return -1
+        if match.group() == '>':
+            return match.start()
+        quote = QUOTED_VALUE_START.match(text, match.end())
+        if not quote:
+            position = match.end()
+            continue
+        close = text.find(quote.group(1), quote.end())
+        if close == -1:
+            return -1
+        position = close + 1
+
+
+def parse_position(position):
+    """把 "lat,lng" 解析为 (纬度, 经度)，格式不对时返回None"""
+    if not position or ',' not in position:
+        return None
+    parts = position.split(',')
+    try:
+        return float(parts[0].strip()), float(parts[1].strip())
+    except ValueError:
+        return None
+
+
+class MarkerScanner:
+    """标记扫描器，分块之间只保留可能被截断的标签"""
+
+    def __init__(self):
+        self.markers = []
+        self.clusters = []
+        self.buffer = ""
+        # buffer 第一个字符在整个页面中的位置
+        self.buffer_start = 0
+
+    def feed(self, text):
+        """送入下一块文本"""
+        buffer = self.buffer + text
+        position = 0
+        while True:
+            start = buffer.find(MARKER_TAG, position)
+            if start == -1:
+                # 末尾可能是被截断的标签名，留到下一块
+                keep = max(len(buffer) - len(MARKER_TAG) + 1, position)
+                break
+
+            name_end = start + len(MARKER_TAG)
+            if name_end < len(buffer) and buffer[name_end] not in ' \t\r\n/>':
+                # 其他以同样前缀开头的标签
+                position = name_end
+                continue
+
+            close = find_tag_end(buffer, name_end)
+            if close == -1:
+                # 标签尚未结束，留到下一块
+                keep = start
+                if len(buffer) - keep > MAX_TAG_LENGTH:
+                    keep = buffer.rfind(MARKER_TAG, start)
+                    if len(buffer) - keep > MAX_TAG_LENGTH:
+                        keep = len(buffer) - len(MARKER_TAG) + 1
+                break
+
+            self._handle(buffer[name_end:close], self.buffer_start + start)
+            position = close + 1
+
+        self.buffer = buffer[keep:]
+        self.buffer_start += keep
+
+    def close(self):
+        """输入结束，丢弃未闭合的标签"""
+        self.buffer = ""
+        return self
+
+    def _handle(self, tag_text, offset):
+        attributes = parse_attributes(tag_text)
+        coordinates = parse_position(attributes.get('position'))
+        if coordinates is None:
+            return
+        lat, lng = coordinates
+
+        # 聚合点的 aria-label / title 是数量
+        for key in ('aria-label', 'title'):
+            value = attributes.get(key, '').strip()
+            if value.isdigit():
+                self.clusters.append(Cluster(int(value), lat, lng, offset))
+                return
+
+        title = attributes.get('title') or attributes.get('aria-label') or None
+        self.markers.append(Marker(lat, lng, title, offset))
+
+
+def scan_markers(content):
+    """扫描整个页面，返回 (单个标记列表, 聚合点列表)"""
+    scanner = MarkerScanner()
+    scanner.feed(content)
+    scanner.close()
+    return scanner.markers, scanner.clusters
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevTools 网络响应捕获
+通过 Chrome 的性能日志（goog:loggingPrefs）读取 DevTools Network 事件，找出页面发出的 XHR/fetch JSON 响应，
+再用 Network.getResponseBody 取回响应正文。翻页点击背后的接口数据可以直接解析，不必再从渲染后的DOM中抓取。
+"""
+
+import base64
+import json
+import re
+from urllib.parse import urlparse
+
+# 需要捕获的请求类型
+CAPTURED_RESOURCE_TYPES = ('XHR', 'Fetch')
+
+# 翻页接口：本站的位置/设施列表和搜索接口；地图聚合点和标记接口返回的是聚合位置，不是本页列表
+PAGINATION_API_PATH = re.compile(r'/(?:locations|facilities|search)', re.IGNORECASE)
+MAP_API_PATH = re.compile(r'cluster|marker', re.IGNORECASE)
+
+
+def is_pagination_api(url):
+    """是否为翻页时请求的数据中心列表接口"""
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    return ((host == 'datacenters.com' or host.endswith('.datacenters.com')) and
+            bool(PAGINATION_API_PATH.search(parsed.path)) and not MAP_API_PATH.search(parsed.path))
+
+
+def enable_performance_logging(options):
+    """在创建浏览器前为 ChromeOptions 打开性能日志（DevTools 事件）"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+class NetworkCapture:
+    """从性能日志中收集 JSON 接口响应"""
+
+    def __init__(self, driver, url_filter=None):
+        self.driver = driver
+        # url_filter(url) -> bool，只保留感兴趣的接口；None 表示全部
+        self.url_filter = url_filter
+        # {requestId: url}，已收到响应头、正文尚未加载完成的请求
+        self._responses = {}
+
+        self.stats = {
+            'responses': 0,     # 捕获的JSON响应
+            'bytes': 0,         # 响应正文字符数
+            'failed': 0,        # 正文已不可取或不是合法JSON
+        }
+
+    def start(self):
+        """启用 Network 域并丢弃之前积累的日志"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.get_log('performance')
+        self._responses.clear()
+        return self
+
+    def _read_events(self):
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            yield message.get('method'), message.get('params', {})
+
+    def collect(self):
+        """返回自上次调用以来加载完成的 JSON 响应 [(url, 解码后的数据)]"""
+        captured = []
+        finished = []
+
+        for method, params in self._read_events():
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if (params.get('type') in CAPTURED_RESOURCE_TYPES and
+                        'json' in response.get('mimeType', '') and
+                        (self.url_filter is None or self.url_filter(response.get('url', '')))):
+                    self._responses[params['requestId']] = response.get('url', '')
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._responses:
+                finished.append(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                self._responses.pop(params.get('requestId'), None)
+
+        for request_id in finished:
+            url = self._responses.pop(request_id)
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                body = result.get('body', '')
+                if result.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8', errors='replace')
+                data = json.loads(body)
+            except Exception:
+                self.stats['failed'] += 1
+                continue
+
+            self.stats['responses'] += 1
+            self.stats['bytes'] += len(body)
+            captured.append((url, data))
+
+        return captured
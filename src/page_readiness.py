@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件驱动的页面就绪判断
+在页面中注入 MutationObserver 并包装 fetch/XMLHttpRequest，记录最近一次DOM变化和网络请求的时间；
+Python 端轮询这份状态，页面加载完成、网络空闲、DOM（及标记数量）在一小段静默期内不再变化时立即返回，
+代替固定的 time.sleep。翻页等操作前先取 mark()，之后只接受发生在操作之后的变化。
+"""
+
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from driver_pool import add_startup_script
+
+# 注入页面的状态记录脚本（重复执行无副作用）
+READINESS_SCRIPT = """
+(function () {
+  if (window.__readiness) return;
+  var now = function () { return performance.now(); };
+  var state = window.__readiness = {
+    mutations: 0, lastMutation: now(), pending: 0, requests: 0, lastNetwork: now()
+  };
+  var network = function (delta) {
+    state.pending = Math.max(state.pending + delta, 0);
+    if (delta > 0) state.requests++;
+    state.lastNetwork = now();
+  };
+  var observe = function () {
+    // 只观察节点增删和文本变化，地图动画等属性变化不影响判断
+    new MutationObserver(function (records) {
+      state.mutations += records.length;
+      state.lastMutation = now();
+    }).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  };
+  if (document.documentElement) observe();
+  else document.addEventListener('DOMContentLoaded', observe);
+
+  if (window.fetch) {
+    var originalFetch = window.fetch;
+    window.fetch = function () {
+      network(1);
+      return originalFetch.apply(this, arguments).finally(function () { network(-1); });
+    };
+  }
+  var originalSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    network(1);
+    this.addEventListener('loadend', function () { network(-1); });
+    return originalSend.apply(this, arguments);
+  };
+})();
+"""
+
+# 读取状态（页面未注入时先注入，此后的变化仍能被记录）
+SNAPSHOT_SCRIPT = READINESS_SCRIPT + """
+var state = window.__readiness;
+var selector = arguments[0];
+return {
+  origin: performance.timeOrigin,
+  readyState: document.readyState,
+  mutations: state.mutations,
+  requests: state.requests,
+  pending: state.pending,
+  sinceMutation: (performance.now() - state.lastMutation) / 1000,
+  sinceNetwork: (performance.now() - state.lastNetwork) / 1000,
+  count: selector ? document.querySelectorAll(selector).length : null
+};
+"""
+
+
+class _ReadyCondition:
+    """WebDriverWait 的等待条件，满足时返回页面状态"""
+
+    def __init__(self, readiness, selector, min_count, since):
+        self.readiness = readiness
+        self.selector = selector
+        self.min_count = min_count
+        self.since = since
+        # 元素数量及其最近一次变化的时间
+        self.count = None
+        self.count_changed = time.monotonic()
+
+    def __call__(self, driver):
+        state = driver.execute_script(SNAPSHOT_SCRIPT, self.selector)
+        readiness = self.readiness
+
+        if state['count'] != self.count:
+            self.count = state['count']
+            self.count_changed = time.monotonic()
+
+        if state['readyState'] != 'complete':
+            return False
+        if (self.since is not None and state['origin'] == self.since['origin'] and
+                state['mutations'] <= self.since['mutations'] and state['requests'] <= self.since['requests']):
+            # 操作之后页面还没有任何变化（跳转到新文档也算变化）
+            return False
+        # 长连接、统计信标等迟迟不结束的请求超过 stalled_request 秒后不再等待
+        if state['pending'] and state['sinceNetwork'] < readiness.stalled_request:
+            return False
+        if state['sinceNetwork'] < readiness.quiet or state['sinceMutation'] < readiness.quiet:
+            return False
+        if self.selector and (state['count'] < self.min_count or
+                              time.monotonic() - self.count_changed < readiness.quiet):
+            # 标记数量不足或仍在变化
+            return False
+        return state
+
+
+class PageReadiness:
+    """页面就绪等待"""
+
+    def __init__(self, driver, timeout=15, quiet=0.5, poll=0.1, stalled_request=5):
+        self.driver = driver
+        # 最长等待时间（秒）
+        self.timeout = timeout
+        # DOM和网络连续静默多久视为渲染完成
+        self.quiet = quiet
+        self.poll = poll
+        self.stalled_request = stalled_request
+
+    def install(self):
+        """在之后加载的每个页面开始执行前注入状态脚本（非Chrome驱动退回到只注入当前页面）"""
+        try:
+            # 同一浏览器重复 install 不会重复注册，归还浏览器池时移除
+            add_startup_script(self.driver, READINESS_SCRIPT)
+        except Exception:
+            pass
+        try:
+            self.driver.execute_script(READINESS_SCRIPT)
+        except WebDriverException:
+            pass
+        return self
+
+    def mark(self):
+        """记录当前的变化计数，传给 wait(since=...) 只等待之后发生的变化"""
+        try:
+            return self.driver.execute_script(SNAPSHOT_SCRIPT, None)
+        except WebDriverException:
+            return None
+
+    def wait(self, selector=None, min_count=0, since=None, timeout=None):
+        """等待页面就绪，返回最后一次读取的页面状态；超时返回None
+
+        selector/min_count: 要求匹配 selector 的元素（如地图标记）至少 min_count 个，且数量已稳定
+        since: mark() 的返回值，要求页面在其之后发生过变化
+        """
+        condition = _ReadyCondition(self, selector, min_count, since)
+        try:
+            return WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll).until(condition)
+        except WebDriverException:
+            # 超时（TimeoutException）或页面脚本执行失败
+            return None
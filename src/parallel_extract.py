@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程页面提取
+抓取线程只负责下载，页面正文交给进程池解析（正则提取是CPU密集型工作）。
+工作进程只运行模块级的解析函数 parse(content, *args)，返回可JSON序列化的解析结果，不创建爬虫实例；
+记录构建和跨数据源的坐标去重在主进程中完成。结果按数据源顺序产出：某个数据源之前的数据源都已完成时，
+它的结果即可取回合并，不必等所有下载结束。
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 缓存未命中标记
+_MISSING = object()
+
+
+def _run_parser(parse, content, args):
+    """在工作进程中解析一个页面，返回 (解析结果, 解析过程的输出)
+
+    输出先缓存起来，由主进程按数据源顺序打印，避免多个进程的日志交错。
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        result = parse(content, *args)
+    return result, log.getvalue()
+
+
+class ExtractionPool:
+    """页面提取进程池
+
+    parse: 模块级函数（须可被pickle），parse(content, *args) -> 可JSON序列化的解析结果
+    cache: 可选的 ExtractionCache，命中时不再提交解析；extractor/version 为缓存条目的名称和版本，
+           submit 的附加参数会拼入名称，参数不同的结果分开缓存
+    submit() 在下载完成后立即提交页面，解析与后续下载并行进行；下载失败的数据源调用 skip()。
+    ready() 不阻塞，按 source_order 的顺序产出前面数据源都已完成的结果；collect() 等待并产出其余全部结果。
+    """
+
+    def __init__(self, parse, source_order, max_workers=None, cache=None, extractor=None, version=None):
+        self.parse = parse
+        self.order = list(source_order)
+        self.max_workers = max_workers or min(os.cpu_count() or 1, max(len(self.order), 1))
+        self.cache = cache
+        self.extractor = extractor or parse.__name__
+        self.version = version
+
+        self.executor = None
+        if self.max_workers > 1:
+            try:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError) as e:
+                print(f"⚠️ 无法创建提取进程池，改为在主进程中解析: {e}")
+
+        # {source_key: (future, 已完成的 (结果, 输出, 异常), 缓存键)}；skip 的数据源为 None
+        self.entries = {}
+        # 下一个待产出的数据源在 self.order 中的位置
+        self.position = 0
+
+    def _cache_key(self, content, args):
+        extractor = '.'.join([self.extractor] + [str(arg) for arg in args])
+        return self.cache.digest_of(content), extractor, self.version
+
+    def submit(self, source_key, content, *args):
+        """提交一个已下载的页面，args 为传给 parse 的附加参数"""
+        if source_key not in self.order:
+            self.order.append(source_key)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(content, args)
+            result = self.cache.get(*cache_key, default=_MISSING)
+            if result is not _MISSING:
+                self.entries[source_key] = (None, (result, "", None), None)
+                return
+
+        if self.executor is not None:
+            future = self.executor.submit(_run_parser, self.parse, content, args)
+            self.entries[source_key] = (future, None, cache_key)
+        else:
+            # 单进程模式：在本进程内立即解析
+            self.entries[source_key] = (None, self._finish(lambda: _run_parser(self.parse, content, args),
+                                                           cache_key), None)
+
+    def skip(self, source_key):
+        """标记没有页面可解析的数据源（下载失败），不阻塞其后数据源的结果"""
+        self.entries.setdefault(source_key, None)
+
+    def _finish(self, run, cache_key):
+        try:
+            result, log = run()
+        except Exception as e:
+            return None, "", e
+        if cache_key is not None:
+            self.cache.put(*cache_key, result)
+        return result, log, None
+
+    def _drain(self, wait):
+        while self.position < len(self.order):
+            source_key = self.order[self.position]
+            if source_key not in self.entries:
+                if not wait:
+                    return
+                # 既未提交也未 skip 的数据源视为没有页面
+                self.entries[source_key] = None
+
+            entry = self.entries[source_key]
+            if entry is not None:
+                future, done, cache_key = entry
+                if done is None:
+                    if not wait and not future.done():
+                        return
+                    done = self._finish(future.result, cache_key)
+                result, log, error = done
+                self.entries[source_key] = None
+                self.position += 1
+                yield source_key, result, log, error
+            else:
+                self.position += 1
+
+    def ready(self):
+        """不阻塞地按数据源顺序产出 (source_key, 解析结果, 解析输出, 异常)，遇到未完成的数据源即停止"""
+        return self._drain(wait=False)
+
+    def collect(self):
+        """按数据源顺序产出其余全部结果，必要时等待解析完成"""
+        return self._drain(wait=True)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
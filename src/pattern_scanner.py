@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单遍多模式提取引擎
+把页面中的坐标/名称正则合并成带命名分组的组合正则，一次扫描得到带类别和位置的匹配结果。
+
+"键: 值" 模式统一以冒号为锚点（键用后顾断言检查），标签模式以 '<' 为锚点。
+re 模块只有在正则以单个字面字符开头时才会使用快速查找，因此两类模式各编译成
+一个以字面字符开头的正则，而不是用字符集开头的单个正则（实测后者反而慢数倍）。
+"""
+
+import re
+from collections import namedtuple
+
+# 数值型取值（坐标）
+NUMBER = r'([\d\.\-]+)'
+
+# kind: 类别; index: 该类别内的模式序号; value: 第1个分组的取值; start/end: 取值在文本中的位置
+ScanMatch = namedtuple('ScanMatch', ['kind', 'index', 'value', 'start', 'end'])
+
+
+def _name_first_group(regex, group_name):
+    """把正则中第一个捕获分组改为命名分组"""
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            # 跳过字符集
+            i += 1
+            if i < len(regex) and regex[i] == ']':
+                i += 1
+            while i < len(regex) and regex[i] != ']':
+                i += 2 if regex[i] == '\\' else 1
+        elif char == '(' and not regex.startswith('(?', i):
+            return f"{regex[:i]}(?P<{group_name}>{regex[i + 1:]}"
+        i += 1
+    raise ValueError(f"正则缺少捕获分组: {regex}")
+
+
+class MultiPatternScanner:
+    """合并多个提取模式的单遍扫描器"""
+
+    def __init__(self, patterns):
+        """
+        patterns: [(类别, 键, 正则, 标志)]，同一类别内按声明顺序编号
+          键不为None时匹配 `键:` 之后（允许空白）的取值，例如 ('latitude', '"lat"', NUMBER, 0)
+          键为None时为标签模式，正则必须以 '<' 开头
+        正则中的第1个捕获分组为取值，其余分组须为非捕获分组；标志目前只支持 re.IGNORECASE。
+        """
+        self.kinds = []
+        self._groups = {}
+        kind_counts = {}
+
+        key_alternatives = []
+        tag_alternatives = []
+        for kind, key, regex, flags in patterns:
+            if kind not in kind_counts:
+                kind_counts[kind] = 0
+                self.kinds.append(kind)
+            group_name = f"g{len(self._groups)}"
+            self._groups[group_name] = (kind, kind_counts[kind])
+            kind_counts[kind] += 1
+
+            if key is not None:
+                alternative = f"(?<={re.escape(key)}:)\\s*{_name_first_group(regex, group_name)}"
+                alternatives = key_alternatives
+            elif regex.startswith('<'):
+                alternative = _name_first_group(regex[1:], group_name)
+                alternatives = tag_alternatives
+            else:
+                raise ValueError(f"标签模式必须以 '<' 开头: {regex}")
+
+            if flags & re.IGNORECASE:
+                alternative = f"(?i:{alternative})"
+            alternatives.append(alternative)
+
+        self._regexes = []
+        if key_alternatives:
+            self._regexes.append(re.compile(":(?:" + "|".join(key_alternatives) + ")"))
+        if tag_alternatives:
+            self._regexes.append(re.compile("<(?:" + "|".join(tag_alternatives) + ")"))
+
+    def _iter_regex(self, regex, text, pos, endpos):
+        for match in regex.finditer(text, pos, endpos):
+            group_name = match.lastgroup
+            kind, index = self._groups[group_name]
+            yield ScanMatch(kind, index, match.group(group_name), match.start(group_name), match.end(group_name))
+
+    def scan(self, text, pos=0, endpos=None):
+        """扫描文本，返回按位置排序的 ScanMatch 列表"""
+        if endpos is None:
+            endpos = len(text)
+        matches = []
+        for regex in self._regexes:
+            matches.extend(self._iter_regex(regex, text, pos, endpos))
+        if len(self._regexes) > 1:
+            matches.sort(key=lambda match: match.start)
+        return matches
+
+    @staticmethod
+    def values(matches, kind):
+        """某类匹配的取值，按模式序号、再按位置排列（与逐个模式 findall 再拼接的顺序一致）"""
+        selected = [match for match in matches if match.kind == kind]
+        selected.sort(key=lambda match: (match.index, match.start))
+        return [match.value for match in selected]
+
+    @staticmethod
+    def positions(matches, kind):
+        """某类匹配的 (偏移量, 取值)，按位置排列；同一位置被多个模式命中时只保留一个"""
+        positions = {}
+        for match in matches:
+            if match.kind == kind:
+                positions.setdefault(match.start, match.value)
+        return sorted(positions.items())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+四叉树边界框查询规划器
+先查询整个区域；结果数达到接口上限、或返回的聚合点表明还有未展开的设施时，
+把边界框四等分后逐层细分。设施稀疏处一次请求即可，密集处才继续细分。
+父区域响应中落在每个子区域内的设施数（聚合点按其数量计）作为子区域的预期数量向下传递，
+子区域返回的单点仍少于该数量时继续细分
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QuadtreeQueryPlanner:
+    """按结果密度递归四分边界框"""
+
+    def __init__(self, fetch_box, limit=50, max_depth=8, min_span=0.0005, max_workers=4):
+        # fetch_box(bbox) -> 记录列表，失败时返回None；bbox 为 (sw_lat, sw_lng, ne_lat, ne_lng)
+        self.fetch_box = fetch_box
+        # 接口单次返回的最大记录数，结果数达到该值说明被截断
+        self.limit = limit
+        self.max_depth = max_depth
+        # 边界框边长（度）小于该值时不再细分
+        self.min_span = min_span
+        self.max_workers = max_workers
+        self.stats = {'requests': 0, 'splits': 0, 'max_depth': 0, 'elapsed': 0.0}
+
+    @staticmethod
+    def split(bbox):
+        """把边界框四等分"""
+        sw_lat, sw_lng, ne_lat, ne_lng = bbox
+        mid_lat = (sw_lat + ne_lat) / 2
+        mid_lng = (sw_lng + ne_lng) / 2
+        return [
+            (sw_lat, sw_lng, mid_lat, mid_lng),
+            (sw_lat, mid_lng, mid_lat, ne_lng),
+            (mid_lat, sw_lng, ne_lat, mid_lng),
+            (mid_lat, mid_lng, ne_lat, ne_lng),
+        ]
+
+    @staticmethod
+    def child_expected_counts(children, records):
+        """统计父区域响应中落在每个子区域内的设施数（聚合点按 count 计），边界上的点只计入第一个子区域"""
+        counts = [0] * len(children)
+        for record in records:
+            lat, lng = record['latitude'], record['longitude']
+            for index, (sw_lat, sw_lng, ne_lat, ne_lng) in enumerate(children):
+                if sw_lat <= lat <= ne_lat and sw_lng <= lng <= ne_lng:
+                    counts[index] += record.get('count', 1)
+                    break
+        return counts
+
+    def needs_split(self, records, expected_count=None):
+        """判断该边界框的结果是否不完整"""
+        if not records:
+            # 空响应说明该区域没有可展开的设施，预期数量无法在更小的区域中找回
+            return False
+        if len(records) >= self.limit:
+            return True
+        # 聚合点（count > 1）说明该区域内还有未展开的设施
+        if any(record.get('count', 1) > 1 for record in records):
+            return True
+        if expected_count is not None:
+            return sum(1 for record in records if record.get('count', 1) <= 1) < expected_count
+        return False
+
+    def _query(self, bbox):
+        self.stats['requests'] += 1
+        try:
+            return self.fetch_box(bbox)
+        except Exception:
+            return None
+
+    def run(self, root_bbox, expected_count=None):
+        """从根边界框开始逐层查询，返回去重后的设施记录
+
+        expected_count: 根区域已知的设施数量（如聚合标记上的数字），
+        返回的单点少于预期数量时也会继续细分；子区域的预期数量取自父区域的响应
+        """
+        start = time.time()
+        results = []
+        seen_coords = set()
+
+        level = [(root_bbox, expected_count)]
+        depth = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while level:
+                self.stats['max_depth'] = depth
+                responses = list(executor.map(self._query, [bbox for bbox, _ in level]))
+
+                next_level = []
+                for (bbox, expected), records in zip(level, responses):
+                    if records is None:
+                        continue
+                    records = list(records)
+
+                    sw_lat, sw_lng, ne_lat, ne_lng = bbox
+                    can_split = (depth < self.max_depth and
+                                 min(ne_lat - sw_lat, ne_lng - sw_lng) / 2 >= self.min_span)
+                    split = can_split and self.needs_split(records, expected)
+                    if split:
+                        self.stats['splits'] += 1
+                        children = self.split(bbox)
+                        next_level.extend(zip(children, self.child_expected_counts(children, records)))
+
+                    for record in records:
+                        # 会被细分的区域里的聚合点交给子区域展开；已到最小尺寸的保留为聚合记录
+                        if split and record.get('count', 1) > 1:
+                            continue
+                        coord_key = (round(record['latitude'], 6), round(record['longitude'], 6))
+                        if coord_key not in seen_coords:
+                            seen_coords.add(coord_key)
+                            results.append(record)
+
+                level = next_level
+                depth += 1
+
+        self.stats['elapsed'] = time.time() - start
+        return results
+
+    def print_summary(self):
+        """打印规划统计"""
+        print(f"    🌲 四叉树查询: 请求 {self.stats['requests']} 次, 细分 {self.stats['splits']} 次, "
+              f"最大深度 {self.stats['max_depth']}, 用时 {self.stats['elapsed']:.1f} 秒")
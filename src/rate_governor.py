@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程请求速率控制
+同一台机器上并行运行的多个爬虫进程共用令牌桶（状态文件 + 文件锁），
+无论同时运行几个爬虫，对目标网站的总请求速率都保持不变。
+
+桶按 (速率预算, 可注册域名) 划分：www.datacenters.com 与 datacenters.com 共用同一个桶。
+速率预算分两类：
+  pages: 页面抓取（各省份爬虫、异步并发抓取引擎），默认 1 次/秒，突发 3 次；
+         并发只用于重叠等待响应和解析的时间，请求发起的总速率仍受该预算限制
+  probe: 批量API探测与扫描（端点探测器、设施ID扫描器、四叉树边界框查询），默认 10 次/秒，突发 6 次
+         （与探测线程数相同），多个探测线程共用这一份预算，不再被页面预算串行化
+两类预算互相独立，同时运行时对网站的总速率上限为两者之和。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+from file_lock import file_lock
+
+# 需要限速的站点（可注册域名）
+GOVERNED_SITES = ('datacenters.com',)
+
+# 两级公共后缀，这些后缀下的可注册域名取最后三段
+MULTI_LABEL_SUFFIXES = ('com.cn', 'net.cn', 'org.cn', 'gov.cn', 'edu.cn', 'co.uk', 'org.uk', 'com.hk', 'com.au')
+
+# 速率预算 {名称: (次/秒, 突发次数)}，可通过环境变量调整速率
+RATE_BUDGETS = {
+    'pages': (float(os.environ.get('DATACENTER_CRAWL_RATE', '1.0')), 3),
+    'probe': (float(os.environ.get('DATACENTER_PROBE_RATE', '10.0')), 6),
+}
+PAGE_BUDGET = 'pages'
+PROBE_BUDGET = 'probe'
+
+
+def site_key(url):
+    """URL所属的可注册域名，例如 https://www.datacenters.com/x -> datacenters.com"""
+    host = (urlparse(url).hostname or '').lower().rstrip('.')
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit():
+        return host
+    keep = 3 if '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return '.'.join(labels[-keep:])
+
+
+class RateGovernor:
+    """基于文件锁的跨进程令牌桶，每个 (预算, 站点) 一个桶"""
+
+    def __init__(self, budget=PAGE_BUDGET, rate=None, burst=None, sites=GOVERNED_SITES, state_dir=None):
+        self.budget = budget
+        default_rate, default_burst = RATE_BUDGETS[budget]
+        # 每秒补充的令牌数，即长期平均请求速率
+        self.rate = default_rate if rate is None else rate
+        # 桶容量，允许的瞬时突发请求数
+        self.burst = default_burst if burst is None else burst
+        self.sites = set(sites)
+
+        state_dir = state_dir or tempfile.gettempdir()
+        os.makedirs(state_dir, exist_ok=True)
+        self.lock_file = os.path.join(state_dir, "datacenter_crawl_governor.lock")
+        self.state_file = os.path.join(state_dir, "datacenter_crawl_governor.json")
+
+        self._thread_lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited_seconds': 0.0}
+
+    def _read_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _try_take(self, bucket_key):
+        """尝试取一个令牌，成功返回0，否则返回需要等待的秒数"""
+        with self._thread_lock, file_lock(self.lock_file):
+            state = self._read_state()
+            now = time.time()
+            bucket = state.get(bucket_key, {'tokens': self.burst, 'updated': now})
+
+            tokens = min(self.burst, bucket['tokens'] + (now - bucket['updated']) * self.rate)
+            if tokens >= 1:
+                state[bucket_key] = {'tokens': tokens - 1, 'updated': now}
+                self._write_state(state)
+                return 0.0
+
+            state[bucket_key] = {'tokens': tokens, 'updated': now}
+            self._write_state(state)
+            return (1 - tokens) / self.rate
+
+    def acquire(self, url, key=None):
+        """请求发出前调用，必要时阻塞到有可用令牌；不受限的站点直接返回
+
+        key: 调用方指定的站点标识，默认取URL的可注册域名
+        """
+        site = key or site_key(url)
+        if site not in self.sites or self.rate <= 0:
+            return 0.0
+
+        bucket_key = f"{self.budget}:{site}"
+        waited = 0.0
+        while True:
+            wait = self._try_take(bucket_key)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+
+        self.stats['acquired'] += 1
+        self.stats['waited_seconds'] += waited
+        return waited
+
+    def print_stats(self):
+        """打印限速统计"""
+        print(f"🚦 跨进程限速 ({self.budget}): {self.rate:g} 次/秒, 本进程取令牌 {self.stats['acquired']} 次, "
+              f"累计等待 {self.stats['waited_seconds']:.1f} 秒")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按文本位置组装数据中心记录
+保留每个纬度/经度/名称匹配在页面中的偏移量，并根据花括号位置确定每个匹配所在的对象：
+同一对象内相邻的纬度与经度组成坐标（先后顺序不限），名称分配给同一对象（或其外层对象）内距离最近的坐标。
+全部基于排序、归并扫描和贪心分配，复杂度 O(n log n)。
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from collections import deque, namedtuple
+
+BRACES = re.compile(r'[{}]')
+
+# latitude/longitude/name: 记录取值（无名称时 name 为 None）; offset: 纬度在页面中的位置
+AssembledRecord = namedtuple('AssembledRecord', ['latitude', 'longitude', 'name', 'offset'])
+
+# 页面顶层（不在任何花括号内）的对象标识
+ROOT = -1
+
+
+class BraceTracker:
+    """确定文本中指定位置所在的对象，支持分块送入（可作为流式下载的 consumer）
+
+    只保留当前未闭合的对象栈、最近 lag 个字符内尚未处理的花括号，以及通过 track() 登记的位置所在的对象，
+    内存与页面大小无关。流式使用时，匹配一经确认就 track() 其位置；扫描器确认匹配有延迟
+    （IncrementalPatternScanner 为 2 * overlap 个字符），lag 不能小于这个延迟，且扫描器须先于本对象送入同一块。
+    text: 整个页面一次给出时，在 objects_of() 中才扫描，无需事先登记位置
+    """
+
+    def __init__(self, text=None, lag=0):
+        self.lag = lag
+        self.stack = [ROOT]
+        # 已送入但尚未处理的花括号 (位置, 字符)
+        self.braces = deque()
+        # 位置小于 processed 的花括号都已处理
+        self.processed = 0
+        self.chars_seen = 0
+        # 已登记、尚未确定所在对象的位置（小顶堆）
+        self.pending = []
+        # {位置: (所在对象起点, 外层对象起点)}
+        self.objects = {}
+        self.text = text
+
+    def track(self, offset):
+        """登记需要确定所在对象的位置"""
+        if offset in self.objects:
+            return
+        if offset < self.processed:
+            raise ValueError(f"位置 {offset} 之前的花括号已处理，lag 过小")
+        heapq.heappush(self.pending, offset)
+
+    def feed(self, text):
+        base = self.chars_seen
+        self.braces.extend((base + match.start(), match.group()) for match in BRACES.finditer(text))
+        self.chars_seen += len(text)
+        self._advance(self.chars_seen - self.lag)
+
+    def close(self):
+        """输入结束，确定其余已登记位置所在的对象"""
+        if self.text is not None:
+            text, self.text = self.text, None
+            self.feed(text)
+        self._advance(float('inf'))
+        return self
+
+    def _resolve(self, limit):
+        while self.pending and self.pending[0] < limit:
+            offset = heapq.heappop(self.pending)
+            self.objects[offset] = (self.stack[-1], self.stack[-2] if len(self.stack) > 1 else ROOT)
+
+    def _advance(self, limit):
+        while self.braces and self.braces[0][0] < limit:
+            position, brace = self.braces.popleft()
+            self._resolve(position)
+            if brace == '{':
+                self.stack.append(position)
+            elif len(self.stack) > 1:
+                self.stack.pop()
+        self._resolve(limit)
+        self.processed = max(self.processed, limit)
+
+    def objects_of(self, offsets):
+        """返回 {偏移量: (所在对象起点, 外层对象起点)}；流式送入时 offsets 须已在送入过程中 track()"""
+        if self.text is not None:
+            for offset in offsets:
+                self.track(offset)
+        self.close()
+        return {offset: self.objects[offset] for offset in offsets}
+
+
+def pair_coordinates(latitudes, longitudes, objects, max_pair_distance=200):
+    """同一对象内相邻的纬度与经度配对，纬度在前或经度在前都可以
+
+    latitudes/longitudes: [(偏移量, 取值)]; objects: BraceTracker.objects_of 的结果
+    返回 [(纬度偏移, 经度偏移, 纬度, 经度)]，按纬度位置排列。
+    候选为同一对象内前后相邻、距离不超过 max_pair_distance 的一个纬度和一个经度；
+    纬度在前的候选优先，其次按距离由近到远贪心分配，每个纬度和经度最多使用一次。
+    找不到同对象经度的纬度被丢弃，不会与其他对象的经度错配。
+    """
+    sequences = {}
+    for offset, kind, value in sorted(
+        [(offset, 0, value) for offset, value in latitudes] +
+        [(offset, 1, value) for offset, value in longitudes]
+    ):
+        sequences.setdefault(objects[offset][0], []).append((offset, kind, value))
+
+    candidates = []
+    for sequence in sequences.values():
+        for (offset, kind, value), (next_offset, next_kind, next_value) in zip(sequence, sequence[1:]):
+            if kind == next_kind or next_offset - offset > max_pair_distance:
+                continue
+            if kind == 0:
+                candidates.append((0, next_offset - offset, offset, next_offset, value, next_value))
+            else:
+                candidates.append((1, next_offset - offset, next_offset, offset, next_value, value))
+
+    candidates.sort()
+    pairs = []
+    used_latitudes = set()
+    used_longitudes = set()
+    for _, _, lat_offset, lng_offset, lat, lng in candidates:
+        if lat_offset in used_latitudes or lng_offset in used_longitudes:
+            continue
+        used_latitudes.add(lat_offset)
+        used_longitudes.add(lng_offset)
+        pairs.append((lat_offset, lng_offset, lat, lng))
+    pairs.sort()
+    return pairs
+
+
+def assign_names(pairs, names, objects):
+    """为每个坐标对分配名称，返回与 pairs 等长的名称列表（未分配为 None）
+
+    候选名称须与坐标位于同一对象，或位于坐标所在对象的外层对象
+    （如 {"name": ..., "location": {"lat": ..., "lng": ...}}）；
+    每个对象只考虑纬度前后最近的名称；同对象优先，其次按距离由近到远贪心分配，
+    每个名称最多使用一次。
+    """
+    assigned = [None] * len(pairs)
+    if not pairs or not names:
+        return assigned
+
+    names_by_object = {}
+    for name_offset, name in names:
+        names_by_object.setdefault(objects[name_offset][0], []).append((name_offset, name))
+
+    candidates = []
+    for index, (lat_offset, _, _, _) in enumerate(pairs):
+        own, parent = objects[lat_offset]
+        for rank, object_start in enumerate((own, parent) if parent != own else (own,)):
+            # 顶层文本没有对象边界，不作为名称来源
+            if object_start == ROOT:
+                continue
+            object_names = names_by_object.get(object_start)
+            if not object_names:
+                continue
+            # 只取纬度前后各一个最近的名称，候选总数与坐标数成正比
+            position = bisect_left(object_names, (lat_offset,))
+            for name_offset, name in object_names[max(position - 1, 0):position + 1]:
+                candidates.append((rank, abs(name_offset - lat_offset), name_offset, index, name))
+
+    candidates.sort()
+    used_names = set()
+    for _, _, name_offset, index, name in candidates:
+        if assigned[index] is None and name_offset not in used_names:
+            assigned[index] = name
+            used_names.add(name_offset)
+    return assigned
+
+
+def assemble_records(latitudes, longitudes, names, braces, max_pair_distance=200):
+    """组装记录
+
+    latitudes/longitudes/names: [(偏移量, 取值)]，取值应已完成校验和转换
+    braces: 覆盖同一段文本的 BraceTracker（流式送入时须已 track() 这些偏移量）
+    """
+    offsets = sorted({offset for offset, _ in latitudes} |
+                     {offset for offset, _ in longitudes} |
+                     {offset for offset, _ in names})
+    objects = braces.objects_of(offsets)
+
+    pairs = pair_coordinates(latitudes, longitudes, objects, max_pair_distance)
+    assigned = assign_names(pairs, names, objects)
+    return [
+        AssembledRecord(lat, lng, name, lat_offset)
+        for (lat_offset, _, lat, lng), name in zip(pairs, assigned)
+    ]
@@ -5,11 +5,15 @@
 """
 
 import json
-import requests
 import re
 import pandas as pd
 import time
 
+from fetch_client import FetchClient
+from parallel_extract import ExtractionPool
+from response_cache import ResponseCache
+from snapshot_replay import parse_replay_args, replay_snapshots
+
 def compare_results():
     """对比之前的结果和详细检查结果"""
     
@@ -69,10 +73,93 @@ def compare_results():
     
     return len(missing) > 0
 
+def parse_comprehensive_data(content, province):
+    """全面解析页面（提取进程入口，不依赖爬虫状态），返回 {'coordinates': 去重后的 [纬度, 经度], 'names': 过滤后的名称}"""
+    parsed = {'coordinates': [], 'names': []}
+    
+    try:
+        # 提取坐标 - 使用多种模式
+        coordinate_patterns = [
+            (r'"latitude":\s*([\d\.\-]+)', r'"longitude":\s*([\d\.\-]+)'),
+            (r'"lat":\s*([\d\.\-]+)', r'"lng":\s*([\d\.\-]+)'),
+        ]
+        
+        all_coords = []
+        
+        for lat_pattern, lng_pattern in coordinate_patterns:
+            lats = re.findall(lat_pattern, content)
+            lngs = re.findall(lng_pattern, content)
+            
+            if lats and lngs and len(lats) == len(lngs):
+                for lat, lng in zip(lats, lngs):
+                    try:
+                        lat_f = float(lat)
+                        lng_f = float(lng)
+                        if 20 <= lat_f <= 35 and 95 <= lng_f <= 115:
+                            all_coords.append((lat_f, lng_f))
+                    except:
+                        continue
+        
+        print(f"  原始坐标: {len(all_coords)} 个")
+        
+        # 去重坐标
+        unique_coords = []
+        seen_coords = set()
+        for lat, lng in all_coords:
+            coord_key = (round(lat, 6), round(lng, 6))
+            if coord_key not in seen_coords:
+                seen_coords.add(coord_key)
+                unique_coords.append((lat, lng))
+        
+        print(f"  去重后坐标: {len(unique_coords)} 个")
+        
+        # 提取名称 - 使用更全面的模式
+        name_patterns = [
+            r'"name":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
+            r'"title":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
+            r'"name":\s*"([^"]*(?:' + province.replace('省', '') + '|Sichuan|Yunnan|Guizhou|Chengdu|CTU|GDS|Telecom|Tianfu|Mianyang|Yibin|Ziyang|Neijiang|Dazhou|Panzhihua|Nanchong|Leshan|Guangyuan|Deyang)[^"]*)"',
+            r'"displayName":\s*"([^"]+)"',
+            r'"label":\s*"([^"]+)"',
+        ]
+        
+        all_names = []
+        for pattern in name_patterns:
+            names = re.findall(pattern, content, re.IGNORECASE)
+            all_names.extend(names)
+        
+        # 过滤和清理名称
+        filtered_names = []
+        seen_names = set()
+        for name in all_names:
+            clean_name = name.strip()
+            if (len(clean_name) > 3 and 
+                len(clean_name) < 200 and 
+                clean_name not in seen_names):
+                
+                # 检查是否是有效的数据中心名称
+                keywords = ['data center', 'idc', '数据中心', 'center', 'chengdu', 'sichuan', 
+                           'telecom', 'gds', 'ctu', 'tianfu', 'mianyang', 'yibin', 'ziyang',
+                           'neijiang', 'dazhou', 'panzhihua', 'nanchong', 'leshan', 'guangyuan', 'deyang']
+                
+                if any(keyword in clean_name.lower() for keyword in keywords):
+                    filtered_names.append(clean_name)
+                    seen_names.add(clean_name)
+        
+        print(f"  找到名称: {len(filtered_names)} 个")
+        
+        parsed['coordinates'] = [[lat, lng] for lat, lng in unique_coords]
+        parsed['names'] = filtered_names
+    
+    except Exception as e:
+        print(f"  ❌ 数据提取错误: {e}")
+    
+    return parsed
+
+
 class FinalCompleteCrawler:
     """最终完整爬虫类"""
     
-    def __init__(self):
+    def __init__(self, client=None):
         self.urls = {
             # 四川省的所有变体
             "四川省-sichuan-sheng": "https://www.datacenters.com/locations/china/sichuan-sheng",
@@ -102,159 +189,122 @@ class FinalCompleteCrawler:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
+        
+        # 页面提取进程数，None 表示按CPU核数
+        self.extract_workers = None
+        
         self.all_results = []
         self.unique_coordinates = set()
     
     def extract_comprehensive_data(self, content, source_key):
         """全面提取页面数据"""
+        return self.build_records(parse_comprehensive_data(content, self.province_mapping[source_key]), source_key)
+    
+    def build_records(self, parsed, source_key):
+        """把 parse_comprehensive_data 的结果转换为数据中心记录（跨数据源的坐标去重在这里完成）"""
         found_data = []
+        filtered_names = parsed['names']
         
-        try:
-            # 提取坐标 - 使用多种模式
-            coordinate_patterns = [
-                (r'"latitude":\s*([\d\.\-]+)', r'"longitude":\s*([\d\.\-]+)'),
-                (r'"lat":\s*([\d\.\-]+)', r'"lng":\s*([\d\.\-]+)'),
-            ]
-            
-            all_coords = []
-            
-            for lat_pattern, lng_pattern in coordinate_patterns:
-                lats = re.findall(lat_pattern, content)
-                lngs = re.findall(lng_pattern, content)
-                
-                if lats and lngs and len(lats) == len(lngs):
-                    for lat, lng in zip(lats, lngs):
-                        try:
-                            lat_f = float(lat)
-                            lng_f = float(lng)
-                            if 20 <= lat_f <= 35 and 95 <= lng_f <= 115:
-                                all_coords.append((lat_f, lng_f))
-                        except:
-                            continue
-            
-            print(f"  原始坐标: {len(all_coords)} 个")
-            
-            # 去重坐标
-            unique_coords = []
-            seen_coords = set()
-            for lat, lng in all_coords:
-                coord_key = (round(lat, 6), round(lng, 6))
-                if coord_key not in seen_coords:
-                    seen_coords.add(coord_key)
-                    unique_coords.append((lat, lng))
-            
-            print(f"  去重后坐标: {len(unique_coords)} 个")
-            
-            # 提取名称 - 使用更全面的模式
-            name_patterns = [
-                r'"name":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
-                r'"title":\s*"([^"]*(?:Data Center|IDC|数据中心)[^"]*)"',
-                r'"name":\s*"([^"]*(?:' + self.province_mapping[source_key].replace('省', '') + '|Sichuan|Yunnan|Guizhou|Chengdu|CTU|GDS|Telecom|Tianfu|Mianyang|Yibin|Ziyang|Neijiang|Dazhou|Panzhihua|Nanchong|Leshan|Guangyuan|Deyang)[^"]*)"',
-                r'"displayName":\s*"([^"]+)"',
-                r'"label":\s*"([^"]+)"',
-            ]
-            
-            all_names = []
-            for pattern in name_patterns:
-                names = re.findall(pattern, content, re.IGNORECASE)
-                all_names.extend(names)
-            
-            # 过滤和清理名称
-            filtered_names = []
-            seen_names = set()
-            for name in all_names:
-                clean_name = name.strip()
-                if (len(clean_name) > 3 and 
-                    len(clean_name) < 200 and 
-                    clean_name not in seen_names):
-                    
-                    # 检查是否是有效的数据中心名称
-                    keywords = ['data center', 'idc', '数据中心', 'center', 'chengdu', 'sichuan', 
-                               'telecom', 'gds', 'ctu', 'tianfu', 'mianyang', 'yibin', 'ziyang',
-                               'neijiang', 'dazhou', 'panzhihua', 'nanchong', 'leshan', 'guangyuan', 'deyang']
-                    
-                    if any(keyword in clean_name.lower() for keyword in keywords):
-                        filtered_names.append(clean_name)
-                        seen_names.add(clean_name)
+        # 组合数据
+        province = self.province_mapping[source_key]
+        
+        for i, (lat, lng) in enumerate(parsed['coordinates']):
+            # 检查全局重复
+            global_coord_key = (round(lat, 6), round(lng, 6))
+            if global_coord_key in self.unique_coordinates:
+                print(f"  跳过重复坐标: ({lat:.6f}, {lng:.6f})")
+                continue
             
-            print(f"  找到名称: {len(filtered_names)} 个")
+            self.unique_coordinates.add(global_coord_key)
             
-            # 组合数据
-            province = self.province_mapping[source_key]
+            # 选择名称
+            if i < len(filtered_names):
+                name = filtered_names[i]
+            else:
+                name = f"{province}数据中心{i+1}"
             
-            for i, (lat, lng) in enumerate(unique_coords):
-                # 检查全局重复
-                global_coord_key = (round(lat, 6), round(lng, 6))
-                if global_coord_key in self.unique_coordinates:
-                    print(f"  跳过重复坐标: ({lat:.6f}, {lng:.6f})")
-                    continue
-                
-                self.unique_coordinates.add(global_coord_key)
-                
-                # 选择名称
-                if i < len(filtered_names):
-                    name = filtered_names[i]
-                else:
-                    name = f"{province}数据中心{i+1}"
-                
-                data_center = {
-                    'province': province,
-                    'latitude': lat,
-                    'longitude': lng,
-                    'name': name,
-                    'source': source_key,
-                    'coordinates': f"{lat},{lng}",
-                    'index': len(self.all_results) + len(found_data) + 1
-                }
-                
-                found_data.append(data_center)
-                print(f"  ✅ {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
+            data_center = {
+                'province': province,
+                'latitude': lat,
+                'longitude': lng,
+                'name': name,
+                'source': source_key,
+                'coordinates': f"{lat},{lng}",
+                'index': len(self.all_results) + len(found_data) + 1
+            }
             
-        except Exception as e:
-            print(f"  ❌ 数据提取错误: {e}")
+            found_data.append(data_center)
+            print(f"  ✅ {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
         
         return found_data
     
+    def merge_extracted_pages(self, results, pool):
+        """按数据源顺序把提取进程的解析结果转换为记录并合并"""
+        for source_key, parsed, log, error in results:
+            print(f"\n{source_key} (提取进程数: {pool.max_workers})")
+            print(log, end='')
+            if error is not None:
+                print(f"  ❌ 数据提取错误: {error}")
+                continue
+            
+            page_data = self.build_records(parsed, source_key)
+            self.all_results.extend(page_data)
+            if page_data:
+                print(f"  ✅ 成功提取: {len(page_data)} 个数据中心")
+            else:
+                print(f"  ⚠️ 未找到数据")
+    
     def crawl_all_sources(self):
         """重新爬取所有数据源"""
         print("\n" + "="*80)
         print("🔄 重新爬取所有数据源")
         print("="*80)
         
-        for source_key, url in self.urls.items():
-            print(f"\n🔍 正在爬取: {source_key}")
-            print(f"📍 URL: {url}")
-            print("-" * 60)
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=30)
-                
-                if response.status_code != 200:
-                    print(f"  ❌ 请求失败: {response.status_code}")
-                    continue
-                
-                print(f"  📄 页面大小: {len(response.text)} 字符")
+        # 页面解析在进程池中进行，与后续下载并行；前面的数据源都解析完后即合并，不等全部下载结束
+        with ExtractionPool(parse_comprehensive_data, list(self.urls), max_workers=self.extract_workers) as pool:
+            for source_key, url in self.urls.items():
+                print(f"\n🔍 正在爬取: {source_key}")
+                print(f"📍 URL: {url}")
+                print("-" * 60)
                 
-                # 全面提取数据
-                page_data = self.extract_comprehensive_data(response.text, source_key)
-                
-                if page_data:
-                    self.all_results.extend(page_data)
-                    print(f"  ✅ 成功提取: {len(page_data)} 个数据中心")
-                else:
-                    print(f"  ⚠️ 未找到数据")
+                try:
+                    response = self.client.get(url, headers=self.headers, timeout=30)
+                    
+                    if response.status_code != 200:
+                        print(f"  ❌ 请求失败: {response.status_code}")
+                        pool.skip(source_key)
+                        continue
+                    
+                    print(f"  📄 页面大小: {len(response.text)} 字符")
+                    
+                    # 交给提取进程池解析，继续下载下一个数据源
+                    pool.submit(source_key, response.text, self.province_mapping[source_key])
                 
-                # 请求间隔
-                time.sleep(2)
+                except Exception as e:
+                    print(f"  ❌ 爬取失败: {e}")
+                    pool.skip(source_key)
                 
-            except Exception as e:
-                print(f"  ❌ 爬取失败: {e}")
+                self.merge_extracted_pages(pool.ready(), pool)
+            
+            self.merge_extracted_pages(pool.collect(), pool)
         
         print(f"\n" + "="*80)
         print(f"🎉 重新爬取完成！总计找到 {len(self.all_results)} 个数据中心")
         
         return self.all_results
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        def extract(content, source_key):
+            page_data = self.extract_comprehensive_data(content, source_key)
+            self.all_results.extend(page_data)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract, source_keys=list(self.urls), default=list(self.urls)[0])
+        return self.all_results
+    
     def save_final_results(self):
         """保存最终结果"""
         if not self.all_results:
@@ -347,6 +397,8 @@ class FinalCompleteCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("重新爬取三省数据中心")
+    
     print("🚀 重新爬取三省数据中心完整信息")
     print("🔍 确保获取所有遗漏的数据")
     
@@ -359,10 +411,17 @@ def main():
         print("\n✅ 未发现遗漏，但仍进行重新爬取以确保完整性")
     
     # 重新爬取
-    crawler = FinalCompleteCrawler()
+    # 条件GET缓存：未变化的页面由服务器返回304，正文从磁盘读取
+    cache = ResponseCache()
+    crawler = FinalCompleteCrawler(client=FetchClient(cache=cache))
     
     try:
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
+            cache.flush()
+            cache.print_stats()
         
         if results:
             crawler.save_final_results()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+条件GET磁盘响应缓存 - 基于 html_sources/ 的内容寻址缓存
+保存页面正文及其 ETag/Last-Modified，下次请求时发送条件头，304时直接从磁盘返回。
+没有校验头的响应无法重新验证，不会被缓存。索引在跨进程文件锁内合并写回，多个爬虫进程可共用同一缓存目录。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from file_lock import file_lock
+
+# 需要随正文一起保存的响应头
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class ResponseCache:
+    """内容寻址的条件GET缓存，总大小超过上限时按最近最少使用淘汰"""
+
+    def __init__(self, cache_dir="html_sources/cache", max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.lock_file = os.path.join(cache_dir, "index.lock")
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # {url: {'hash', 'size', 'etag', 'last_modified', 'headers', 'encoding', 'last_access'}}
+        self.entries = self._load_index()
+        # 命中时更新的最后访问时间 {url: 时间}，在下次写索引或 flush() 时合并写回
+        self._accessed = {}
+
+        self.stats = {
+            'hits': 0,          # 304命中，正文来自磁盘
+            'misses': 0,        # 完整下载
+            'evicted': 0,       # 被淘汰的正文对象
+            'bytes_saved': 0,   # 304节省的下载字节数
+        }
+
+    def _load_index(self):
+        """读取缓存索引"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """写入缓存索引（先写本进程的临时文件再替换，避免中途中断损坏索引）"""
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.index_file)
+
+    def _update_index(self, url=None, entry=None, removed=()):
+        """在跨进程锁内重新读取索引，合并本进程的修改后写回（调用方须持有 self._lock）"""
+        with file_lock(self.lock_file):
+            self.entries = self._load_index()
+            for key, last_access in self._accessed.items():
+                if key in self.entries:
+                    self.entries[key]['last_access'] = max(self.entries[key]['last_access'], last_access)
+            self._accessed.clear()
+            for key in removed:
+                self.entries.pop(key, None)
+            if url is not None:
+                self.entries[url] = entry
+
+            self._evict()
+            self._save_index()
+
+    def flush(self):
+        """把尚未写回的访问时间写入索引"""
+        with self._lock:
+            if self._accessed:
+                self._update_index()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def conditional_headers(self, url):
+        """返回该URL的条件请求头，无缓存时返回空字典"""
+        with self._lock:
+            entry = self.entries.get(url)
+            if not entry or not os.path.exists(self._object_path(entry['hash'])):
+                return {}
+
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+
+    def store(self, url, response):
+        """保存带 ETag/Last-Modified 的200响应的正文和校验头"""
+        if response.status_code != 200:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            # 无法发送条件请求，缓存只会占用空间
+            return
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            # 相同内容只存一份（多个URL变体常返回同一页面）
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+
+            entry = {
+                'hash': digest,
+                'size': len(body),
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': {k: response.headers[k] for k in CACHED_HEADERS if k in response.headers},
+                'encoding': response.encoding,
+                'last_access': time.time(),
+            }
+            self.stats['misses'] += 1
+            self._update_index(url, entry)
+
+    def build_response(self, url, not_modified):
+        """用磁盘上的正文把304响应还原成完整的200响应，缓存缺失时返回None"""
+        with self._lock:
+            entry = self.entries.get(url)
+            if not entry:
+                return None
+
+            try:
+                with open(self._object_path(entry['hash']), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                self.entries.pop(url, None)
+                self._accessed.pop(url, None)
+                self._update_index(removed=(url,))
+                return None
+
+            # 访问时间只记在内存中，命中不触发索引写入
+            entry['last_access'] = time.time()
+            self._accessed[url] = entry['last_access']
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry['size']
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = body
+        response.url = not_modified.url or url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers.update(not_modified.headers)
+        response.encoding = entry['encoding']
+        response.from_cache = True
+        return response
+
+    def _evict(self):
+        """总大小超过上限时，按最后访问时间淘汰最旧的URL及其不再被引用的正文"""
+        sizes = {}
+        for entry in self.entries.values():
+            sizes[entry['hash']] = entry['size']
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            del self.entries[url]
+
+            digest = entry['hash']
+            if any(other['hash'] == digest for other in self.entries.values()):
+                continue
+
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            total -= entry['size']
+            self.stats['evicted'] += 1
+
+    def print_stats(self):
+        """打印缓存统计"""
+        print(f"💾 响应缓存: 命中 {self.stats['hits']} 次, 下载 {self.stats['misses']} 次, "
+              f"节省 {self.stats['bytes_saved'] / 1024:.1f} KB, 淘汰 {self.stats['evicted']} 个对象")
@@ -5,17 +5,22 @@
 专门处理地图聚合标记和隐藏数据
 """
 
-import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 from urllib.parse import urlencode, parse_qs, urlparse
 
+from fetch_client import FetchClient
+from circuit_breaker import CircuitOpenError, RetryController, endpoint_key
+from endpoint_prober import EndpointProber
+from facility_id_scanner import FacilityIdScanner
+from quadtree_planner import QuadtreeQueryPlanner
+from rate_governor import PROBE_BUDGET
+
 class ShanghaiClusterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
         # 从您提供的聚合标记中提取的坐标点
@@ -51,8 +56,21 @@ class ShanghaiClusterCrawler:
             'Pragma': 'no-cache'
         }
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 共享HTTP客户端（连接池复用）；猜测的API端点反复404时同样熔断
+        self.client = client or FetchClient(
+            headers=self.headers,
+            retry=RetryController(dead_statuses=(404, 405, 410))
+        )
+        # 本爬虫的请求都是API探测和扫描，使用独立的探测速率预算，多个探测线程不受页面抓取速率串行化
+        self.client = self.client.with_budget(PROBE_BUDGET)
+        
+        # 设施ID扫描器（有效/无效ID记录跨运行保存）
+        self.id_scanner = FacilityIdScanner(
+            self.client,
+            "https://www.datacenters.com/api/facilities/{id}",
+            headers=self.headers,
+            state_file="data/shanghai/facility_id_state.json"
+        )
         
         self.all_results = []
         self.cluster_details = []
@@ -81,89 +99,70 @@ class ShanghaiClusterCrawler:
         # 不同的缩放级别和边界参数
         zoom_levels = [8, 9, 10, 11, 12, 13, 14, 15, 16]
         
+        def bounds_params(zoom):
+            bounds = self.calculate_bounds_for_zoom(zoom)
+            return {
+                'zoom': zoom,
+                'bounds': f"{bounds['sw_lat']},{bounds['sw_lng']},{bounds['ne_lat']},{bounds['ne_lng']}"
+            }
+        
+        def bbox_params(zoom):
+            bounds = self.calculate_bounds_for_zoom(zoom)
+            return {
+                'z': zoom,
+                'bbox': f"{bounds['sw_lng']},{bounds['sw_lat']},{bounds['ne_lng']},{bounds['ne_lat']}"
+            }
+        
+        # 尝试不同的参数组合
+        param_builders = [
+            bounds_params,
+            bbox_params,
+            lambda zoom: {'zoom': zoom, 'lat': 31.2304, 'lng': 121.4737, 'radius': 50},
+            lambda zoom: {'location': 'shanghai', 'zoom': zoom, 'clustering': 'true'},
+        ]
+        
+        # 并发自适应探测：所有参数组合都404/非JSON的端点剪枝，抽样的多个缩放级别响应都不变时不再枚举
+        prober = EndpointProber(self.client, "https://www.datacenters.com", headers=self.headers)
+        json_results, non_json_samples = prober.probe(api_patterns, param_builders, zoom_levels)
+        
         cluster_data = []
         
-        for zoom in zoom_levels:
-            print(f"\n🔍 测试缩放级别: {zoom}")
+        for result in json_results:
+            api_pattern = result['api']
+            zoom = result['variant']
+            data = result['data']
             
-            # 计算不同缩放级别的边界
-            bounds = self.calculate_bounds_for_zoom(zoom)
+            print(f"    ✅ API成功: {api_pattern} (zoom={zoom})")
+            print(f"       数据长度: {len(str(data))} 字符")
             
-            for api_pattern in api_patterns:
-                try:
-                    # 构建API URL
-                    api_url = f"https://www.datacenters.com{api_pattern}"
-                    
-                    # 尝试不同的参数组合
-                    param_sets = [
-                        {
-                            'zoom': zoom,
-                            'bounds': f"{bounds['sw_lat']},{bounds['sw_lng']},{bounds['ne_lat']},{bounds['ne_lng']}"
-                        },
-                        {
-                            'z': zoom,
-                            'bbox': f"{bounds['sw_lng']},{bounds['sw_lat']},{bounds['ne_lng']},{bounds['ne_lat']}"
-                        },
-                        {
-                            'zoom': zoom,
-                            'lat': 31.2304,
-                            'lng': 121.4737,
-                            'radius': 50
-                        },
-                        {
-                            'location': 'shanghai',
-                            'zoom': zoom,
-                            'clustering': 'true'
-                        }
-                    ]
-                    
-                    for params in param_sets:
-                        try:
-                            response = self.session.get(api_url, params=params, timeout=10)
-                            
-                            if response.status_code == 200:
-                                try:
-                                    data = response.json()
-                                    if data and (isinstance(data, list) or 
-                                                (isinstance(data, dict) and len(data) > 0)):
-                                        
-                                        print(f"    ✅ API成功: {api_pattern} (zoom={zoom})")
-                                        print(f"       数据长度: {len(str(data))} 字符")
-                                        
-                                        # 保存API响应
-                                        api_file = f"html_sources/shanghai/cluster_api_{api_pattern.replace('/', '_')}_z{zoom}_{len(cluster_data)}.json"
-                                        with open(api_file, 'w', encoding='utf-8') as f:
-                                            json.dump(data, f, ensure_ascii=False, indent=2)
-                                        
-                                        cluster_data.append({
-                                            'api': api_pattern,
-                                            'zoom': zoom,
-                                            'params': params,
-                                            'data': data
-                                        })
-                                        
-                                        # 解析数据
-                                        parsed = self.parse_cluster_api_data(data)
-                                        if parsed:
-                                            print(f"       解析出: {len(parsed)} 个数据点")
-                                        
-                                except json.JSONDecodeError:
-                                    # 不是JSON数据，可能是HTML或其他格式
-                                    if len(response.text) > 100:
-                                        print(f"    📄 非JSON响应: {api_pattern} (zoom={zoom}) - {len(response.text)} 字符")
-                                        
-                                        # 保存非JSON响应
-                                        html_file = f"html_sources/shanghai/cluster_response_{api_pattern.replace('/', '_')}_z{zoom}.html"
-                                        with open(html_file, 'w', encoding='utf-8') as f:
-                                            f.write(response.text)
-                            
-                            time.sleep(0.5)  # 避免请求过快
-                            
-                        except Exception as e:
-                            pass  # 静默处理单个请求错误
-                            
-                except Exception as e:
-                    pass  # 静默处理API错误
+            # 保存API响应
+            api_file = f"html_sources/shanghai/cluster_api_{api_pattern.replace('/', '_')}_z{zoom}_{len(cluster_data)}.json"
+            with open(api_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            
+            cluster_data.append({
+                'api': api_pattern,
+                'zoom': zoom,
+                'params': result['params'],
+                'data': data
+            })
+            
+            # 解析数据
+            parsed = self.parse_cluster_api_data(data)
+            if parsed:
+                print(f"       解析出: {len(parsed)} 个数据点")
+        
+        # 非JSON响应（可能是HTML或其他格式），相同内容只保存一份
+        for result in non_json_samples:
+            if len(result['text']) > 100:
+                api_pattern = result['api']
+                print(f"    📄 非JSON响应: {api_pattern} (zoom={result['variant']}) - {len(result['text'])} 字符")
+                
+                html_file = f"html_sources/shanghai/cluster_response_{api_pattern.replace('/', '_')}_z{result['variant']}.html"
+                with open(html_file, 'w', encoding='utf-8') as f:
+                    f.write(result['text'])
+        
+        prober.print_summary(len(api_patterns) * len(param_builders) * len(zoom_levels))
         
         return cluster_data
     
@@ -289,7 +288,6 @@ class ShanghaiClusterCrawler:
                 print(f"🔍 分析聚合点: ({cluster['lat']:.6f}, {cluster['lng']:.6f}) - {count}个")
                 cluster_details = self.crawl_cluster_details(cluster)
                 detailed_results.extend(cluster_details)
-                time.sleep(1)
         
         return detailed_results
     
@@ -327,8 +325,25 @@ class ShanghaiClusterCrawler:
         radii = [1, 2, 5, 10, 20, 50]  # 公里
         zoom_levels = [12, 13, 14, 15, 16, 17, 18]
         
+        # 尝试不同的端点
+        endpoints = [
+            '/api/locations/nearby',
+            '/api/facilities/radius',
+            '/locations/search',
+            '/api/search'
+        ]
+        
         for radius in radii:
             for zoom in zoom_levels:
+                # 已熔断的端点不再请求，全部熔断时提前结束
+                live_endpoints = [
+                    endpoint for endpoint in endpoints
+                    if not self.client.retry.is_open(endpoint_key(f"https://www.datacenters.com{endpoint}"))
+                ]
+                if not live_endpoints:
+                    print("    ⏭️ 半径查询端点均已熔断，跳过剩余组合")
+                    return results
+                
                 try:
                     # 构建请求URL
                     params = {
@@ -339,18 +354,10 @@ class ShanghaiClusterCrawler:
                         'format': 'json'
                     }
                     
-                    # 尝试不同的端点
-                    endpoints = [
-                        '/api/locations/nearby',
-                        '/api/facilities/radius',
-                        '/locations/search',
-                        '/api/search'
-                    ]
-                    
-                    for endpoint in endpoints:
+                    for endpoint in live_endpoints:
                         try:
                             url = f"https://www.datacenters.com{endpoint}"
-                            response = self.session.get(url, params=params, timeout=10)
+                            response = self.client.get(url, headers=self.headers, params=params, timeout=10)
                             
                             if response.status_code == 200:
                                 try:
@@ -368,65 +375,71 @@ class ShanghaiClusterCrawler:
                         except:
                             pass
                     
-                    time.sleep(0.3)
-                    
                 except Exception as e:
                     pass
         
         return results
     
     def crawl_by_grid_subdivision(self, cluster):
-        """通过网格细分爬取"""
-        results = []
-        
-        # 围绕聚合点创建网格
-        grid_size = 0.01  # 约1公里
+        """通过四叉树细分边界框爬取"""
+        # 围绕聚合点的查询范围
         grid_range = 0.05  # 总范围约5公里
+        root_bbox = (
+            cluster['lat'] - grid_range, cluster['lng'] - grid_range,
+            cluster['lat'] + grid_range, cluster['lng'] + grid_range
+        )
         
-        lat_start = cluster['lat'] - grid_range
-        lng_start = cluster['lng'] - grid_range
+        expected = cluster.get('count')
+        if not isinstance(expected, int):
+            expected = None
         
-        grid_points = []
-        lat = lat_start
-        while lat <= cluster['lat'] + grid_range:
-            lng = lng_start
-            while lng <= cluster['lng'] + grid_range:
-                grid_points.append({'lat': lat, 'lng': lng})
-                lng += grid_size
-            lat += grid_size
-        
-        print(f"    创建 {len(grid_points)} 个网格点进行细分查询")
-        
-        for i, point in enumerate(grid_points):
-            if i % 10 == 0:  # 只查询部分网格点，避免过多请求
-                try:
-                    # 针对每个网格点进行精确查询
-                    params = {
-                        'lat': point['lat'],
-                        'lng': point['lng'],
-                        'precision': 'high',
-                        'limit': 50
-                    }
-                    
-                    url = f"https://www.datacenters.com/api/locations/point"
-                    response = self.session.get(url, params=params, timeout=5)
-                    
-                    if response.status_code == 200:
-                        try:
-                            data = response.json()
-                            parsed = self.parse_cluster_api_data(data)
-                            if parsed:
-                                results.extend(parsed)
-                        except:
-                            pass
-                    
-                    time.sleep(0.2)
-                    
-                except Exception as e:
-                    pass
+        planner = QuadtreeQueryPlanner(self.fetch_bbox, limit=50)
+        results = planner.run(root_bbox, expected_count=expected)
+        planner.print_summary()
         
         return results
     
+    def fetch_bbox(self, bbox):
+        """查询一个边界框内的设施，请求失败或非JSON时返回None
+
+        四叉树需要按边界框查询，优先使用 /api/locations/markers（bounds 参数）；
+        该端点不可用时退回到原来的 /api/locations/point，以边界框中心点查询并只保留框内的设施。
+        """
+        sw_lat, sw_lng, ne_lat, ne_lng = bbox
+        markers_url = "https://www.datacenters.com/api/locations/markers"
+        if not self.client.retry.is_open(endpoint_key(markers_url)):
+            params = {
+                'bounds': f"{sw_lat},{sw_lng},{ne_lat},{ne_lng}",
+                'precision': 'high',
+                'limit': 50
+            }
+            try:
+                response = self.client.get(markers_url, headers=self.headers, params=params, timeout=5)
+                if response.status_code == 200:
+                    return self.parse_cluster_api_data(response.json())
+            except (CircuitOpenError, ValueError):
+                pass
+        
+        params = {
+            'lat': (sw_lat + ne_lat) / 2,
+            'lng': (sw_lng + ne_lng) / 2,
+            'precision': 'high',
+            'limit': 50
+        }
+        url = "https://www.datacenters.com/api/locations/point"
+        response = self.client.get(url, headers=self.headers, params=params, timeout=5)
+        
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return [
+            record for record in self.parse_cluster_api_data(data)
+            if sw_lat <= record['latitude'] <= ne_lat and sw_lng <= record['longitude'] <= ne_lng
+        ]
+    
     def crawl_by_facility_ids(self, cluster):
         """通过设施ID爬取"""
         results = []
@@ -443,25 +456,17 @@ class ShanghaiClusterCrawler:
                 range(20000, 20200)
             ]
             
-            for id_range in id_ranges:
-                for facility_id in list(id_range)[::10]:  # 每10个ID测试一个
-                    try:
-                        url = f"https://www.datacenters.com/api/facilities/{facility_id}"
-                        response = self.session.get(url, timeout=5)
-                        
-                        if response.status_code == 200:
-                            try:
-                                data = response.json()
-                                parsed = self.parse_single_location(data)
-                                if parsed and self.is_in_shanghai_area(parsed['latitude'], parsed['longitude']):
-                                    results.append(parsed)
-                            except:
-                                pass
-                        
-                        time.sleep(0.1)
-                        
-                    except Exception as e:
-                        pass
+            # 稀疏采样后只加密有效ID密集的区间，已探测过的ID直接复用
+            found = self.id_scanner.scan(id_ranges)
+            self.id_scanner.print_summary()
+            
+            for facility_id, data in found.items():
+                try:
+                    parsed = self.parse_single_location(data)
+                    if parsed and self.is_in_shanghai_area(parsed['latitude'], parsed['longitude']):
+                        results.append(parsed)
+                except:
+                    pass
         
         except Exception as e:
             pass
@@ -512,6 +517,8 @@ class ShanghaiClusterCrawler:
         print(f"📊 聚合解析完成统计:")
         print(f"  ✅ 解析出数据中心: {len(self.all_results)} 个")
         print(f"  📍 聚合点总数量: {sum(r.get('count', 1) for r in self.all_results)}")
+        self.client.retry.print_stats()
+        self.client.governor.print_stats()
         
         return self.all_results
     
@@ -581,7 +588,7 @@ class ShanghaiClusterCrawler:
                 f.write("-" * 30 + "\n")
                 f.write("1. API模式分析：测试多种缩放级别和边界参数\n")
                 f.write("2. 半径缩放：围绕聚合点进行半径查询\n")
-                f.write("3. 网格细分：将聚合区域细分为网格进行查询\n")
+                f.write("3. 四叉树细分：结果被截断或仍有聚合点时把边界框四等分继续查询\n")
                 f.write("4. 设施ID：通过ID范围猜测进行查询\n\n")
                 
                 f.write("发现的聚合点:\n")
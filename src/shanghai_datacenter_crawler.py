@@ -9,12 +9,112 @@ import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 
+from fetch_client import FetchClient
+from extraction_cache import ExtractionCache
+from hydration_extractor import EXTRACTOR_VERSION as HYDRATION_VERSION, build_records_from_locations, extract_locations
+from keyword_automaton import build_province_automaton
+from parallel_extract import ExtractionPool
+from pattern_scanner import MultiPatternScanner, NUMBER
+from record_assembler import BraceTracker, assemble_records
+from response_cache import ResponseCache
+from snapshot_replay import parse_replay_args, replay_snapshots
+
+# 名称关键词自动机（关键词见 keyword_automaton.PROVINCE_KEYWORDS），名称候选一遍扫描完成分类
+NAME_AUTOMATON = build_province_automaton('上海市')
+# "name"/"title" 字段的名称候选须包含数据中心关键词或省内地名
+NAME_CATEGORIES = {'datacenter', 'region'}
+# <h1>-<h6> 标题须包含数据中心关键词（只含地名的标题多为页面栏目标题）
+HEADING_CATEGORIES = {'datacenter'}
+
+# 页面中的坐标和名称模式，合并为一个单遍扫描器
+PAGE_SCANNER = MultiPatternScanner([
+    ('latitude', '"latitude"', NUMBER, 0),
+    ('latitude', '"lat"', NUMBER, 0),
+    ('latitude', 'latitude', NUMBER, 0),
+    ('latitude', 'lat', NUMBER, 0),
+    ('longitude', '"longitude"', NUMBER, 0),
+    ('longitude', '"lng"', NUMBER, 0),
+    ('longitude', '"lon"', NUMBER, 0),
+    ('longitude', 'longitude', NUMBER, 0),
+    ('longitude', 'lng', NUMBER, 0),
+    ('longitude', 'lon', NUMBER, 0),
+    ('name', '"name"', r'"([^"]*)"', re.IGNORECASE),
+    ('name', '"title"', r'"([^"]*)"', re.IGNORECASE),
+    ('facility_name', '"facility_name"', r'"([^"]*)"', re.IGNORECASE),
+    ('heading', None, r'<h[1-6][^>]*>([^<]*)</h[1-6]>', re.IGNORECASE),
+])
+# 页面解析逻辑版本，修改 PAGE_SCANNER 或 parse_page 时递增，使提取结果缓存失效
+PAGE_EXTRACTOR_VERSION = 4
+
+
+def is_valid_latitude(lat_str):
+    """验证纬度是否有效"""
+    try:
+        lat = float(lat_str)
+        return 30.0 <= lat <= 32.0  # 上海市纬度范围的宽松边界
+    except:
+        return False
+
+
+def is_valid_longitude(lng_str):
+    """验证经度是否有效"""
+    try:
+        lng = float(lng_str)
+        return 120.0 <= lng <= 122.5  # 上海市经度范围的宽松边界
+    except:
+        return False
+
+
+def clean_name_positions(names, facility_names=(), headings=()):
+    """清理带位置的名称：名称候选须包含数据中心关键词或地名，标题须包含数据中心关键词（facility_name 字段不限），
+    过滤掉太短或太长的名称"""
+    candidates = [(offset, name) for offset, name in names if NAME_AUTOMATON.contains(name, NAME_CATEGORIES)]
+    candidates.extend((offset, name) for offset, name in headings if NAME_AUTOMATON.contains(name, HEADING_CATEGORIES))
+    candidates.extend(facility_names)
+    return sorted((offset, name.strip()) for offset, name in candidates if 3 <= len(name.strip()) <= 100)
+
+
+def parse_page(content):
+    """解析页面（提取进程入口，不依赖爬虫状态），返回 {'locations': 内嵌JSON位置对象, 'records': 按位置组装的 [纬度, 经度, 名称, 偏移量]}"""
+    # 优先解析页面内嵌的应用状态JSON，名称和坐标来自同一个位置对象
+    locations = extract_locations(content)
+    if locations:
+        return {'locations': locations, 'records': []}
+    
+    records = []
+    
+    try:
+        print(f"  正在解析页面内容...")
+        
+        # 单遍扫描提取坐标和名称
+        matches = PAGE_SCANNER.scan(content)
+        
+        # 保留每个匹配的位置，转换为浮点数并进行基本验证
+        latitudes = [(offset, float(lat)) for offset, lat in PAGE_SCANNER.positions(matches, 'latitude')
+                     if is_valid_latitude(lat)]
+        longitudes = [(offset, float(lng)) for offset, lng in PAGE_SCANNER.positions(matches, 'longitude')
+                      if is_valid_longitude(lng)]
+        names = clean_name_positions(PAGE_SCANNER.positions(matches, 'name'),
+                                     PAGE_SCANNER.positions(matches, 'facility_name'),
+                                     PAGE_SCANNER.positions(matches, 'heading'))
+        
+        print(f"  找到坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
+        print(f"  找到名称: {len(names)} 个")
+        
+        # 按页面位置组装：纬度配其后最近的经度，名称取同一对象范围内最近的一个
+        records = [list(record) for record in assemble_records(latitudes, longitudes, names, BraceTracker(content))]
+    
+    except Exception as e:
+        print(f"  ❌ 数据提取错误: {e}")
+    
+    return {'locations': [], 'records': records}
+
+
 class ShanghaiDataCenterCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         # 上海市的URL变体 - 基于提供的链接
         self.urls = {
             # 主要URL（用户提供的链接）
@@ -77,6 +177,14 @@ class ShanghaiDataCenterCrawler:
             'Upgrade-Insecure-Requests': '1',
         }
         
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
+        
+        # 页面提取进程数，None 表示按CPU核数
+        self.extract_workers = None
+        # 提取结果缓存：逐字节相同的页面（如各缩放级别的聚合响应）只解析一次
+        self.extraction_cache = ExtractionCache()
+        
         self.all_results = []
         self.unique_coordinates = set()
         
@@ -159,190 +267,103 @@ class ShanghaiDataCenterCrawler:
     
     def extract_data_from_page(self, content, source_key):
         """从页面内容中提取数据中心信息"""
+        # 解析结果与数据源无关，相同正文直接取自提取缓存
+        parsed = self.extraction_cache.get_or_extract(
+            content, 'shanghai_page', f"{PAGE_EXTRACTOR_VERSION}.{HYDRATION_VERSION}", parse_page
+        )
+        return self.build_records(parsed, source_key)
+    
+    def build_records(self, parsed, source_key):
+        """把 parse_page 的结果转换为数据中心记录（跨数据源的坐标去重在这里完成）"""
+        if parsed['locations']:
+            location = self.location_mapping[source_key]
+            # 严格验证坐标是否在上海市范围内
+            return build_records_from_locations(
+                parsed['locations'], self.is_in_shanghai_proper, {'province': '上海市', 'district': location},
+                source_key, self.unique_coordinates, default_name=f"{location}数据中心",
+                start_index=len(self.all_results),
+                extra={'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'validation_status': 'valid'}
+            )
+        return self.build_records_from_assembled(parsed['records'], source_key)
+    
+    def build_records_from_assembled(self, records, source_key):
+        """把组装好的 (纬度, 经度, 名称, 偏移量) 转换为数据中心记录"""
         found_data = []
-        
-        try:
-            print(f"  正在解析页面内容...")
-            
-            # 提取坐标信息
-            latitude_patterns = [
-                r'"latitude":\s*([\d\.\-]+)',
-                r'"lat":\s*([\d\.\-]+)',
-                r'latitude:\s*([\d\.\-]+)',
-                r'lat:\s*([\d\.\-]+)'
-            ]
+        location = self.location_mapping[source_key]
+        
+        # 创建数据中心记录
+        valid_count = 0
+        invalid_count = 0
+        
+        for lat, lng, name, _ in records:
+            # 严格验证坐标是否在上海市范围内
+            if not self.is_in_shanghai_proper(lat, lng):
+                print(f"  ❌ 排除非上海市坐标: ({lat:.6f}, {lng:.6f})")
+                invalid_count += 1
+                continue
             
-            longitude_patterns = [
-                r'"longitude":\s*([\d\.\-]+)',
-                r'"lng":\s*([\d\.\-]+)', 
-                r'"lon":\s*([\d\.\-]+)',
-                r'longitude:\s*([\d\.\-]+)',
-                r'lng:\s*([\d\.\-]+)',
-                r'lon:\s*([\d\.\-]+)'
-            ]
+            # 检查是否重复
+            coord_key = (round(lat, 6), round(lng, 6))
+            if coord_key in self.unique_coordinates:
+                print(f"  ⚠️  跳过重复坐标: ({lat:.6f}, {lng:.6f})")
+                continue
             
-            # 收集所有坐标
-            latitudes = []
-            longitudes = []
+            self.unique_coordinates.add(coord_key)
             
-            for pattern in latitude_patterns:
-                latitudes.extend(re.findall(pattern, content))
+            # 没有就近名称时使用默认名称
+            if not name:
+                name = f"{location}数据中心{len(found_data)+1}"
             
-            for pattern in longitude_patterns:
-                longitudes.extend(re.findall(pattern, content))
-            
-            # 去重并转换为浮点数，同时进行基本验证
-            latitudes = list(set([float(lat) for lat in latitudes if self.is_valid_latitude(lat)]))
-            longitudes = list(set([float(lng) for lng in longitudes if self.is_valid_longitude(lng)]))
-            
-            print(f"  找到坐标: {len(latitudes)} 个纬度, {len(longitudes)} 个经度")
-            
-            # 提取数据中心名称 
-            name_patterns = [
-                r'"name":\s*"([^"]*(?:Data Center|IDC|数据中心|机房|云计算|DC)[^"]*)"',
-                r'"title":\s*"([^"]*(?:Data Center|IDC|数据中心|机房|云计算|DC)[^"]*)"',
-                r'"facility_name":\s*"([^"]*)"',
-                r'<h[1-6][^>]*>([^<]*(?:Data Center|IDC|数据中心|机房|云计算|DC)[^<]*)</h[1-6]>',
-                # 上海相关的特定模式
-                r'"name":\s*"([^"]*(?:上海|Shanghai|浦东|黄浦|徐汇|长宁|静安|普陀|虹口|杨浦|闵行|宝山|嘉定|金山|松江|青浦|奉贤|崇明)[^"]*)"',
-                r'"title":\s*"([^"]*(?:上海|Shanghai|浦东|黄浦|徐汇|长宁|静安|普陀|虹口|杨浦|闵行|宝山|嘉定|金山|松江|青浦|奉贤|崇明)[^"]*)"',
-            ]
-            
-            all_names = []
-            for pattern in name_patterns:
-                names = re.findall(pattern, content, re.IGNORECASE)
-                all_names.extend(names)
-            
-            # 清理和去重名称
-            unique_names = self.clean_and_dedupe_names(all_names)
-            print(f"  找到名称: {len(unique_names)} 个唯一名称")
-            
-            # 组合坐标数据
-            location = self.location_mapping[source_key]
-            
-            # 创建坐标对
-            coordinates_pairs = []
-            
-            # 如果纬度和经度数量相等，直接配对
-            if len(latitudes) == len(longitudes):
-                coordinates_pairs = list(zip(latitudes, longitudes))
-            else:
-                # 如果数量不等，尝试智能匹配
-                coordinates_pairs = self.smart_coordinate_matching(latitudes, longitudes)
+            # 进一步验证名称是否与上海相关
+            if not self.is_shanghai_related_name(name):
+                print(f"  ⚠️  名称可能不属于上海: {name}")
+                # 但仍然保留，因为坐标已经验证
             
-            # 创建数据中心记录
-            valid_count = 0
-            invalid_count = 0
+            data_center = {
+                'province': '上海市',
+                'district': location,
+                'latitude': lat,
+                'longitude': lng,
+                'name': name,
+                'source': source_key,
+                'coordinates': f"{lat},{lng}",
+                'index': len(self.all_results) + len(found_data) + 1,
+                'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'validation_status': 'valid'
+            }
             
-            for i, (lat, lng) in enumerate(coordinates_pairs):
-                # 严格验证坐标是否在上海市范围内
-                if not self.is_in_shanghai_proper(lat, lng):
-                    print(f"  ❌ 排除非上海市坐标: ({lat:.6f}, {lng:.6f})")
-                    invalid_count += 1
-                    continue
-                
-                # 检查是否重复
-                coord_key = (round(lat, 6), round(lng, 6))
-                if coord_key in self.unique_coordinates:
-                    print(f"  ⚠️  跳过重复坐标: ({lat:.6f}, {lng:.6f})")
-                    continue
-                
-                self.unique_coordinates.add(coord_key)
-                
-                # 选择名称
-                if i < len(unique_names):
-                    name = unique_names[i]
-                else:
-                    name = f"{location}数据中心{len(found_data)+1}"
-                
-                # 进一步验证名称是否与上海相关
-                if not self.is_shanghai_related_name(name):
-                    print(f"  ⚠️  名称可能不属于上海: {name}")
-                    # 但仍然保留，因为坐标已经验证
-                
-                data_center = {
-                    'province': '上海市',
-                    'district': location,
-                    'latitude': lat,
-                    'longitude': lng,
-                    'name': name,
-                    'source': source_key,
-                    'coordinates': f"{lat},{lng}",
-                    'index': len(self.all_results) + len(found_data) + 1,
-                    'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'validation_status': 'valid'
-                }
-                
-                found_data.append(data_center)
-                valid_count += 1
-                print(f"  ✅ {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
-            
-            print(f"  📊 坐标验证结果: ✅{valid_count}个有效, ❌{invalid_count}个无效")
+            found_data.append(data_center)
+            valid_count += 1
+            print(f"  ✅ {len(found_data)}. {name} - ({lat:.6f}, {lng:.6f})")
         
-        except Exception as e:
-            print(f"  ❌ 数据提取错误: {e}")
+        print(f"  📊 坐标验证结果: ✅{valid_count}个有效, ❌{invalid_count}个无效")
         
         return found_data
     
-    def is_valid_latitude(self, lat_str):
-        """验证纬度是否有效"""
-        try:
-            lat = float(lat_str)
-            return 30.0 <= lat <= 32.0  # 上海市纬度范围的宽松边界
-        except:
-            return False
-    
-    def is_valid_longitude(self, lng_str):
-        """验证经度是否有效"""
-        try:
-            lng = float(lng_str)
-            return 120.0 <= lng <= 122.5  # 上海市经度范围的宽松边界
-        except:
-            return False
-    
     def is_shanghai_related_name(self, name):
         """检查名称是否与上海相关"""
-        shanghai_keywords = [
-            '上海', 'Shanghai', 'SH', '浦东', '黄浦', '徐汇', '长宁', '静安', 
-            '普陀', '虹口', '杨浦', '闵行', '宝山', '嘉定', '金山', '松江', 
-            '青浦', '奉贤', '崇明', 'Pudong', 'Huangpu', 'Xuhui'
-        ]
-        
-        name_lower = name.lower()
-        return any(keyword.lower() in name_lower for keyword in shanghai_keywords)
+        return NAME_AUTOMATON.contains(name, {'related'})
     
-    def clean_and_dedupe_names(self, names):
-        """清理和去重名称"""
-        unique_names = []
-        seen_names = set()
-        
-        for name in names:
-            clean_name = name.strip()
-            # 过滤掉太短或太长的名称
-            if 3 <= len(clean_name) <= 100:
-                # 转换为小写进行比较，但保持原始大小写
-                name_lower = clean_name.lower()
-                if name_lower not in seen_names:
-                    unique_names.append(clean_name)
-                    seen_names.add(name_lower)
-        
-        return unique_names
-    
-    def smart_coordinate_matching(self, latitudes, longitudes):
-        """智能坐标匹配"""
-        coordinates_pairs = []
-        
-        # 如果其中一个列表为空，返回空列表
-        if not latitudes or not longitudes:
-            return coordinates_pairs
-        
-        # 使用较短的列表长度
-        min_length = min(len(latitudes), len(longitudes))
+    def merge_extracted_pages(self, results, pool):
+        """按数据源顺序把提取进程的解析结果转换为记录并合并，返回提取到数据的数据源数量"""
+        success_count = 0
         
-        for i in range(min_length):
-            coordinates_pairs.append((latitudes[i], longitudes[i]))
+        for source_key, parsed, log, error in results:
+            print(f"\n{source_key} (提取进程数: {pool.max_workers})")
+            print(log, end='')
+            if error is not None:
+                print(f"  ❌ 数据提取错误: {error}")
+                continue
+            
+            page_data = self.build_records(parsed, source_key)
+            self.all_results.extend(page_data)
+            if page_data:
+                print(f"  🎉 成功提取: {len(page_data)} 个上海市数据中心")
+                success_count += 1
+            else:
+                print(f"  ⚠️ 未找到有效数据")
         
-        return coordinates_pairs
+        return success_count
     
     def crawl_all_sources(self):
         """爬取所有数据源"""
@@ -354,49 +375,49 @@ class ShanghaiDataCenterCrawler:
         success_count = 0
         failed_count = 0
         
-        for source_key, url in self.urls.items():
-            print(f"\n🔍 正在爬取: {source_key}")
-            print(f"📍 URL: {url}")
-            print("-" * 60)
-            
-            try:
-                response = requests.get(url, headers=self.headers, timeout=30)
-                
-                if response.status_code != 200:
-                    print(f"  ❌ 请求失败: HTTP {response.status_code}")
-                    failed_count += 1
-                    continue
+        # 页面解析在进程池中进行，与后续下载并行；前面的数据源都解析完后即合并，不等全部下载结束
+        with ExtractionPool(parse_page, list(self.urls), max_workers=self.extract_workers,
+                            cache=self.extraction_cache, extractor='shanghai_page',
+                            version=f"{PAGE_EXTRACTOR_VERSION}.{HYDRATION_VERSION}") as pool:
+            for source_key, url in self.urls.items():
+                print(f"\n🔍 正在爬取: {source_key}")
+                print(f"📍 URL: {url}")
+                print("-" * 60)
                 
-                print(f"  ✅ 请求成功，页面大小: {len(response.text)} 字符")
-                
-                # 提取数据
-                page_data = self.extract_data_from_page(response.text, source_key)
-                
-                if page_data:
-                    self.all_results.extend(page_data)
-                    print(f"  🎉 成功提取: {len(page_data)} 个上海市数据中心")
-                    success_count += 1
-                else:
-                    print(f"  ⚠️ 未找到有效数据")
-                
-                # 保存页面源码用于调试
-                filename = f"html_sources/shanghai/{source_key.replace('-', '_')}_source.html"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
-                print(f"  💾 页面源码已保存: {filename}")
+                try:
+                    response = self.client.get(url, headers=self.headers, timeout=30)
+                    
+                    if response.status_code != 200:
+                        print(f"  ❌ 请求失败: HTTP {response.status_code}")
+                        failed_count += 1
+                        continue
+                    
+                    print(f"  ✅ 请求成功，页面大小: {len(response.text)} 字符")
+                    
+                    # 交给提取进程池解析，继续下载下一个数据源
+                    pool.submit(source_key, response.text)
+                    
+                    # 保存页面源码用于调试
+                    filename = f"html_sources/shanghai/{source_key.replace('-', '_')}_source.html"
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(response.text)
+                    print(f"  💾 页面源码已保存: {filename}")
                 
-                # 请求间隔，避免被封IP
-                time.sleep(3)
+                except requests.exceptions.Timeout:
+                    print(f"  ⏱️ 请求超时")
+                    failed_count += 1
+                except requests.exceptions.RequestException as e:
+                    print(f"  ❌ 网络错误: {e}")
+                    failed_count += 1
+                except Exception as e:
+                    print(f"  ❌ 未知错误: {e}")
+                    failed_count += 1
                 
-            except requests.exceptions.Timeout:
-                print(f"  ⏱️ 请求超时")
-                failed_count += 1
-            except requests.exceptions.RequestException as e:
-                print(f"  ❌ 网络错误: {e}")
-                failed_count += 1
-            except Exception as e:
-                print(f"  ❌ 未知错误: {e}")
-                failed_count += 1
+                # 下载失败、未提交页面的数据源标记为跳过（已提交的不受影响）
+                pool.skip(source_key)
+                success_count += self.merge_extracted_pages(pool.ready(), pool)
+            
+            success_count += self.merge_extracted_pages(pool.collect(), pool)
         
         print(f"\n{'='*80}")
         print(f"📊 爬取统计:")
@@ -407,6 +428,17 @@ class ShanghaiDataCenterCrawler:
         
         return self.all_results
     
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        def extract(content, source_key):
+            page_data = self.extract_data_from_page(content, source_key)
+            self.all_results.extend(page_data)
+            return page_data
+        
+        replay_snapshots(snapshot_dir, extract, source_keys=list(self.urls), default=list(self.urls)[0])
+        self.extraction_cache.print_stats()
+        return self.all_results
+    
     def save_results(self):
         """保存爬取结果"""
         if not self.all_results:
@@ -563,16 +595,25 @@ class ShanghaiDataCenterCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("上海市数据中心爬虫")
+    
     print("🚀 上海市数据中心爬虫启动")
     print("🎯 专业爬取上海市数据中心分布信息")
     print("🛡️ 严格剔除周边地区（苏州、昆山、嘉兴等）错分数据")
     print("📍 覆盖范围：上海市16个区（黄浦、徐汇、长宁、静安、普陀、虹口、杨浦、浦东新区、闵行、宝山、嘉定、金山、松江、青浦、奉贤、崇明）")
     
-    crawler = ShanghaiDataCenterCrawler()
+    # 条件GET缓存：未变化的页面由服务器返回304，正文从磁盘读取
+    cache = ResponseCache()
+    crawler = ShanghaiDataCenterCrawler(client=FetchClient(cache=cache))
     
     try:
         # 开始爬取
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
+            cache.flush()
+            cache.print_stats()
         
         if results:
             # 显示结果
@@ -5,18 +5,51 @@
 支持分页、地图数据和API调用获取完整数据
 """
 
-import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 import urllib.parse
 from bs4 import BeautifulSoup
 
+from extraction_cascade import ExtractionCascade, expected_count, reported_totals
+from fetch_client import FetchClient
+from hydration_extractor import iter_script_json
+from marker_scanner import scan_markers
+from snapshot_replay import parse_replay_args, replay_snapshots
+
+# JSON-LD 中可能包含位置的键，遍历只沿这些键深入（评价、报价、图片、作者等分支不会包含数据中心位置）
+JSON_LD_LOCATION_KEYS = ('@graph', 'geo', 'address', 'location', 'containedInPlace')
+# 可能带位置信息的常见 schema.org 类型（名称以 Place 结尾的类型另行判断）
+JSON_LD_PLACE_TYPES = {'LocalBusiness', 'Organization', 'Corporation', 'CivicStructure', 'Landform'}
+
+
+def is_json_ld_place(node):
+    """@type 是否为可能带位置信息的类型（Place 及其子类型、LocalBusiness 等）"""
+    if not isinstance(node, dict):
+        return False
+    types = node.get('@type')
+    if not isinstance(types, list):
+        types = [types]
+    return any(isinstance(t, str) and (t.endswith('Place') or t in JSON_LD_PLACE_TYPES) for t in types)
+
+
+def json_ld_children(node):
+    """节点下可能包含位置的子节点：位置相关键的取值，以及其他键下 Place 类的对象（或列表中的 Place 类对象）"""
+    children = []
+    for key, value in node.items():
+        if key in JSON_LD_LOCATION_KEYS:
+            if isinstance(value, (dict, list)):
+                children.append(value)
+        elif isinstance(value, list):
+            children.extend(item for item in value if is_json_ld_place(item))
+        elif is_json_ld_place(value):
+            children.append(value)
+    return children
+
 class ShanghaiEnhancedCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         self.api_base = "https://www.datacenters.com"
         
@@ -60,12 +93,24 @@ class ShanghaiEnhancedCrawler:
             'Pragma': 'no-cache'
         }
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
         
         self.all_results = []
         self.unique_coordinates = set()
         self.filtered_out = []
+        # 地图聚合点 {(纬度, 经度): 该位置附近的数据中心数量}，随结果保存，用于核对遗漏
+        self.map_clusters = {}
+        
+        # 提取策略按成本从低到高执行
+        # 策略参数为 (页面内容, 数据源, 本页扫描到的单个标记)
+        self.extraction = (ExtractionCascade()
+            .add('JSON-LD数据', lambda content, source_key, markers: self.extract_json_ld_data(content), cost=1)
+            .add('地图标记', lambda content, source_key, markers: self.extract_map_markers(markers), cost=2)
+            .add('坐标模式', lambda content, source_key, markers: self.extract_coordinate_patterns(content, source_key),
+                 cost=3)
+            .add('结构化数据', lambda content, source_key, markers: self.extract_structured_data(content, source_key),
+                 cost=5))
         
         # 创建输出目录
         self.create_output_directories()
@@ -111,7 +156,7 @@ class ShanghaiEnhancedCrawler:
             print(f"🔗 URL: {page_url}")
             
             try:
-                response = self.session.get(page_url, timeout=30)
+                response = self.client.get(page_url, headers=self.headers, timeout=30)
                 
                 if response.status_code != 200:
                     print(f"  ❌ 请求失败: HTTP {response.status_code}")
@@ -136,8 +181,6 @@ class ShanghaiEnhancedCrawler:
                     if page > 2:
                         break
                 
-                time.sleep(2)  # 页面间隔
-                
             except Exception as e:
                 print(f"  ❌ 第{page}页爬取失败: {e}")
         
@@ -170,7 +213,7 @@ class ShanghaiEnhancedCrawler:
                     print(f"  🔗 尝试API: {endpoint}")
                     
                     # GET请求
-                    response = self.session.get(api_url, params=params, timeout=15)
+                    response = self.client.get(api_url, headers=self.headers, params=params, timeout=15)
                     
                     if response.status_code == 200:
                         try:
@@ -186,8 +229,6 @@ class ShanghaiEnhancedCrawler:
                         except json.JSONDecodeError:
                             pass
                     
-                    time.sleep(1)
-                    
                 except Exception as e:
                     pass  # 静默处理API错误
         
@@ -282,37 +323,18 @@ class ShanghaiEnhancedCrawler:
     
     def extract_data_from_page(self, content, source_key):
         """从页面内容中提取数据"""
-        found_data = []
-        
         try:
             print(f"  正在解析页面内容...")
             
-            # 1. 提取JSON-LD结构化数据
-            json_ld_data = self.extract_json_ld_data(content)
-            if json_ld_data:
-                found_data.extend(json_ld_data)
-                print(f"    JSON-LD数据: {len(json_ld_data)} 个")
-            
-            # 2. 提取Google Maps标记数据
-            map_data = self.extract_map_markers(content)
-            if map_data:
-                found_data.extend(map_data)
-                print(f"    地图标记: {len(map_data)} 个")
+            # 页面报告的总数和每页数量决定预期数量，达到后不再执行更昂贵的提取策略
+            total, per_page = reported_totals(content)
             
-            # 3. 提取常规坐标模式
-            coord_data = self.extract_coordinate_patterns(content, source_key)
-            if coord_data:
-                found_data.extend(coord_data)
-                print(f"    坐标模式: {len(coord_data)} 个")
+            # 地图标记每页扫描一次：聚合点无论级联是否提前结束都会记录，单个标记交给级联中的地图标记策略
+            markers, clusters = scan_markers(content)
+            self.record_map_clusters(clusters)
             
-            # 4. 提取表格和列表数据
-            structured_data = self.extract_structured_data(content, source_key)
-            if structured_data:
-                found_data.extend(structured_data)
-                print(f"    结构化数据: {len(structured_data)} 个")
-            
-            # 去重处理
-            unique_data = self.deduplicate_data(found_data)
+            # JSON-LD、地图标记、坐标模式、结构化数据按成本依次执行，结果已去重
+            unique_data = self.extraction.run(content, source_key, markers, expected=expected_count(total, per_page))
             print(f"    去重后: {len(unique_data)} 个唯一数据中心")
             
             return unique_data
@@ -326,18 +348,11 @@ class ShanghaiEnhancedCrawler:
         results = []
         
         try:
-            # 查找JSON-LD脚本
-            json_ld_pattern = r'<script[^>]*type=["\']*application/ld\+json["\']*[^>]*>(.*?)</script>'
-            json_scripts = re.findall(json_ld_pattern, content, re.DOTALL | re.IGNORECASE)
-            
-            for script in json_scripts:
-                try:
-                    data = json.loads(script.strip())
-                    extracted = self.parse_json_ld(data)
-                    if extracted:
-                        results.extend(extracted)
-                except:
-                    pass
+            # 单遍扫描 <script> 块，只解码 type="application/ld+json" 的脚本
+            for data in iter_script_json(content, 'application/ld+json'):
+                extracted = self.parse_json_ld(data)
+                if extracted:
+                    results.extend(extracted)
         
         except Exception as e:
             pass
@@ -345,27 +360,25 @@ class ShanghaiEnhancedCrawler:
         return results
     
     def parse_json_ld(self, data):
-        """解析JSON-LD数据"""
+        """解析JSON-LD数据（显式栈迭代遍历，只沿 geo/address/Place 等可能包含位置的分支深入）"""
         results = []
-        
-        try:
-            if isinstance(data, list):
-                for item in data:
-                    results.extend(self.parse_json_ld(item))
-            elif isinstance(data, dict):
-                # 查找地址和坐标信息
-                if 'geo' in data or 'address' in data or '@type' in data:
-                    result = self.parse_location_data(data)
-                    if result:
-                        results.append(result)
-                
-                # 递归查找嵌套数据
-                for key, value in data.items():
-                    if isinstance(value, (dict, list)):
-                        results.extend(self.parse_json_ld(value))
-        
-        except Exception as e:
-            pass
+        stack = [data]
+        
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+                continue
+            if not isinstance(node, dict):
+                continue
+            
+            # 带坐标/地址的节点或 Place 类节点才可能是数据中心位置
+            if 'geo' in node or 'address' in node or is_json_ld_place(node):
+                result = self.parse_location_data(node)
+                if result:
+                    results.append(result)
+            
+            stack.extend(reversed(json_ld_children(node)))
         
         return results
     
@@ -411,48 +424,35 @@ class ShanghaiEnhancedCrawler:
         
         return None
     
-    def extract_map_markers(self, content):
-        """提取Google Maps标记数据"""
+    def extract_map_markers(self, markers):
+        """提取Google Maps标记数据（markers 为 scan_markers 扫描到的单个标记）"""
         results = []
         
         try:
-            # 查找gmp-advanced-marker标记
-            marker_pattern = r'<gmp-advanced-marker[^>]*position="([^"]*)"[^>]*>.*?</gmp-advanced-marker>'
-            markers = re.findall(marker_pattern, content, re.DOTALL)
-            
-            for i, position in enumerate(markers):
-                try:
-                    if ',' in position:
-                        parts = position.split(',')
-                        if len(parts) >= 2:
-                            lat = float(parts[0].strip())
-                            lng = float(parts[1].strip())
-                            
-                            is_valid, district = self.is_in_shanghai(lat, lng)
-                            if is_valid:
-                                results.append({
-                                    'latitude': lat,
-                                    'longitude': lng,
-                                    'name': f"上海数据中心_{i+1}",
-                                    'source': 'map_marker',
-                                    'district': district
-                                })
-                except:
-                    pass
-            
-            # 查找聚合标记中的数量信息
-            cluster_pattern = r'aria-label="(\d+)"[^>]*title="(\d+)"[^>]*position="([^"]*)"'
-            clusters = re.findall(cluster_pattern, content)
-            
-            print(f"    发现聚合标记: {len(clusters)} 个")
-            for label, title, position in clusters:
-                print(f"      聚合点: {label}个数据中心 位置:{position}")
+            for i, marker in enumerate(markers):
+                is_valid, district = self.is_in_shanghai(marker.latitude, marker.longitude)
+                if is_valid:
+                    results.append({
+                        'latitude': marker.latitude,
+                        'longitude': marker.longitude,
+                        'name': marker.title or f"上海数据中心_{i+1}",
+                        'source': 'map_marker',
+                        'district': district
+                    })
         
         except Exception as e:
             pass
         
         return results
     
+    def record_map_clusters(self, clusters):
+        """记录聚合标记中的数量信息，随结果保存"""
+        print(f"    发现聚合标记: {len(clusters)} 个")
+        for cluster in clusters:
+            print(f"      聚合点: {cluster.count}个数据中心 位置:{cluster.latitude},{cluster.longitude}")
+            # 多个页面显示同一聚合点时只记一次
+            self.map_clusters[(cluster.latitude, cluster.longitude)] = cluster.count
+    
     def extract_coordinate_patterns(self, content, source_key):
         """提取坐标模式"""
         results = []
@@ -577,6 +577,17 @@ class ShanghaiEnhancedCrawler:
             all_data.extend(api_data)
             print(f"\n🔗 API数据总计: {len(api_data)} 个数据中心")
         
+        return self.finalize_results(all_data)
+    
+    def replay_snapshots(self, snapshot_dir):
+        """离线回放：把保存的HTML快照送入同一提取流程，无网络请求、无等待"""
+        all_data = replay_snapshots(snapshot_dir, self.extract_data_from_page)
+        return self.finalize_results(all_data)
+    
+    def finalize_results(self, all_data):
+        """去重、区域验证并生成最终结果"""
+        self.extraction.print_stats()
+        
         # 3. 去重和处理
         final_data = self.deduplicate_data(all_data)
         
@@ -649,6 +660,18 @@ class ShanghaiEnhancedCrawler:
             except Exception as e:
                 print(f"❌ 保存过滤数据失败: {e}")
         
+        # 保存地图聚合点（聚合点内的数据中心未逐个列出）
+        if self.map_clusters:
+            clusters_file = f"data/shanghai/地图聚合点_{timestamp}.json"
+            try:
+                clusters = [{'latitude': lat, 'longitude': lng, 'count': count}
+                            for (lat, lng), count in self.map_clusters.items()]
+                with open(clusters_file, 'w', encoding='utf-8') as f:
+                    json.dump(clusters, f, ensure_ascii=False, indent=2)
+                print(f"📄 地图聚合点已保存: {clusters_file}")
+            except Exception as e:
+                print(f"❌ 保存地图聚合点失败: {e}")
+        
         # 生成详细报告
         self.generate_detailed_report(timestamp)
     
@@ -722,6 +745,14 @@ class ShanghaiEnhancedCrawler:
                     for reason, count in filter_reasons.items():
                         f.write(f"{reason}: {count} 个\n")
                 
+                # 地图聚合点
+                if self.map_clusters:
+                    f.write(f"\n地图聚合点:\n")
+                    f.write("-" * 20 + "\n")
+                    f.write(f"聚合点 {len(self.map_clusters)} 个, 共包含 {sum(self.map_clusters.values())} 个数据中心\n")
+                    for (lat, lng), count in self.map_clusters.items():
+                        f.write(f"  ({lat:.6f}, {lng:.6f}): {count} 个\n")
+                
                 # 地理分布分析
                 if self.all_results:
                     lats = [r['latitude'] for r in self.all_results]
@@ -748,6 +779,8 @@ class ShanghaiEnhancedCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("上海市数据中心增强版爬虫")
+    
     print("🚀 上海市数据中心增强版爬虫")
     print("🎯 采用多种策略获取完整数据")
     print("📍 精确的地理验证和区域分类")
@@ -756,7 +789,10 @@ def main():
     
     try:
         # 开始爬取
-        results = crawler.crawl_all_sources()
+        if replay_dir:
+            results = crawler.replay_snapshots(replay_dir)
+        else:
+            results = crawler.crawl_all_sources()
         
         if results:
             print(f"\n🎉 任务完成！")
@@ -5,17 +5,18 @@
 结合所有技术手段的最终版本
 """
 
-import requests
 import re
 import json
 import pandas as pd
-import time
 import os
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+from fetch_client import FetchClient
+from snapshot_replay import parse_replay_args, replay_snapshots
+
 class ShanghaiUltimateCrawler:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://www.datacenters.com/locations/china/shanghai"
         
         # 已知的聚合点（从HTML分析中提取）
@@ -58,8 +59,8 @@ class ShanghaiUltimateCrawler:
             'Cache-Control': 'no-cache',
         }
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 共享HTTP客户端（连接池复用）
+        self.client = client or FetchClient(headers=self.headers)
         
         self.all_results = []
         self.manual_data = []  # 手动收集的数据
@@ -172,7 +173,7 @@ class ShanghaiUltimateCrawler:
         
         try:
             # 主页面
-            response = self.session.get(f"{self.base_url}/shanghai", timeout=30)
+            response = self.client.get(f"{self.base_url}/shanghai", headers=self.headers, timeout=30)
             if response.status_code == 200:
                 # 保存页面
                 with open("html_sources/shanghai/main_page.html", 'w', encoding='utf-8') as f:
@@ -182,7 +183,7 @@ class ShanghaiUltimateCrawler:
                 web_results.extend(self.extract_coordinates_from_content(response.text, "main_page"))
             
             # 尝试列表视图
-            list_response = self.session.get(f"{self.base_url}?view=list", timeout=30)
+            list_response = self.client.get(f"{self.base_url}?view=list", headers=self.headers, timeout=30)
             if list_response.status_code == 200:
                 with open("html_sources/shanghai/list_view.html", 'w', encoding='utf-8') as f:
                     f.write(list_response.text)
@@ -191,14 +192,13 @@ class ShanghaiUltimateCrawler:
             
             # 尝试不同分页
             for page in range(1, 5):
-                page_response = self.session.get(f"{self.base_url}?page={page}", timeout=20)
+                page_response = self.client.get(f"{self.base_url}?page={page}", headers=self.headers, timeout=20)
                 if page_response.status_code == 200:
                     page_results = self.extract_coordinates_from_content(page_response.text, f"page_{page}")
                     if page_results:
                         web_results.extend(page_results)
                     else:
                         break  # 没有更多数据
-                time.sleep(1)
         
         except Exception as e:
             print(f"网站爬取错误: {e}")
@@ -279,8 +279,8 @@ class ShanghaiUltimateCrawler:
         print(f"去重前: {len(all_data)} 个，去重后: {len(unique_data)} 个")
         return unique_data
     
-    def run_comprehensive_crawl(self):
-        """运行综合爬取"""
+    def run_comprehensive_crawl(self, snapshot_dir=None):
+        """运行综合爬取（指定 snapshot_dir 时用保存的HTML快照代替网站爬取）"""
         print("🚀 上海市数据中心终极爬虫启动")
         print("🎯 目标：获取最完整的上海市数据中心分布")
         print("📋 策略：网站爬取 + 手动收集 + 数据验证")
@@ -289,8 +289,11 @@ class ShanghaiUltimateCrawler:
         # 1. 手动收集知名数据中心
         manual_data = self.add_manual_data()
         
-        # 2. 网站爬取
-        web_data = self.crawl_web_data()
+        # 2. 网站爬取（或离线回放）
+        if snapshot_dir:
+            web_data = replay_snapshots(snapshot_dir, self.extract_coordinates_from_content)
+        else:
+            web_data = self.crawl_web_data()
         
         # 3. 合并去重
         final_data = self.merge_and_deduplicate(web_data, manual_data)
@@ -423,6 +426,8 @@ class ShanghaiUltimateCrawler:
 
 def main():
     """主函数"""
+    replay_dir = parse_replay_args("上海市数据中心终极爬虫")
+    
     print("🎯 上海市数据中心终极爬虫")
     print("🔥 结合所有技术手段的最终版本")
     print("📊 目标：获取80+个数据中心的完整分布")
@@ -431,7 +436,7 @@ def main():
     
     try:
         # 运行综合爬取
-        results = crawler.run_comprehensive_crawl()
+        results = crawler.run_comprehensive_crawl(snapshot_dir=replay_dir)
         
         if results:
             print(f"\n🎉 终极爬取完成！")
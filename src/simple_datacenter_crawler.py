@@ -16,6 +16,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import pandas as pd
 
+from driver_pool import shared_pool
+
 class SimpleDataCenterCrawler:
     def __init__(self):
         self.provinces_urls = {
@@ -25,6 +27,9 @@ class SimpleDataCenterCrawler:
         }
         self.results = []
         
+        # 共享浏览器池：多个省份和多次运行复用已启动的浏览器，归还时清理状态
+        self.driver_pool = shared_pool('simple_datacenter', self.setup_driver)
+        
     def setup_driver(self):
         """设置Chrome浏览器"""
         chrome_options = Options()
@@ -193,7 +198,7 @@ class SimpleDataCenterCrawler:
         print(f"URL: {url}")
         print(f"{'='*50}")
         
-        driver = self.setup_driver()
+        driver = self.driver_pool.acquire()
         if not driver:
             return []
         
@@ -221,7 +226,7 @@ class SimpleDataCenterCrawler:
         except Exception as e:
             print(f"爬取 {province_name} 时出错: {e}")
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
         
         return province_results
     
@@ -229,6 +234,9 @@ class SimpleDataCenterCrawler:
         """爬取所有省份"""
         print("开始爬取所有省份的数据中心信息...")
         
+        # 省份逐个爬取，同时只租用一个浏览器；提前在后台启动，第一个省份不必等待
+        self.driver_pool.warm_up(1)
+        
         for province, url in self.provinces_urls.items():
             try:
                 province_data = self.crawl_province(province, url)
@@ -242,6 +250,7 @@ class SimpleDataCenterCrawler:
                 continue
         
         print(f"\n总计爬取完成，共找到 {len(self.results)} 个数据中心")
+        self.driver_pool.print_stats()
         return self.results
     
     def save_results(self):
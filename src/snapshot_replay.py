@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线回放模式 - 用 html_sources/ 下保存的页面快照驱动提取流程
+不发网络请求、不等待，便于以磁盘速度调试和基准测试解析器
+"""
+
+import argparse
+import glob
+import os
+import time
+
+SNAPSHOT_PATTERNS = ("*.html", "*.htm")
+
+
+def add_replay_argument(parser):
+    """为命令行解析器添加 --replay 参数"""
+    parser.add_argument(
+        '--replay',
+        metavar='SNAPSHOT_DIR',
+        help='离线回放模式：从指定目录（如 html_sources/shanghai）读取保存的HTML快照并提取数据'
+    )
+    return parser
+
+
+def parse_replay_args(description=None, argv=None):
+    """解析只含 --replay 参数的命令行，返回快照目录或None"""
+    parser = add_replay_argument(argparse.ArgumentParser(description=description))
+    return parser.parse_args(argv).replay
+
+
+def _normalize(name):
+    return name.lower().replace('-', '_')
+
+
+def match_source_key(filename, source_keys, default=None):
+    """根据快照文件名推断对应的数据源键
+
+    爬虫保存快照时通常把数据源键中的 '-' 替换成 '_'，例如
+    "深圳-shenzhen" -> "深圳_shenzhen_source.html"。依次尝试完整键和键中
+    英文部分（"sichuan-sheng"）是否出现在文件名中，取最长的匹配。
+    """
+    stem = _normalize(os.path.splitext(os.path.basename(filename))[0])
+
+    best_key, best_len = None, 0
+    for key in source_keys or []:
+        candidates = [_normalize(key)]
+        if '-' in key:
+            candidates.append(_normalize(key.split('-', 1)[1]))
+        for candidate in candidates:
+            if candidate and candidate in stem and len(candidate) > best_len:
+                best_key, best_len = key, len(candidate)
+
+    if best_key is not None:
+        return best_key
+    if default is not None:
+        return default
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def iter_snapshots(snapshot_dir, source_keys=None, default=None):
+    """按文件名顺序产出 (source_key, path, content)"""
+    paths = []
+    for pattern in SNAPSHOT_PATTERNS:
+        paths.extend(glob.glob(os.path.join(snapshot_dir, pattern)))
+
+    for path in sorted(paths):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        yield match_source_key(path, source_keys, default), path, content
+
+
+def replay_snapshots(snapshot_dir, extract, source_keys=None, default=None):
+    """把目录中的每个快照交给 extract(content, source_key)，返回全部记录
+
+    每个文件和整体的解析耗时都会打印出来，只计提取时间，不含磁盘读取。
+    """
+    if not os.path.isdir(snapshot_dir):
+        print(f"❌ 快照目录不存在: {snapshot_dir}")
+        return []
+
+    print(f"📼 离线回放模式: {snapshot_dir}")
+    print("=" * 70)
+
+    all_records = []
+    total_bytes = 0
+    total_seconds = 0.0
+    file_count = 0
+
+    for source_key, path, content in iter_snapshots(snapshot_dir, source_keys, default):
+        print(f"\n📄 {os.path.basename(path)} -> {source_key}")
+
+        start = time.perf_counter()
+        records = extract(content, source_key) or []
+        elapsed = time.perf_counter() - start
+
+        file_count += 1
+        total_bytes += len(content)
+        total_seconds += elapsed
+        all_records.extend(records)
+        print(f"  ⏱️ 解析 {len(content)} 字符用时 {elapsed * 1000:.1f} ms, 得到 {len(records)} 条记录")
+
+    print(f"\n{'=' * 70}")
+    print(f"📊 回放统计: {file_count} 个快照, {total_bytes / 1024:.1f} KB, "
+          f"解析总耗时 {total_seconds:.3f} 秒, 共 {len(all_records)} 条记录")
+    if total_seconds > 0:
+        print(f"  ⚡ 解析吞吐: {total_bytes / 1024 / 1024 / total_seconds:.2f} MB/s")
+
+    return all_records
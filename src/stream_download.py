@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式下载与增量提取
+按块读取响应正文，同时写入 html_sources 快照并送入增量正则扫描器，
+下载未结束时即可得到坐标，单个页面的内存占用与页面大小无关
+"""
+
+import codecs
+import os
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class IncrementalPatternScanner:
+    """对分块到达的文本执行 MultiPatternScanner 匹配
+
+    每次只保留末尾 overlap 个字符与下一块拼接，跨块边界的匹配不会丢失；
+    长度超过 overlap 的匹配可能被截断，overlap 应大于最长的预期匹配。
+    """
+
+    def __init__(self, scanner, overlap=512, on_match=None):
+        # scanner: pattern_scanner.MultiPatternScanner
+        self.scanner = scanner
+        self.kinds = list(scanner.kinds)
+        self.overlap = overlap
+        # on_match(kind, value, offset)：匹配确认后立即回调
+        self.on_match = on_match
+
+        self.buffer = ""
+        self.buffer_start = 0
+        self.chars_seen = 0
+        self._emitted = set()
+        self._matches = {kind: [] for kind in self.kinds}
+
+    def feed(self, text):
+        """送入下一块文本"""
+        if text:
+            self.buffer += text
+            self.chars_seen += len(text)
+            self._scan(final=False)
+
+    def close(self):
+        """输入结束，处理缓冲区中剩余的文本"""
+        self._scan(final=True)
+        self.buffer = ""
+
+    def _scan(self, final):
+        # 末尾 overlap 个字符内结束的匹配可能被截断，留到下一块再确认
+        safe_end = len(self.buffer) if final else len(self.buffer) - self.overlap
+        if safe_end <= 0:
+            return
+
+        for match in self.scanner.scan(self.buffer):
+            if match.end > safe_end:
+                continue
+            offset = self.buffer_start + match.start
+            key = (match.kind, match.index, offset)
+            if key in self._emitted:
+                continue
+            self._emitted.add(key)
+            self._matches[match.kind].append((match.index, offset, match.value))
+            if self.on_match:
+                self.on_match(match.kind, match.value, offset)
+
+        if not final:
+            # 保留可能与下一块组成匹配的尾部
+            keep_from = max(0, len(self.buffer) - 2 * self.overlap)
+            self.buffer = self.buffer[keep_from:]
+            self.buffer_start += keep_from
+            self._emitted = {key for key in self._emitted if key[2] >= self.buffer_start}
+
+    def values(self, kind):
+        """某类匹配的全部取值，按模式序号、再按出现位置排列（与逐个正则 findall 的结果顺序一致）"""
+        return [value for _, _, value in sorted(self._matches[kind], key=lambda item: (item[0], item[1]))]
+
+    def positions(self, kind):
+        """某类匹配的 (偏移量, 取值)，按位置排列；同一位置被多个模式命中时只保留一个"""
+        positions = {}
+        for _, offset, value in self._matches[kind]:
+            positions.setdefault(offset, value)
+        return sorted(positions.items())
+
+
+def stream_download(client, url, snapshot_path=None, consumers=(), headers=None, timeout=30,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """流式下载URL：正文逐块解码后写入快照文件并依次交给 consumers
+
+    返回响应对象（正文已读完，不保留在内存中），response.streamed_chars 为解码后的字符数。
+    非200响应不读取正文、不写快照。
+    """
+    response = client.get(url, headers=headers, timeout=timeout, stream=True)
+    response.streamed_chars = 0
+
+    if response.status_code != 200:
+        response.close()
+        return response
+
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    snapshot = None
+    tmp_path = None
+    if snapshot_path:
+        os.makedirs(os.path.dirname(snapshot_path) or '.', exist_ok=True)
+        tmp_path = snapshot_path + ".part"
+        snapshot = open(tmp_path, 'w', encoding='utf-8')
+
+    def emit(text):
+        if not text:
+            return
+        response.streamed_chars += len(text)
+        if snapshot:
+            snapshot.write(text)
+        for consumer in consumers:
+            consumer(text)
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            emit(decoder.decode(chunk))
+        emit(decoder.decode(b'', final=True))
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            snapshot.close()
+            os.remove(tmp_path)
+        raise
+    finally:
+        response.close()
+        if snapshot:
+            snapshot.close()
+
+    # 下载完整后才替换快照，中途失败不会留下半个页面
+    if tmp_path:
+        os.replace(tmp_path, snapshot_path)
+
+    return response
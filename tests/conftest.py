@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""pytest 配置：共享模块位于 src/ 目录"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
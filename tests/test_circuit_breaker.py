@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""RetryController 的重试范围与熔断"""
+
+import pytest
+import requests
+
+from circuit_breaker import CircuitOpenError, RetryController
+
+KEY = "https://www.datacenters.com/api/locations"
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def failing(error, calls):
+    def func():
+        calls.append(1)
+        raise error
+    return func
+
+
+def make_controller(**kwargs):
+    kwargs.setdefault('base_delay', 0)
+    return RetryController(**kwargs)
+
+
+def test_connection_errors_are_retried():
+    calls = []
+    controller = make_controller(max_attempts=3)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        controller.call(KEY, failing(requests.exceptions.ConnectionError("reset"), calls))
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.InvalidURL("bad url"),
+    requests.exceptions.MissingSchema("no schema"),
+    KeyError("programming error"),
+])
+def test_non_transient_errors_are_raised_at_once(error):
+    calls = []
+    controller = make_controller(max_attempts=3, failure_threshold=1)
+
+    with pytest.raises(type(error)):
+        controller.call(KEY, failing(error, calls))
+    assert len(calls) == 1
+    # 不计入熔断
+    assert not controller.is_open(KEY)
+    assert controller.stats['retries'] == 0
+
+
+def test_breaker_opening_mid_call_chains_the_real_error():
+    calls = []
+    controller = make_controller(max_attempts=5, failure_threshold=2)
+
+    with pytest.raises(CircuitOpenError) as info:
+        controller.call(KEY, failing(requests.exceptions.Timeout("slow"), calls))
+    assert len(calls) == 2
+    assert isinstance(info.value.__cause__, requests.exceptions.Timeout)
+
+
+def test_breaker_opening_mid_call_returns_last_response():
+    controller = make_controller(max_attempts=5, failure_threshold=2)
+
+    result = controller.call(KEY, lambda: Response(503))
+    assert result.status_code == 503
+    with pytest.raises(CircuitOpenError):
+        controller.call(KEY, lambda: Response(200))
+
+
+def test_retry_statuses_stop_on_success():
+    responses = [Response(503), Response(200)]
+    controller = make_controller(max_attempts=3)
+
+    assert controller.call(KEY, lambda: responses.pop(0)).status_code == 200
+    assert controller.stats['retries'] == 1
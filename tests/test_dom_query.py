@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""DomQuery 的元素文本与 BeautifulSoup 的按文本查找一致"""
+
+import os
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from dom_query import DomQuery, tag_selector
+
+BUTTON_TEXT = re.compile(r'(Next|Previous|下一页|上一页|\d+)', re.IGNORECASE)
+SAVED_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'html_sources', 'shanghai', 'main_analysis.html')
+
+
+def soup_matches(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [tag.string for tag in soup.find_all(['a', 'button'], string=BUTTON_TEXT)]
+
+
+def query_matches(html):
+    dom = DomQuery({'pagination': tag_selector('a', 'button')}).run(html)
+    return [elem.string for elem in dom['pagination'] if elem.string is not None and BUTTON_TEXT.search(elem.string)]
+
+
+def test_string_is_the_single_direct_text():
+    html = ('<div><button>2</button><a><span>Next</span></a>'
+            '<a>Page <b>3</b></a><a><span>1</span><span>2</span></a><button> </button></div>')
+
+    assert query_matches(html) == soup_matches(html) == ['2', 'Next']
+
+
+@pytest.mark.skipif(not os.path.exists(SAVED_PAGE), reason="没有保存的上海主页面")
+def test_saved_page_finds_same_pagination_buttons_as_soup():
+    with open(SAVED_PAGE, encoding='utf-8') as f:
+        html = f.read()
+
+    assert query_matches(html) == soup_matches(html)
+    assert len(query_matches(html)) == 3
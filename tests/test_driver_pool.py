@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""DriverPool 的租用、复用和归还时的状态清理"""
+
+from driver_pool import DriverPool, add_startup_script
+
+
+class FakeSwitch:
+    def window(self, handle):
+        pass
+
+
+class FakeDriver:
+    """只记录调用的浏览器替身"""
+
+    def __init__(self):
+        self.window_handles = ['main']
+        self.switch_to = FakeSwitch()
+        self.current_url = 'about:blank'
+        self.scripts = {}
+        self.next_identifier = 0
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Page.addScriptToEvaluateOnNewDocument':
+            self.next_identifier += 1
+            self.scripts[str(self.next_identifier)] = params['source']
+            return {'identifier': str(self.next_identifier)}
+        if command == 'Page.removeScriptToEvaluateOnNewDocument':
+            del self.scripts[params['identifier']]
+        return {}
+
+    def get(self, url):
+        self.current_url = url
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_startup_script_registered_once_and_removed_on_release():
+    pool = DriverPool(FakeDriver, size=1)
+
+    with pool.lease() as driver:
+        add_startup_script(driver, "window.a = 1;")
+        add_startup_script(driver, "window.a = 1;")
+        assert list(driver.scripts.values()) == ["window.a = 1;"]
+    assert driver.scripts == {}
+
+    with pool.lease() as reused:
+        assert reused is driver
+        add_startup_script(reused, "window.a = 1;")
+        assert len(reused.scripts) == 1
+
+    assert pool.stats == {'started': 1, 'leases': 2, 'reused': 1, 'recycled': 0}
+
+
+def test_driver_recycled_after_page_limit():
+    pool = DriverPool(FakeDriver, size=1, max_pages=2)
+
+    with pool.lease(pages=2) as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert first.quit_called
+    assert second is not first
+    assert pool.stats['recycled'] == 1
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""EndpointProber 的剪枝与变体枚举"""
+
+import json
+
+from endpoint_prober import EndpointProber
+
+BASE = "https://www.datacenters.com"
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status_code = status
+        self.text = body if isinstance(body, str) else json.dumps(body)
+        self.content = self.text.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeClient:
+    """handler(endpoint, params) -> (状态码, 正文)"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        endpoint = url[len(BASE):]
+        self.calls.append((endpoint, dict(params)))
+        return FakeResponse(*self.handler(endpoint, params))
+
+
+def builders():
+    return [
+        lambda zoom: {'kind': 'bounds', 'zoom': zoom},
+        lambda zoom: {'kind': 'bbox', 'zoom': zoom},
+    ]
+
+
+def test_endpoint_is_kept_when_only_second_param_set_works():
+    def handler(endpoint, params):
+        if endpoint == '/api/clusters' and params['kind'] == 'bbox':
+            return 200, {'clusters': [{'lat': 31.2, 'lng': 121.4}]}
+        return 404, 'not found'
+
+    prober = EndpointProber(FakeClient(handler), BASE)
+    results, _ = prober.probe(['/api/clusters', '/api/missing'], builders(), [10])
+
+    assert prober.endpoint_status == {'/api/clusters': 'alive', '/api/missing': 'dead'}
+    assert [(r['api'], r['builder']) for r in results] == [('/api/clusters', 1)]
+
+
+def test_empty_first_variant_is_retried_at_other_variants():
+    def handler(endpoint, params):
+        if params['zoom'] >= 14:
+            return 200, {'markers': [{'lat': 31.2, 'lng': 121.4, 'zoom': params['zoom']}]}
+        return 200, {}
+
+    client = FakeClient(handler)
+    prober = EndpointProber(client, BASE)
+    results, _ = prober.probe(['/api/markers'], builders()[:1], list(range(8, 17)))
+
+    assert sorted(r['variant'] for r in results) == [14, 15, 16]
+    assert prober.endpoint_status['/api/markers'] == 'alive'
+
+
+def test_invariance_needs_every_sample_to_match():
+    # 第二个变体与第一个相同，较大缩放级别才不同：不能只凭第二个变体判断
+    def handler(endpoint, params):
+        if params['zoom'] >= 13:
+            return 200, {'clusters': [1, 2]}
+        return 200, {'clusters': [1]}
+
+    client = FakeClient(handler)
+    prober = EndpointProber(client, BASE)
+    prober.probe(['/api/clusters'], builders()[:1], list(range(8, 17)))
+
+    assert sorted(params['zoom'] for _, params in client.calls) == list(range(8, 17))
+    assert prober.stats['skipped_variants'] == 0
+
+
+def test_invariant_dimension_stops_after_samples():
+    client = FakeClient(lambda endpoint, params: (200, {'clusters': [1]}))
+    prober = EndpointProber(client, BASE)
+    results, _ = prober.probe(['/api/clusters'], builders()[:1], list(range(8, 17)), invariance_samples=3)
+
+    # 第一个变体 + 3个抽样（含最后一个），其余5个跳过
+    assert sorted(params['zoom'] for _, params in client.calls) == [8, 9, 13, 16]
+    assert prober.stats['skipped_variants'] == 5
+    assert len(results) == 1
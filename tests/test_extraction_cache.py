@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""ExtractionCache 的命中、版本失效与流式哈希"""
+
+import os
+
+from extraction_cache import ExtractionCache, StreamDigest
+
+PAGE = '<div data-lat="31.23" data-lng="121.47">上海数据中心</div>'
+
+
+class CountingExtractor:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, content):
+        self.calls += 1
+        return self.result
+
+
+def test_same_content_is_extracted_once(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    extract = CountingExtractor([[31.23, 121.47, "上海数据中心"]])
+
+    first = cache.get_or_extract(PAGE, 'page', 1, extract)
+    second = cache.get_or_extract(PAGE, 'page', 1, extract)
+
+    assert first == second == [[31.23, 121.47, "上海数据中心"]]
+    assert extract.calls == 1
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_different_content_misses(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    extract = CountingExtractor([])
+
+    cache.get_or_extract(PAGE, 'page', 1, extract)
+    cache.get_or_extract(PAGE + " ", 'page', 1, extract)
+
+    assert extract.calls == 2
+    assert cache.stats == {'hits': 0, 'misses': 2}
+
+
+def test_results_are_reused_across_runs_until_version_changes(tmp_path):
+    ExtractionCache(str(tmp_path)).get_or_extract(PAGE, 'page', 1, CountingExtractor({'count': 1}))
+
+    # 新进程（新的缓存对象）从磁盘取回同一版本的结果
+    reloaded = ExtractionCache(str(tmp_path))
+    extract = CountingExtractor({'count': 2})
+    assert reloaded.get_or_extract(PAGE, 'page', 1, extract) == {'count': 1}
+    assert extract.calls == 0
+
+    # 提取器版本或名称变化后旧结果不再使用
+    assert reloaded.get_or_extract(PAGE, 'page', 2, extract) == {'count': 2}
+    assert reloaded.get_or_extract(PAGE, 'other', 1, extract) == {'count': 2}
+    assert extract.calls == 2
+
+
+def test_cached_none_is_a_hit(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    extract = CountingExtractor(None)
+
+    assert cache.get_or_extract(PAGE, 'page', 1, extract) is None
+    assert cache.get_or_extract(PAGE, 'page', 1, extract) is None
+    assert extract.calls == 1
+
+
+def test_stream_digest_shares_cache_with_full_content(tmp_path):
+    digest = StreamDigest()
+    for start in range(0, len(PAGE), 5):
+        digest.feed(PAGE[start:start + 5])
+    assert digest.hexdigest() == ExtractionCache.digest_of(PAGE)
+
+    cache = ExtractionCache(str(tmp_path))
+    cache.get_or_extract(PAGE, 'page', 1, CountingExtractor(['full']))
+    extract = CountingExtractor(['streamed'])
+    assert cache.get_or_extract(None, 'page', 1, extract, digest=digest.hexdigest()) == ['full']
+    assert extract.calls == 0
+
+
+def test_unserializable_result_is_returned_but_not_stored(tmp_path, capsys):
+    cache = ExtractionCache(str(tmp_path))
+    result = cache.get_or_extract(PAGE, 'page', 1, CountingExtractor({1, 2}))
+
+    assert result == {1, 2}
+    assert "提取结果缓存写入失败" in capsys.readouterr().out
+    assert not [name for _, _, names in os.walk(str(tmp_path)) for name in names]
+    extract = CountingExtractor([])
+    assert ExtractionCache(str(tmp_path)).get_or_extract(PAGE, 'page', 1, extract) == []
+    assert extract.calls == 1
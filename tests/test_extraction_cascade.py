@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""提取策略级联：按成本执行、达到预期数量提前结束，预期数量取自页面报告的总数"""
+
+import os
+
+import pytest
+
+from extraction_cascade import ExtractionCascade, expected_count, reported_totals
+
+SAVED_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'html_sources', 'shanghai', 'main_analysis.html')
+
+
+def records(*coordinates):
+    return [{'latitude': lat, 'longitude': lng} for lat, lng in coordinates]
+
+
+def test_cheaper_strategy_runs_first_and_expected_count_stops_the_cascade():
+    calls = []
+
+    def strategy(name, result):
+        def run(page):
+            calls.append(name)
+            return result
+        return run
+
+    cascade = (ExtractionCascade()
+               .add('expensive', strategy('expensive', records((3, 3))), cost=5)
+               .add('cheap', strategy('cheap', records((1, 1), (2, 2), (1, 1))), cost=1))
+
+    assert cascade.run('page', expected=2) == records((1, 1), (2, 2))
+    assert calls == ['cheap']
+    assert cascade.run('page') == records((1, 1), (2, 2), (3, 3))
+
+
+def test_reported_totals_from_state_json_and_showing_text():
+    assert reported_totals('{"totalPreloadedSearchLocations":54,"perPage":40}') == (54, 40)
+    assert reported_totals('<p>Showing 1 - 25 of 31</p>') == (31, 25)
+    assert reported_totals('<p>no totals</p>') == (None, None)
+
+
+@pytest.mark.parametrize('total, per_page, collected, expected', [
+    (54, 40, 0, 40),
+    (54, 40, 40, 14),
+    (54, None, 50, 4),
+    (None, 40, 0, 40),
+    (None, None, 0, None),
+])
+def test_expected_count(total, per_page, collected, expected):
+    assert expected_count(total, per_page, collected) == expected
+
+
+@pytest.mark.skipif(not os.path.exists(SAVED_PAGE), reason="没有保存的上海主页面")
+def test_saved_page_reports_its_totals():
+    with open(SAVED_PAGE, encoding='utf-8') as f:
+        assert reported_totals(f.read()) == (54, 40)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""FacilityIdScanner 的分层采样与状态文件"""
+
+import json
+
+from facility_id_scanner import FacilityIdScanner
+
+URL = "https://www.datacenters.com/api/facilities/{id}"
+
+
+class FakeResponse:
+    def __init__(self, status, data=None):
+        self.status_code = status
+        self._data = data
+
+    def json(self):
+        if self._data is None:
+            raise ValueError("not json")
+        return self._data
+
+
+class FakeClient:
+    def __init__(self, alive_ids):
+        self.alive_ids = set(alive_ids)
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None):
+        facility_id = int(url.rsplit('/', 1)[1])
+        self.requested.append(facility_id)
+        if facility_id in self.alive_ids:
+            return FakeResponse(200, {'id': facility_id, 'lat': 31.2, 'lng': 121.4})
+        return FakeResponse(404)
+
+
+def make_scanner(client, tmp_path, **kwargs):
+    return FacilityIdScanner(client, URL, state_file=str(tmp_path / "state.json"), max_workers=2, **kwargs)
+
+
+def test_block_between_first_pass_samples_is_found(tmp_path):
+    # 第一遍采样点为 0, 16, 32, ...；ID 20-27 的密集段只有第二遍（8, 24, 40, ...）能命中
+    block = set(range(20, 28))
+    client = FakeClient(block)
+    scanner = make_scanner(client, tmp_path, initial_stride=16)
+
+    found = scanner.scan([range(0, 64)])
+
+    assert set(found) == block
+
+
+def test_sparse_range_is_not_refined(tmp_path):
+    client = FakeClient(set())
+    scanner = make_scanner(client, tmp_path, initial_stride=16)
+
+    assert scanner.scan([range(0, 64)]) == {}
+    # 两遍粗采样：0/16/32/48/63 与 8/24/40/56
+    assert sorted(client.requested) == [0, 8, 16, 24, 32, 40, 48, 56, 63]
+
+
+def test_state_file_stores_only_ids(tmp_path):
+    client = FakeClient({6})
+    scanner = make_scanner(client, tmp_path, initial_stride=4)
+    scanner.scan([range(0, 8)])
+
+    with open(tmp_path / "state.json", encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['alive'] == [6]
+    assert all(isinstance(facility_id, int) for facility_id in state['dead'])
+
+
+def test_known_ids_are_reused_across_runs(tmp_path):
+    make_scanner(FakeClient({6}), tmp_path, initial_stride=4).scan([range(0, 8)])
+
+    client = FakeClient({6})
+    scanner = make_scanner(client, tmp_path, initial_stride=4)
+    found = scanner.scan([range(0, 8)])
+
+    # 已知有效ID重新获取数据，已知无效ID不再请求
+    assert set(found) == {6}
+    assert set(client.requested) == {6}
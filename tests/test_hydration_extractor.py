@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""内嵌JSON提取：完整页面与流式下载结果一致，记录构建共用"""
+
+import hashlib
+import json
+
+import pytest
+
+from extraction_cache import ExtractionCache, StreamDigest
+from hydration_extractor import ScriptBlockCollector, build_records_from_locations, extract_locations
+
+LOCATIONS = [
+    {'id': 1, 'name': '广州天河数据中心', 'latitude': 23.13, 'longitude': 113.32, 'fullAddress': '天河路1号'},
+    {'id': 2, 'name': '深圳南山数据中心', 'latitude': 22.53, 'longitude': 113.93},
+    {'id': 3, 'name': 'Tokyo DC', 'latitude': 35.68, 'longitude': 139.69},
+]
+PAGE = (
+    '<html><head><script src="app.js"></script>'
+    '<script>window.__INITIAL_STATE__ = {"division": {"name": "广东", "latitude": 23, "longitude": 113}};</script>'
+    '</head><body><h1>广东省数据中心</h1>'
+    '<script type="application/json" class="js-react-on-rails-component">'
+    + json.dumps({'props': {'locations': LOCATIONS}}, ensure_ascii=False) +
+    '</script><script>var x = "{";</script></body></html>'
+)
+
+
+def stream(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, len(PAGE)])
+def test_collector_matches_full_page_extraction(chunk_size):
+    collector = ScriptBlockCollector()
+    for chunk in stream(PAGE, chunk_size):
+        collector.feed(chunk)
+    collector.close()
+
+    assert collector.locations() == extract_locations(PAGE)
+    assert [location['id'] for location in collector.locations()] == [1, 2, 3]
+
+
+def test_stream_digest_shares_extraction_cache_entry(tmp_path):
+    digest = StreamDigest()
+    for chunk in stream(PAGE, 5):
+        digest.feed(chunk)
+    assert digest.hexdigest() == hashlib.sha256(PAGE.encode('utf-8')).hexdigest()
+
+    cache = ExtractionCache(cache_dir=str(tmp_path))
+    first = cache.get_or_extract(PAGE, 'hydration', 1, extract_locations)
+
+    # 另一个进程（新的缓存实例）用流式哈希取回同一结果，不再解析
+    other = ExtractionCache(cache_dir=str(tmp_path))
+    result = other.get_or_extract(None, 'hydration', 1, pytest.fail, digest=digest.hexdigest())
+    assert result == first
+    assert other.stats == {'hits': 1, 'misses': 0}
+
+
+def test_build_records_filters_bounds_and_dedupes():
+    locations = extract_locations(PAGE)
+    seen = {(22.53, 113.93)}
+
+    records = build_records_from_locations(
+        locations, (20.0, 25.5, 109.0, 117.5), {'province': '广东省', 'city': '广州市'}, 'gd', seen,
+        default_name="广州市数据中心", start_index=10, extra={'crawl_time': 'now'}
+    )
+
+    assert len(records) == 1
+    record = records[0]
+    assert list(record)[:3] == ['province', 'city', 'latitude']
+    assert list(record)[-2:] == ['index', 'crawl_time']
+    assert record['facility_id'] == 1
+    assert record['address'] == '天河路1号'
+    assert record['index'] == 11
+    assert (23.13, 113.32) in seen
+
+
+def test_build_records_accepts_region_check_and_default_name():
+    locations = [{'id': None, 'name': '', 'latitude': 31.2, 'longitude': 121.5, 'address': '', 'provider': ''}]
+
+    records = build_records_from_locations(
+        locations, lambda lat, lng: lat > 31, {'province': '上海市'}, 'sh', set(), default_name="浦东新区数据中心"
+    )
+
+    assert records[0]['name'] == "浦东新区数据中心1"
+    assert 'index' not in records[0]
+    assert build_records_from_locations(locations, lambda lat, lng: False, {}, 'sh', set(), "x") == []
+
+
+def test_guangdong_streamed_page_matches_full_page():
+    from guangdong_datacenter_crawler import close_stream, create_page_stream, parse_page, parse_streamed_page, stream_consumers
+
+    pages = [PAGE, '<div>{"latitude": 23.1, "name": "广州数据中心", "longitude": 113.2}</div>']
+    for page in pages:
+        state = create_page_stream()
+        for chunk in stream(page, 16):
+            for consumer in stream_consumers(state):
+                consumer(chunk)
+        close_stream(state)
+
+        assert parse_streamed_page(state) == parse_page(page)
+
+
+@pytest.mark.parametrize('close_tag', ['</SCRIPT>', '</Script >', '</script\n>'])
+def test_close_tag_matched_case_insensitively(close_tag):
+    from hydration_extractor import iter_json_blocks
+
+    page = ('<SCRIPT type="application/json">' + json.dumps({'locations': LOCATIONS[:2]}) + close_tag +
+            '<script>window.__STATE__ = {"locations": []};</script>')
+    collector = ScriptBlockCollector()
+    for chunk in stream(page, 7):
+        collector.feed(chunk)
+    collector.close()
+
+    assert len(list(iter_json_blocks(page))) == 2
+    assert len(collector.data) == 2
+    assert collector.locations() == extract_locations(page)
+    assert len(extract_locations(page)) == 2
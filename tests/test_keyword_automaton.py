@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""名称关键词自动机与名称候选筛选"""
+
+import pytest
+
+from keyword_automaton import build_province_automaton
+
+
+def test_categories_are_case_insensitive_substrings():
+    automaton = build_province_automaton('上海市')
+
+    assert automaton.categories('Pudong SHANGHAI data center') == {'datacenter', 'region', 'related'}
+    assert automaton.categories('浦东新区') == {'region', 'related'}
+    assert automaton.categories('Tokyo') == set()
+
+
+@pytest.mark.parametrize('module_name, region_name', [
+    ('guangdong_datacenter_crawler', '广州天河'),
+    ('shanghai_datacenter_crawler', '上海浦东'),
+])
+def test_headings_need_a_datacenter_keyword(module_name, region_name):
+    module = pytest.importorskip(module_name)
+    page = (f'<h2>{region_name}</h2><h3>{region_name}数据中心</h3>'
+            f'{{"name": "{region_name}", "facility_name": "A1"}}')
+    matches = module.PAGE_SCANNER.scan(page)
+
+    names = module.clean_name_positions(module.PAGE_SCANNER.positions(matches, 'name'),
+                                        module.PAGE_SCANNER.positions(matches, 'facility_name'),
+                                        module.PAGE_SCANNER.positions(matches, 'heading'))
+
+    # 只含地名的标题不作为名称；"name" 字段只含地名仍可以
+    assert [name for _, name in names] == [f'{region_name}数据中心', region_name]
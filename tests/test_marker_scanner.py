@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""地图标记扫描器：分块送入与整页扫描结果一致"""
+
+import pytest
+
+from marker_scanner import MAX_TAG_LENGTH, MarkerScanner, parse_position, scan_markers
+
+PAGE = (
+    '<div><gmp-advanced-marker position="31.23,121.47" title="上海数据中心A"></gmp-advanced-marker>'
+    '<gmp-advanced-marker-view position="1,2"></gmp-advanced-marker-view>'
+    "<GMP-ADVANCED-MARKER position='0,0'>"
+    '<gmp-advanced-marker aria-label="12" position="31.1, 121.3"></gmp-advanced-marker>'
+    '<gmp-advanced-marker\n position=31.3,121.5 aria-label="B DC"/>'
+    '<gmp-advanced-marker title="no position"></gmp-advanced-marker></div>'
+)
+
+
+def scan_in_chunks(text, size):
+    scanner = MarkerScanner()
+    for start in range(0, len(text), size):
+        scanner.feed(text[start:start + size])
+    scanner.close()
+    return scanner.markers, scanner.clusters
+
+
+def test_full_page_scan():
+    markers, clusters = scan_markers(PAGE)
+
+    assert [(m.latitude, m.longitude, m.title) for m in markers] == [
+        (31.23, 121.47, "上海数据中心A"), (31.3, 121.5, "B DC"),
+    ]
+    assert [(c.count, c.latitude, c.longitude) for c in clusters] == [(12, 31.1, 121.3)]
+    assert markers[0].offset == PAGE.index('<gmp-advanced-marker ')
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 19, 64, len(PAGE)])
+def test_chunked_scan_matches_full_scan(size):
+    assert scan_in_chunks(PAGE, size) == scan_markers(PAGE)
+
+
+def test_buffer_for_unclosed_tag_is_bounded():
+    # 没有 '>' 的超长标签头不会一直留在缓冲区中，之后的完整标签照常识别
+    scanner = MarkerScanner()
+    scanner.feed('<gmp-advanced-marker position="31,121" data-x=')
+    for _ in range(20):
+        scanner.feed('x' * 1000)
+        assert len(scanner.buffer) <= MAX_TAG_LENGTH
+    scanner.feed('<gmp-advanced-marker position="31.5,121.5" title="ok">')
+    scanner.close()
+
+    assert [(m.latitude, m.title) for m in scanner.markers] == [(31.5, "ok")]
+
+
+QUOTED_GT_PAGE = (
+    '<gmp-advanced-marker title="A > B" position="31.2,121.4"></gmp-advanced-marker>'
+    "<gmp-advanced-marker aria-label='x>y' position='31.3,121.5'></gmp-advanced-marker>"
+    '<gmp-advanced-marker title=C>D position="31.4,121.6"></gmp-advanced-marker>'
+)
+
+
+@pytest.mark.parametrize('size', [1, 5, 13, len(QUOTED_GT_PAGE)])
+def test_gt_inside_quoted_attribute_does_not_end_tag(size):
+    markers, _ = scan_in_chunks(QUOTED_GT_PAGE, size)
+
+    # 引号内的 '>' 属于属性值；未加引号时 '>' 仍然结束标签
+    assert [(m.latitude, m.longitude, m.title) for m in markers] == [
+        (31.2, 121.4, "A > B"), (31.3, 121.5, "x>y"),
+    ]
+
+
+@pytest.mark.parametrize('position, expected', [
+    ("31.2,121.4", (31.2, 121.4)),
+    (" 31.2 , 121.4 ", (31.2, 121.4)),
+    ("31.2", None),
+    ("a,b", None),
+    (None, None),
+])
+def test_parse_position(position, expected):
+    assert parse_position(position) == expected
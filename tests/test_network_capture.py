@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""性能日志中 JSON 接口响应的筛选与正文解析"""
+
+import base64
+import json
+
+import pytest
+
+from network_capture import NetworkCapture, is_pagination_api
+
+
+def event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def response_received(request_id, url, resource_type='XHR', mime_type='application/json'):
+    return event('Network.responseReceived', requestId=request_id, type=resource_type,
+                 response={'url': url, 'mimeType': mime_type})
+
+
+class FakeDriver:
+    """按批次返回性能日志、按 requestId 返回响应正文的浏览器替身"""
+
+    def __init__(self, batches, bodies):
+        self.batches = list(batches)
+        self.bodies = bodies
+        self.commands = []
+
+    def get_log(self, log_type):
+        assert log_type == 'performance'
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append(command)
+        if command == 'Network.getResponseBody':
+            body = self.bodies[params['requestId']]
+            if isinstance(body, Exception):
+                raise body
+            return body
+        return {}
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("https://www.datacenters.com/api/v1/locations?page=2", True),
+    ("https://datacenters.com/api/search?q=shanghai", True),
+    ("https://api.datacenters.com/facilities/list", True),
+    ("https://www.datacenters.com/api/v1/locations/clusters", False),
+    ("https://www.datacenters.com/api/map/markers?bounds=1", False),
+    ("https://tracker.example.com/locations", False),
+    ("https://datacenters.com.evil.example/locations", False),
+    ("https://www.datacenters.com/static/app.js", False),
+])
+def test_is_pagination_api(url, expected):
+    assert is_pagination_api(url) == expected
+
+
+def test_collect_parses_finished_json_responses():
+    listing = "https://www.datacenters.com/api/v1/locations?page=2"
+    encoded = base64.b64encode(json.dumps({'page': 3}).encode('utf-8')).decode('ascii')
+    driver = FakeDriver(
+        batches=[
+            ['stale'],   # start() 丢弃的旧日志
+            [
+                {'message': 'not json'},
+                response_received('1', listing),
+                response_received('2', listing + '&b64'),
+                response_received('3', "https://www.datacenters.com/api/v1/locations/clusters"),
+                response_received('4', listing, resource_type='Document'),
+                response_received('5', listing, mime_type='text/html'),
+                response_received('6', listing + '&bad'),
+                response_received('7', listing + '&failed'),
+                event('Network.loadingFinished', requestId='1'),
+                event('Network.loadingFinished', requestId='2'),
+                event('Network.loadingFinished', requestId='3'),
+                event('Network.loadingFinished', requestId='6'),
+                event('Network.loadingFailed', requestId='7'),
+                event('Network.loadingFinished', requestId='7'),
+            ],
+        ],
+        bodies={
+            '1': {'body': json.dumps({'page': 2, 'locations': [{'name': 'A'}]}), 'base64Encoded': False},
+            '2': {'body': encoded, 'base64Encoded': True},
+            '6': {'body': '{broken', 'base64Encoded': False},
+        },
+    )
+
+    capture = NetworkCapture(driver, url_filter=is_pagination_api).start()
+    captured = capture.collect()
+
+    assert captured == [
+        (listing, {'page': 2, 'locations': [{'name': 'A'}]}),
+        (listing + '&b64', {'page': 3}),
+    ]
+    assert driver.commands[0] == 'Network.enable'
+    assert driver.commands.count('Network.getResponseBody') == 3
+    assert capture.stats['responses'] == 2
+    assert capture.stats['failed'] == 1
+
+
+def test_response_finishing_in_a_later_batch_is_collected_then():
+    url = "https://www.datacenters.com/api/v1/locations?page=2"
+    driver = FakeDriver(
+        batches=[[], [response_received('1', url)], [event('Network.loadingFinished', requestId='1')]],
+        bodies={'1': {'body': '[]', 'base64Encoded': False}},
+    )
+    capture = NetworkCapture(driver).start()
+
+    assert capture.collect() == []
+    assert capture.collect() == [(url, [])]
+    assert capture.collect() == []
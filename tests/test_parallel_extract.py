@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""ExtractionPool：按数据源顺序产出结果，前面的数据源完成即可合并"""
+
+import json
+
+from extraction_cache import ExtractionCache
+from parallel_extract import ExtractionPool
+
+
+def tag(content, label):
+    print(f"parsing {label}")
+    return {'label': label, 'size': len(content)}
+
+
+def test_ready_yields_in_source_order_as_prefix_completes():
+    with ExtractionPool(tag, ['a', 'b', 'c'], max_workers=1) as pool:
+        pool.submit('b', "bb", 'B')
+        assert list(pool.ready()) == []
+
+        pool.submit('a', "a", 'A')
+        assert [(key, result['label']) for key, result, _, _ in pool.ready()] == [('a', 'A'), ('b', 'B')]
+
+        # 下载失败的数据源不阻塞其后的结果
+        pool.skip('c')
+        pool.submit('d', "dddd", 'D')
+        results = list(pool.ready())
+        assert [key for key, _, _, _ in results] == ['d']
+        assert results[0][2] == "parsing D\n"
+        assert list(pool.collect()) == []
+
+
+def test_collect_treats_unsubmitted_sources_as_skipped_and_reports_errors():
+    with ExtractionPool(json.loads, ['a', 'b', 'c'], max_workers=1) as pool:
+        pool.submit('c', '{"x": 1}')
+        pool.submit('a', 'not json')
+        results = list(pool.collect())
+
+    assert [key for key, _, _, _ in results] == ['a', 'c']
+    assert isinstance(results[0][3], ValueError)
+    assert results[1][1] == {'x': 1}
+
+
+def test_process_pool_runs_plain_function():
+    with ExtractionPool(json.loads, ['a', 'b'], max_workers=2) as pool:
+        pool.submit('a', '[1, 2]')
+        pool.submit('b', '{"y": 2}')
+        results = list(pool.collect())
+
+    assert [(key, result, error) for key, result, _, error in results] == [('a', [1, 2], None), ('b', {'y': 2}, None)]
+
+
+def test_cached_results_skip_parsing(tmp_path):
+    cache = ExtractionCache(cache_dir=str(tmp_path))
+    with ExtractionPool(tag, ['a'], max_workers=1, cache=cache, extractor='page', version=1) as pool:
+        pool.submit('a', "same", 'A')
+        list(pool.collect())
+
+    calls = []
+    cache = ExtractionCache(cache_dir=str(tmp_path))
+    with ExtractionPool(lambda content, label: calls.append(label), ['a', 'b'], max_workers=1,
+                        cache=cache, extractor='page', version=1) as pool:
+        pool.submit('a', "same", 'A')
+        pool.submit('b', "same", 'other')
+        results = list(pool.collect())
+
+    # 附加参数不同的结果分开缓存
+    assert calls == ['other']
+    assert results[0][1] == {'label': 'A', 'size': 4}
+    assert cache.stats == {'hits': 1, 'misses': 1}
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""QuadtreeQueryPlanner 的细分条件"""
+
+from quadtree_planner import QuadtreeQueryPlanner
+
+ROOT = (31.0, 121.0, 31.4, 121.4)
+
+
+def point(lat, lng, count=1):
+    return {'latitude': lat, 'longitude': lng, 'count': count}
+
+
+def inside(bbox, record):
+    sw_lat, sw_lng, ne_lat, ne_lng = bbox
+    return sw_lat <= record['latitude'] <= ne_lat and sw_lng <= record['longitude'] <= ne_lng
+
+
+def test_sparse_area_needs_one_request():
+    facilities = [point(31.1, 121.1), point(31.3, 121.3)]
+    planner = QuadtreeQueryPlanner(lambda bbox: [f for f in facilities if inside(bbox, f)], limit=50)
+
+    assert len(planner.run(ROOT)) == 2
+    assert planner.stats['requests'] == 1
+
+
+def test_children_inherit_cluster_counts_and_keep_splitting():
+    # 单点按三层四叉树分布；接口在较大的区域只返回部分单点，没有聚合点
+    facilities = [point(31.01 + 0.001 * i, 121.01 + 0.001 * i) for i in range(6)]
+    calls = []
+
+    def fetch(bbox):
+        calls.append(bbox)
+        span = bbox[2] - bbox[0]
+        found = [f for f in facilities if inside(bbox, f)]
+        if span > 0.06 and found:
+            # 大区域只返回一个聚合点
+            return [point(found[0]['latitude'], found[0]['longitude'], count=len(found))]
+        if span > 0.03:
+            # 中等区域截断为两个单点
+            return found[:2]
+        return found
+
+    planner = QuadtreeQueryPlanner(fetch, limit=50, min_span=0.001)
+    results = planner.run(ROOT, expected_count=6)
+
+    # 中等区域的单点少于父区域聚合点的数量，子区域继续细分直到取回全部设施
+    assert len(results) == 6
+
+
+def test_empty_child_is_not_split():
+    planner = QuadtreeQueryPlanner(lambda bbox: [], limit=50)
+
+    assert planner.run(ROOT, expected_count=5) == []
+    assert planner.stats['requests'] == 1
+
+
+def test_child_expected_counts_assign_boundary_points_once():
+    children = QuadtreeQueryPlanner.split(ROOT)
+    counts = QuadtreeQueryPlanner.child_expected_counts(children, [point(31.2, 121.2, count=4), point(31.3, 121.3)])
+
+    assert sum(counts) == 5
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""RateGovernor 的站点键与速率预算"""
+
+import json
+import os
+
+import pytest
+
+from fetch_client import FetchClient
+from rate_governor import PROBE_BUDGET, RateGovernor, site_key
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("https://www.datacenters.com/locations/china", 'datacenters.com'),
+    ("https://datacenters.com/api/markers", 'datacenters.com'),
+    ("https://API.DataCenters.com:443/x", 'datacenters.com'),
+    ("https://www.example.com.cn/", 'example.com.cn'),
+    ("http://127.0.0.1:8000/", '127.0.0.1'),
+])
+def test_site_key_is_registrable_domain(url, expected):
+    assert site_key(url) == expected
+
+
+def read_state(tmp_path):
+    with open(os.path.join(str(tmp_path), "datacenter_crawl_governor.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_www_and_bare_host_share_one_bucket(tmp_path):
+    # 补充速率很低，两次请求之间的补充可忽略
+    governor = RateGovernor(rate=0.1, burst=2, state_dir=str(tmp_path))
+    governor.acquire("https://www.datacenters.com/a")
+    governor.acquire("https://datacenters.com/b")
+
+    state = read_state(tmp_path)
+    assert list(state) == ['pages:datacenters.com']
+    assert state['pages:datacenters.com']['tokens'] < 0.5
+
+
+def test_third_request_in_shared_bucket_waits(tmp_path):
+    governor = RateGovernor(rate=20, burst=2, state_dir=str(tmp_path))
+    assert governor.acquire("https://www.datacenters.com/a") == 0
+    assert governor.acquire("https://datacenters.com/b") == 0
+    assert governor.acquire("https://www.datacenters.com/c") > 0
+
+
+def test_ungoverned_sites_and_caller_key(tmp_path):
+    governor = RateGovernor(rate=1000, burst=1, state_dir=str(tmp_path))
+    assert governor.acquire("https://www.google.com/") == 0
+    assert not os.path.exists(os.path.join(str(tmp_path), "datacenter_crawl_governor.json"))
+
+    # 调用方指定站点键时按该键计数
+    governor.acquire("https://cdn.example.net/tile.png", key='datacenters.com')
+    assert 'pages:datacenters.com' in read_state(tmp_path)
+
+
+def test_probe_budget_is_separate_from_pages(tmp_path):
+    pages = RateGovernor(rate=20, burst=1, state_dir=str(tmp_path))
+    probe = RateGovernor(PROBE_BUDGET, rate=20, burst=1, state_dir=str(tmp_path))
+
+    assert pages.acquire("https://www.datacenters.com/a") == 0
+    # 页面预算已用完，探测预算不受影响
+    assert probe.acquire("https://www.datacenters.com/api/x") == 0
+    assert set(read_state(tmp_path)) == {'pages:datacenters.com', 'probe:datacenters.com'}
+
+
+def test_client_with_budget_shares_connection_pool(tmp_path):
+    client = FetchClient(governor=RateGovernor(state_dir=str(tmp_path)))
+    probe_client = client.with_budget(PROBE_BUDGET)
+
+    assert probe_client.session is client.session
+    assert probe_client.retry is client.retry
+    assert probe_client.governor.budget == PROBE_BUDGET
+    assert client.governor.budget == 'pages'
+    assert probe_client.with_budget(PROBE_BUDGET) is probe_client
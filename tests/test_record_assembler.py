@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""按文本位置组装记录：坐标配对、名称分配与流式花括号跟踪"""
+
+import re
+
+import pytest
+
+from record_assembler import BraceTracker, assemble_records
+
+NUMBER = re.compile(r'"(lat|lng)":\s*(-?\d+(?:\.\d+)?)')
+NAME = re.compile(r'"name":\s*"([^"]*)"')
+
+
+def matches(text):
+    latitudes, longitudes = [], []
+    for match in NUMBER.finditer(text):
+        target = latitudes if match.group(1) == 'lat' else longitudes
+        target.append((match.start(), float(match.group(2))))
+    names = [(match.start(), match.group(1)) for match in NAME.finditer(text)]
+    return latitudes, longitudes, names
+
+
+def assemble(text):
+    latitudes, longitudes, names = matches(text)
+    return [(record.latitude, record.longitude, record.name)
+            for record in assemble_records(latitudes, longitudes, names, BraceTracker(text))]
+
+
+def test_latitude_before_longitude():
+    text = '[{"name": "A", "lat": 23.1, "lng": 113.2}, {"name": "B", "lat": 22.5, "lng": 114.0}]'
+
+    assert assemble(text) == [(23.1, 113.2, "A"), (22.5, 114.0, "B")]
+
+
+def test_longitude_before_latitude():
+    text = '[{"name": "A", "lng": 113.2, "lat": 23.1}, {"lng": 114.0, "lat": 22.5, "name": "B"}]'
+
+    assert assemble(text) == [(23.1, 113.2, "A"), (22.5, 114.0, "B")]
+
+
+def test_mixed_order_never_pairs_across_objects():
+    # 第一个对象缺经度，不能与第二个对象的经度配对；第二个对象经度在前
+    text = '[{"name": "A", "lat": 23.1}, {"name": "B", "lng": 114.0, "lat": 22.5}, {"lng": 115.0}]'
+
+    assert assemble(text) == [(22.5, 114.0, "B")]
+
+
+def test_name_from_enclosing_object():
+    text = '{"name": "A", "location": {"lng": 113.2, "lat": 23.1}}'
+
+    assert assemble(text) == [(23.1, 113.2, "A")]
+
+
+def test_pair_distance_limit():
+    text = '{"lat": 23.1, "padding": "' + 'x' * 300 + '", "lng": 113.2}'
+
+    assert assemble(text) == []
+
+
+def test_streamed_tracker_matches_full_text():
+    objects = []
+    for i in range(200):
+        lat, lng = 20 + i / 100, 110 + i / 100
+        if i % 3:
+            objects.append('{"name": "DC%d", "lat": %s, "extra": {"x": 1}, "lng": %s}' % (i, lat, lng))
+        else:
+            objects.append('{"lng": %s, "name": "DC%d", "lat": %s}' % (lng, i, lat))
+    text = '{"items": [' + ', '.join(objects) + ']}'
+    latitudes, longitudes, names = matches(text)
+    offsets = sorted(offset for offset, _ in latitudes + longitudes + names)
+
+    lag = 64
+    tracker = BraceTracker(lag=lag)
+    position = 0
+    for start in range(0, len(text), 100):
+        chunk = text[start:start + 100]
+        # 匹配在其所在块送入之前登记（相当于扫描器先于跟踪器处理同一块）
+        while position < len(offsets) and offsets[position] < start + len(chunk):
+            tracker.track(offsets[position])
+            position += 1
+        tracker.feed(chunk)
+        # 只保留未闭合对象、未处理的花括号和登记过的位置
+        assert len(tracker.braces) <= lag
+        assert len(tracker.stack) <= 4
+    tracker.close()
+
+    expected = assemble(text)
+    streamed = [(record.latitude, record.longitude, record.name)
+                for record in assemble_records(latitudes, longitudes, names, tracker)]
+    assert streamed == expected
+    assert len(expected) == 200
+    assert expected[0] == (20.0, 110.0, "DC0")
+
+
+def test_track_after_position_processed_is_an_error():
+    tracker = BraceTracker(lag=0)
+    tracker.feed('{"lat": 1}')
+
+    with pytest.raises(ValueError):
+        tracker.track(2)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""ResponseCache 的缓存条件与索引合并"""
+
+import json
+import os
+
+import requests
+
+from response_cache import ResponseCache
+
+URL = "https://www.datacenters.com/locations/china/shanghai"
+
+
+def make_response(body=b"<html></html>", status=200, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.encoding = 'utf-8'
+    response.url = URL
+    return response
+
+
+def read_index(cache_dir):
+    with open(os.path.join(cache_dir, "index.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_response_without_validators_is_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, make_response())
+
+    assert cache.entries == {}
+    assert cache.conditional_headers(URL) == {}
+    assert not os.path.exists(os.path.join(str(tmp_path), "index.json"))
+
+
+def test_validators_are_sent_and_304_rebuilds_body(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, make_response(b"page", headers={'ETag': '"v1"'}))
+
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"v1"'}
+    rebuilt = cache.build_response(URL, make_response(b"", status=304))
+    assert rebuilt.status_code == 200
+    assert rebuilt.content == b"page"
+    assert rebuilt.from_cache
+
+
+def test_hits_do_not_rewrite_index_until_flush(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store(URL, make_response(b"page", headers={'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+    stored_access = read_index(str(tmp_path))[URL]['last_access']
+    index_mtime = os.stat(os.path.join(str(tmp_path), "index.json")).st_mtime_ns
+
+    cache.build_response(URL, make_response(b"", status=304))
+    assert os.stat(os.path.join(str(tmp_path), "index.json")).st_mtime_ns == index_mtime
+
+    cache.flush()
+    assert read_index(str(tmp_path))[URL]['last_access'] >= stored_access
+
+
+def test_concurrent_caches_merge_their_entries(tmp_path):
+    # 两个进程各自持有旧索引，写回时不会覆盖对方的条目
+    first = ResponseCache(str(tmp_path))
+    second = ResponseCache(str(tmp_path))
+    first.store(URL, make_response(b"a", headers={'ETag': '"a"'}))
+    second.store(URL + "/page/2", make_response(b"b", headers={'ETag': '"b"'}))
+
+    assert set(read_index(str(tmp_path))) == {URL, URL + "/page/2"}
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""上海增强版爬虫：JSON-LD 遍历只沿可能包含位置的分支深入"""
+
+import pytest
+
+shanghai_enhanced = pytest.importorskip('shanghai_enhanced_crawler')
+
+
+def geo(lat, lng):
+    return {'@type': 'GeoCoordinates', 'latitude': lat, 'longitude': lng}
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    crawler = shanghai_enhanced.ShanghaiEnhancedCrawler(client=object())
+    crawler.parsed_nodes = []
+    parse_location_data = crawler.parse_location_data
+
+    def record(node):
+        crawler.parsed_nodes.append(node.get('@type'))
+        return parse_location_data(node)
+
+    monkeypatch.setattr(crawler, 'parse_location_data', record)
+    return crawler
+
+
+def test_json_ld_skips_review_offer_and_image_branches(crawler):
+    # 这些分支里即使有带坐标的 Place，也不是本页的数据中心，不应被遍历
+    hidden_place = {'@type': 'Place', 'name': '评价中的地点', 'geo': geo(31.25, 121.45)}
+    data = {
+        '@context': 'https://schema.org',
+        '@type': 'LocalBusiness',
+        'name': '上海浦东数据中心',
+        'geo': geo(31.22, 121.54),
+        'review': {'@type': 'Review', 'itemReviewed': hidden_place},
+        'offers': [{'@type': 'Offer', 'availableAtOrFrom': hidden_place}],
+        'image': {'@type': 'ImageObject', 'contentLocation': hidden_place},
+    }
+
+    results = crawler.parse_json_ld(data)
+
+    assert [result['name'] for result in results] == ['上海浦东数据中心']
+    assert crawler.parsed_nodes == ['LocalBusiness']
+
+
+def test_json_ld_follows_graph_location_and_place_lists(crawler):
+    data = {'@graph': [
+        {'@type': 'Organization', 'name': '运营商',
+         'department': [{'@type': 'Place', 'name': '上海静安数据中心', 'geo': geo(31.23, 121.45)},
+                        {'@type': 'Review', 'name': '评价'}]},
+        {'@type': 'Event', 'location': {'@type': 'Place', 'name': '上海徐汇机房', 'geo': geo(31.19, 121.44)}},
+    ]}
+
+    results = crawler.parse_json_ld(data)
+
+    assert [result['name'] for result in results] == ['上海静安数据中心', '上海徐汇机房']
+    assert 'Review' not in crawler.parsed_nodes
+
+
+def test_clusters_recorded_when_cascade_stops_before_marker_strategy(crawler):
+    # JSON-LD 已满足页面报告的每页数量（1个），地图标记策略不会执行
+    page = (
+        '<script type="application/ld+json">'
+        '{"@type": "LocalBusiness", "name": "上海浦东数据中心", '
+        '"geo": {"latitude": 31.22, "longitude": 121.54}}</script>'
+        '<script>{"totalPreloadedSearchLocations": 9, "perPage": 1}</script>'
+        '<gmp-advanced-marker position="31.1,121.3" aria-label="8"></gmp-advanced-marker>'
+        '<gmp-advanced-marker position="31.3,121.5" title="上海宝山机房"></gmp-advanced-marker>'
+    )
+
+    results = crawler.extract_data_from_page(page, 'page_1')
+
+    assert [result['source'] for result in results] == ['json_ld']
+    assert crawler.extraction.early_exits == 1
+    assert crawler.map_clusters == {(31.1, 121.3): 8}
+
+
+def test_marker_strategy_reuses_the_page_scan(crawler, monkeypatch):
+    calls = []
+    scan_markers = shanghai_enhanced.scan_markers
+    monkeypatch.setattr(shanghai_enhanced, 'scan_markers', lambda content: calls.append(1) or scan_markers(content))
+
+    results = crawler.extract_data_from_page(
+        '<gmp-advanced-marker position="31.3,121.5" title="上海宝山机房"></gmp-advanced-marker>', 'page_1')
+
+    assert calls == [1]
+    assert [(result['name'], result['source']) for result in results][0] == ('上海宝山机房', 'map_marker')
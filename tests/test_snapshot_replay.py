@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""离线回放：快照文件名到数据源键的映射与逐个快照的提取"""
+
+import os
+
+import pytest
+
+from snapshot_replay import match_source_key, parse_replay_args, replay_snapshots
+
+SOURCE_KEYS = ['深圳-shenzhen', '广州-guangzhou', 'sichuan', 'sichuan-sheng']
+
+
+@pytest.mark.parametrize('filename, expected', [
+    ("深圳_shenzhen_source.html", '深圳-shenzhen'),
+    ("html_sources/guangzhou_page2.html", '广州-guangzhou'),
+    ("GUANGZHOU.htm", '广州-guangzhou'),
+    # 取最长的匹配："sichuan_sheng" 比 "sichuan" 更具体
+    ("sichuan_sheng_source.html", 'sichuan-sheng'),
+    ("sichuan_source.html", 'sichuan'),
+])
+def test_match_source_key(filename, expected):
+    assert match_source_key(filename, SOURCE_KEYS) == expected
+
+
+def test_unmatched_filename_falls_back_to_default_or_stem():
+    assert match_source_key("beijing.html", SOURCE_KEYS, default='上海') == '上海'
+    assert match_source_key("dir/beijing.html", SOURCE_KEYS) == 'beijing'
+    assert match_source_key("dir/beijing.html", None) == 'beijing'
+
+
+def write(directory, name, content):
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_replay_snapshots_feeds_each_file_in_name_order(tmp_path):
+    directory = str(tmp_path)
+    write(directory, "b_guangzhou.html", "<p>gz</p>")
+    write(directory, "a_shenzhen.htm", "<p>sz</p>")
+    write(directory, "notes.txt", "ignored")
+
+    calls = []
+
+    def extract(content, source_key):
+        calls.append((content, source_key))
+        return [] if source_key == '广州-guangzhou' else [{'name': content}]
+
+    records = replay_snapshots(directory, extract, source_keys=SOURCE_KEYS)
+
+    assert calls == [("<p>sz</p>", '深圳-shenzhen'), ("<p>gz</p>", '广州-guangzhou')]
+    assert records == [{'name': "<p>sz</p>"}]
+
+
+def test_replay_missing_directory_returns_no_records(tmp_path):
+    def extract(content, source_key):
+        raise AssertionError("不应调用提取函数")
+
+    assert replay_snapshots(os.path.join(str(tmp_path), "missing"), extract) == []
+
+
+def test_parse_replay_args():
+    assert parse_replay_args(argv=['--replay', 'html_sources/shanghai']) == 'html_sources/shanghai'
+    assert parse_replay_args(argv=[]) is None
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""川滇黔爬虫的页面解析：没有内嵌JSON时按位置组装坐标和名称"""
+
+import pytest
+
+# 第一个对象经度在前，第三个对象缺经度：按列表序号配对会把名称和坐标错开
+PAGE = ('[{"name": "成都一号数据中心", "longitude": 104.06, "latitude": 30.67},'
+        ' {"latitude": 25.0, "name": "昆明办公室"},'
+        ' {"latitude": 26.6, "longitude": 106.7, "name": "贵阳IDC"}]')
+
+
+@pytest.mark.parametrize('module_name', ['complete_datacenter_crawler', 'ultimate_datacenter_crawler'])
+def test_fallback_pairs_values_within_the_same_object(module_name):
+    module = pytest.importorskip(module_name)
+
+    parsed = module.parse_page(PAGE, '四川省')
+
+    assert parsed['locations'] == []
+    assert [(lat, lng, name) for lat, lng, name, _ in parsed['records']] == [
+        (30.67, 104.06, "成都一号数据中心"), (26.6, 106.7, "贵阳IDC"),
+    ]
+
+
+@pytest.mark.parametrize('module_name', ['complete_datacenter_crawler', 'ultimate_datacenter_crawler'])
+def test_unnamed_coordinate_gets_default_name(module_name):
+    module = pytest.importorskip(module_name)
+    crawler_class = getattr(module, 'CompleteDataCenterCrawler', None) or module.UltimateDataCenterCrawler
+    crawler = crawler_class(client=object())
+
+    parsed = module.parse_page('{"latitude": 30.1, "longitude": 104.1, "name": "x"}', '四川省')
+    records = crawler.build_records(parsed, next(iter(crawler.urls)))
+
+    assert [record['name'] for record in records] == ["四川省数据中心1"]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""流式下载：跨块边界的增量匹配与快照的完整替换"""
+
+import os
+
+import pytest
+
+from pattern_scanner import NUMBER, MultiPatternScanner
+from stream_download import IncrementalPatternScanner, stream_download
+
+SCANNER = MultiPatternScanner([
+    ('latitude', '"lat"', NUMBER, 0),
+    ('longitude', '"lng"', NUMBER, 0),
+    ('name', '"name"', r'"([^"]+)"', 0),
+])
+
+PAGE = ''.join(
+    f'{{"name": "数据中心{i}", "lat": 31.{i}23, "lng": 121.{i}47}}, ' for i in range(30)
+)
+
+
+def scan_in_chunks(text, size, overlap=64):
+    emitted = []
+    scanner = IncrementalPatternScanner(SCANNER, overlap=overlap,
+                                        on_match=lambda kind, value, offset: emitted.append((kind, value, offset)))
+    for start in range(0, len(text), size):
+        scanner.feed(text[start:start + size])
+    scanner.close()
+    return scanner, emitted
+
+
+@pytest.mark.parametrize('size', [1, 7, 20, 63, 200, len(PAGE)])
+def test_chunked_matches_equal_full_scan(size):
+    scanner, emitted = scan_in_chunks(PAGE, size)
+    matches = SCANNER.scan(PAGE)
+
+    for kind in SCANNER.kinds:
+        assert scanner.values(kind) == SCANNER.values(matches, kind)
+        assert scanner.positions(kind) == SCANNER.positions(matches, kind)
+    # 每个匹配只回调一次，偏移量指向整页中的位置
+    assert sorted(emitted, key=lambda item: item[2]) == [(m.kind, m.value, m.start) for m in matches]
+
+
+def test_buffer_stays_bounded():
+    scanner = IncrementalPatternScanner(SCANNER, overlap=32)
+    for start in range(0, len(PAGE), 10):
+        scanner.feed(PAGE[start:start + 10])
+        assert len(scanner.buffer) <= 2 * 32 + 10
+    scanner.close()
+    assert scanner.chars_seen == len(PAGE)
+
+
+class FakeResponse:
+    def __init__(self, chunks, status_code=200, encoding='utf-8', error=None):
+        self.chunks = chunks
+        self.status_code = status_code
+        self.encoding = encoding
+        self.error = error
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+def split_bytes(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_snapshot_replaced_after_complete_download(tmp_path):
+    path = os.path.join(str(tmp_path), "pages", "page.html")
+    received = []
+    # 3字节一块，中文字符会被拆在两块之间
+    response = FakeResponse(split_bytes(PAGE, 3))
+    result = stream_download(FakeClient(response), "https://example.com/", snapshot_path=path,
+                             consumers=[received.append])
+
+    assert result is response and response.closed
+    assert result.streamed_chars == len(PAGE)
+    assert ''.join(received) == PAGE
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == PAGE
+    assert not os.path.exists(path + ".part")
+
+
+def test_failed_download_keeps_previous_snapshot(tmp_path):
+    path = os.path.join(str(tmp_path), "page.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("old")
+
+    response = FakeResponse(split_bytes(PAGE, 50)[:2], error=IOError("connection reset"))
+    with pytest.raises(IOError):
+        stream_download(FakeClient(response), "https://example.com/", snapshot_path=path)
+
+    assert response.closed
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "old"
+    assert not os.path.exists(path + ".part")
+
+
+def test_non_200_response_writes_nothing(tmp_path):
+    path = os.path.join(str(tmp_path), "page.html")
+    received = []
+    response = FakeResponse([b"not found"], status_code=404)
+    result = stream_download(FakeClient(response), "https://example.com/", snapshot_path=path,
+                             consumers=[received.append])
+
+    assert result.status_code == 404 and result.streamed_chars == 0
+    assert received == [] and os.listdir(str(tmp_path)) == []